@@ -1,24 +1,52 @@
 import streamlit as st
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
-import plotly.express as px
-import json
-
-# Load your pre-processed data
-@st.cache_data
-def load_data():
-    # Replace with the path to your processed dataset
-    combined_data = pd.read_csv("C:/Users/Zachary Cheney/OneDrive - University of Arkansas/Fall 2024/advanced financial modeling/Hello-world/Group_FDA_Project/combined_data.csv", index_col=0, parse_dates=True)
-    return combined_data
+
+import backtest
+import correlation
+import cycle_cube
+import data_layer
+import instrumentation
+import optimizer
+
+# matplotlib and seaborn are imported only when a chart that needs them is shown
+
+# Load your pre-processed data (memory-mapped snapshot shared with the other dashboards)
+def load_data(columns=None):
+    return data_layer.load_data("combined_data", columns)
+
 def load_metadata():
-    with open('C:/Users/Zachary Cheney/OneDrive - University of Arkansas/Fall 2024/advanced financial modeling/Hello-world/Group_FDA_Project/combined_data_metadata.json', 'r') as f:
-        return json.load(f)
+    # ETF/CRSP column lists are stored in the snapshot alongside the data
+    return data_layer.load_metadata("combined_data")
+
+# Content hash of the loaded dataset, recomputed only when its CSV or snapshot file changes
+@instrumentation.cached(st.cache_resource)
+def dataset_version(stamp):
+    return cycle_cube.dataset_hash(load_data())
+
+# Per-cycle mean/std/count/Sharpe and macro-sector correlations for every data type,
+# keyed by the dataset's content hash
+@instrumentation.cached(data_layer.derived_cache())
+def load_cube(data_hash, _combined_data, _metadata):
+    return cycle_cube.build_cube(_combined_data, _metadata)
+
+# Macro x sector correlations at every month for a rolling/expanding window, shared read-only
+@instrumentation.cached(st.cache_resource)
+def load_correlation_history(data_hash, window, _combined_data, _metadata):
+    return correlation.correlation_history(
+        _combined_data, cycle_cube.MACRO_COLUMNS, cycle_cube.selected_columns(_metadata, 'Both'), window=window
+    )
+
+
+# Ranked strategies written by optimizer.py
+def load_leaderboard():
+    return data_layer.load_data("strategy_leaderboard")
 
 
 # Load data
-combined_data = load_data()
+combined_data = instrumentation.record_frame("combined_data", load_data())
 metadata = load_metadata()
+data_hash = dataset_version(data_layer.dataset_stamp("combined_data"))
+cube = load_cube(data_hash, combined_data, metadata)
 
 # Define columns from metadata
 etf_columns = metadata['ETF Columns']
@@ -56,57 +84,96 @@ cycle = st.selectbox('Select Economic Cycle', combined_data['Economic Cycle'].un
 data_type = st.radio('Select Data Type', ['ETFs', 'CRSP', 'Both'])
 
 # Filter columns based on selection
-if data_type == 'ETFs':
-    selected_columns = etf_columns
-elif data_type == 'CRSP':
-    selected_columns = crsp_columns
-else:
-    selected_columns = etf_columns + crsp_columns
+selected_columns = cycle_cube.selected_columns(metadata, data_type)
+cycle_stats = cube[data_type]
 
 # Show average returns for the selected economic cycle
-filtered_data = combined_data[combined_data['Economic Cycle'] == cycle]
 st.write(f"Average Returns by Sector for {cycle} ({data_type}):")
-st.bar_chart(filtered_data[selected_columns].mean())
+st.bar_chart(cycle_stats['mean'].loc[cycle])
 
 # Section 2: Correlation of Macro Indicators with Sectors
 st.header("Macro Indicators vs. Sector Returns")
 if st.checkbox("Show Correlation Heatmap"):
-    macro_correlation = combined_data[macro_columns + selected_columns].corr()
-    macro_to_sector_corr = macro_correlation.loc[macro_columns, selected_columns]
+    correlation_window = st.selectbox('Correlation Window', ['Full Sample'] + list(correlation.WINDOWS))
+    if correlation_window == 'Full Sample':
+        macro_to_sector_corr = cycle_stats['corr']
+    else:
+        history = load_correlation_history(
+            data_hash, correlation.WINDOWS[correlation_window], combined_data, metadata
+        )
+        as_of = st.select_slider('As of', options=list(history['dates']), value=history['dates'][-1],
+                                 format_func=lambda date: date.strftime('%Y-%m'))
+        macro_to_sector_corr = correlation.history_at(history, as_of, selected_columns)
 
     # Display heatmap
-    plt.figure(figsize=(12, 8))
-    sns.heatmap(macro_to_sector_corr, annot=True, cmap='coolwarm', fmt=".2f")
-    st.pyplot(plt)
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    with instrumentation.span("Correlation heatmap: figure"):
+        plt.figure(figsize=(12, 8))
+        sns.heatmap(macro_to_sector_corr, annot=True, cmap='coolwarm', fmt=".2f")
+    with instrumentation.span("Correlation heatmap: render"):
+        st.pyplot(plt)
 
 # Section 3: Hypothetical Portfolio Returns
 st.header("Hypothetical Portfolio Returns")
 
 # Define best sectors dynamically for the selected columns
-best_sectors = combined_data.groupby('Economic Cycle')[selected_columns].mean().idxmax(axis=1).to_dict()
-
-portfolio_returns = combined_data.apply(
-    lambda row: row[best_sectors[row['Economic Cycle']]] if row['Economic Cycle'] in best_sectors else 0,
-    axis=1
-).cumsum()
-
-st.line_chart(portfolio_returns)
-st.write(f"This portfolio invests in the best-performing {data_type} sector for each economic cycle.")
+best_sectors = cycle_stats['best']
+
+# Hold the best sector of the current cycle: chosen on the full sample (in-sample)
+# and from earlier months only (walk-forward)
+with instrumentation.span("Portfolio returns: backtest"):
+    in_sample_weights = backtest.cycle_signal(combined_data['Economic Cycle'], best_sectors, selected_columns)
+    walk_forward_weights = backtest.top_k_weights(
+        backtest.walk_forward_scores(combined_data[selected_columns], combined_data['Economic Cycle'])
+    )
+    portfolio_returns = pd.DataFrame({
+        'In-Sample': backtest.portfolio_returns(combined_data[selected_columns], in_sample_weights)['Cumulative Return'],
+        'Walk-Forward': backtest.portfolio_returns(combined_data[selected_columns], walk_forward_weights)['Cumulative Return'],
+    })
+
+with instrumentation.span("Portfolio returns: render"):
+    st.line_chart(portfolio_returns)
+st.write(f"This portfolio invests in the best-performing {data_type} sector for each economic cycle. "
+         "The walk-forward line picks that sector using only the months before each date.")
+
+# Section: Optimized Strategies
+st.header("Optimized Rotation Strategies")
+try:
+    leaderboard = load_leaderboard()
+except FileNotFoundError:
+    st.info("Run `python optimizer.py` to search regime thresholds, lookbacks, top-k and weighting schemes.")
+else:
+    candidates = leaderboard[leaderboard['Data Type'] == data_type]
+    top_n = st.slider('Strategies to show', min_value=5, max_value=50, value=10, step=5)
+    st.dataframe(candidates.head(top_n))
+
+    rank = st.selectbox('Strategy to plot (rank)', candidates.index[:top_n])
+    with instrumentation.span("Optimized strategy: backtest"):
+        optimized_weights = optimizer.candidate_weights(combined_data[selected_columns], combined_data, candidates.loc[rank])
+        portfolio_returns['Optimized'] = backtest.portfolio_returns(
+            combined_data[selected_columns], optimized_weights, optimizer.COST_BPS
+        )['Cumulative Return']
+    st.line_chart(portfolio_returns[['Walk-Forward', 'Optimized']])
+    st.write("Strategies are ranked by out-of-sample Sharpe ratio before the holdout period; "
+             "the holdout columns show how each did on the final months it was not ranked on.")
 
 # Section 4: Explore Data
 st.header("Explore Data")
 st.write("Full dataset:")
-st.dataframe(combined_data)
+with instrumentation.span("Explore data: render"):
+    st.dataframe(combined_data)
 
 # Section: Best and Worst Performing Sectors
 st.header("Best and Worst Performing Sectors by Economic Cycle")
 
-# Calculate average returns for each cycle
-average_returns = combined_data.groupby('Economic Cycle')[etf_columns + crsp_columns].mean()
+# Average returns for each cycle
+average_returns = cube['Both']['mean']
 
-# Identify the best and worst sectors for each cycle
-best_sectors = average_returns.idxmax(axis=1).to_dict()
-worst_sectors = average_returns.idxmin(axis=1).to_dict()
+# Best and worst sectors for each cycle
+best_sectors = cube['Both']['best']
+worst_sectors = cube['Both']['worst']
 
 # Display the average returns table
 st.subheader("Average Sector Returns by Economic Cycle")
@@ -134,14 +201,20 @@ economic_cycles.dropna(subset=['Cycle Code'], inplace=True)
 
 # Plot transitions
 if st.checkbox("Show Economic Cycle Transitions"):
-    plt.figure(figsize=(12, 6))
-    plt.plot(economic_cycles.index, economic_cycles['Cycle Code'], drawstyle='steps-post', label="Economic Cycle")
-    plt.axhline(y=0, color='gray', linestyle='--', linewidth=0.5, label='Neutral')
-    plt.axhline(y=1, color='green', linestyle='--', linewidth=0.5, label='Expansion')
-    plt.axhline(y=-1, color='red', linestyle='--', linewidth=0.5, label='Contraction')
-    plt.title("Economic Cycle Transitions")
-    plt.xlabel("Date")
-    plt.ylabel("Economic Cycle")
-    plt.yticks([-1, 0, 1], ['Contraction', 'Neutral', 'Expansion'])
-    plt.legend()
-    st.pyplot(plt)
+    import matplotlib.pyplot as plt
+
+    with instrumentation.span("Cycle transitions: figure"):
+        plt.figure(figsize=(12, 6))
+        plt.plot(economic_cycles.index, economic_cycles['Cycle Code'], drawstyle='steps-post', label="Economic Cycle")
+        plt.axhline(y=0, color='gray', linestyle='--', linewidth=0.5, label='Neutral')
+        plt.axhline(y=1, color='green', linestyle='--', linewidth=0.5, label='Expansion')
+        plt.axhline(y=-1, color='red', linestyle='--', linewidth=0.5, label='Contraction')
+        plt.title("Economic Cycle Transitions")
+        plt.xlabel("Date")
+        plt.ylabel("Economic Cycle")
+        plt.yticks([-1, 0, 1], ['Contraction', 'Neutral', 'Expansion'])
+        plt.legend()
+    with instrumentation.span("Cycle transitions: render"):
+        st.pyplot(plt)
+
+instrumentation.diagnostics_panel()
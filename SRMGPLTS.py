@@ -1,16 +1,178 @@
+import math
+
 import streamlit as st
+import numpy as np
 import pandas as pd
 import plotly.express as px
 
-# Load the data
-@st.cache_data
-def load_data():
-    return pd.read_csv(
-        "C:/Users/Zachary Cheney/OneDrive - University of Arkansas/Fall 2024/advanced financial modeling/Hello-world/Personal_AVF_Project/features.csv",
-        index_col=0,
-        skiprows=1  # Skip the comment row
+import data_layer
+
+# Large-universe rendering limits
+SCATTER_POINT_LIMIT = 2000  # Scatter plots above this many points are downsampled or binned
+BAR_CHART_LIMIT = 50        # Per-category bar charts show at most this many stocks
+HISTOGRAM_BINS = 40
+TICKERS_PER_PAGE = 50
+
+# Load the data (memory-mapped snapshot shared with the other dashboards)
+def load_data(columns=None):
+    return data_layer.load_data("features", columns)
+
+# Filtered data and figures are cached by filter state, so reruns with the same
+# filters reuse them instead of rebuilding (shared by all sessions in shared_data mode)
+@data_layer.derived_cache()
+def filter_data(categories, min_weighted_score):
+    features = load_data()
+    return features[
+        (features['Category'].isin(categories)) &
+        (features['Weighted Score'] >= min_weighted_score)
+    ]
+
+def downsample(data, limit=SCATTER_POINT_LIMIT):
+    """
+    Keep the top stocks by Adjusted Weighted Score and a fixed random sample of the rest.
+    """
+    if len(data) <= limit:
+        return data
+    top = data.nlargest(limit // 10, "Adjusted Weighted Score")
+    rest = data.drop(top.index).sample(limit - len(top), random_state=0)
+    return pd.concat([top, rest])
+
+@data_layer.derived_cache()
+def scatter_figure(categories, min_weighted_score, bubble_color, show_trend_line):
+    filtered_data = filter_data(categories, min_weighted_score)
+    plot_data = downsample(filtered_data)
+    title = "Growth Potential vs. Long-Term Stability"
+    if len(plot_data) < len(filtered_data):
+        title += f" ({len(plot_data):,} of {len(filtered_data):,} stocks shown)"
+    return px.scatter(
+        plot_data,
+        x="Growth Score",
+        y="Stability Score",
+        color=bubble_color,
+        size="Adjusted Weighted Score",
+        hover_name=plot_data.index,
+        title=title,
+        labels={"x": "Growth Score", "y": "Stability Score"},
+        trendline="ols" if show_trend_line else None,  # Add trend line if enabled
+        render_mode="webgl"
+    )
+
+@data_layer.derived_cache()
+def category_scatter_figure(categories, min_weighted_score, category):
+    filtered_data = filter_data(categories, min_weighted_score)
+    category_data = filtered_data[filtered_data["Category"] == category]
+    if len(category_data) > SCATTER_POINT_LIMIT:
+        # Bin large categories on the server instead of sending every point
+        return px.density_heatmap(
+            category_data,
+            x="Growth Score",
+            y="Stability Score",
+            nbinsx=HISTOGRAM_BINS,
+            nbinsy=HISTOGRAM_BINS,
+            title=f"Growth vs. Stability for {category} Stocks ({len(category_data):,} stocks, binned)",
+            labels={"x": "Growth Score", "y": "Stability Score"}
+        )
+    return px.scatter(
+        category_data,
+        x="Growth Score",
+        y="Stability Score",
+        color="Adjusted Weighted Score",
+        size="Adjusted Weighted Score",
+        hover_name=category_data.index,
+        title=f"Growth vs. Stability for {category} Stocks",
+        labels={"x": "Growth Score", "y": "Stability Score"},
+        render_mode="webgl"
+    )
+
+@data_layer.derived_cache()
+def histogram_figure(categories, min_weighted_score, column):
+    # Counts per bin are computed here, so the browser only receives the bars
+    filtered_data = filter_data(categories, min_weighted_score)
+    values = filtered_data[column].dropna()
+    edges = np.histogram_bin_edges(values, bins=HISTOGRAM_BINS) if len(values) else np.array([0.0, 1.0])
+    centers = (edges[:-1] + edges[1:]) / 2
+    bins = pd.DataFrame({column: [], "Count": [], "Category": []})
+    if len(filtered_data):
+        bins = pd.concat([
+            pd.DataFrame({column: centers, "Count": np.histogram(group[column].dropna(), bins=edges)[0], "Category": category})
+            for category, group in filtered_data.groupby("Category", observed=True)
+        ])
+    fig = px.bar(
+        bins,
+        x=column,
+        y="Count",
+        color="Category",
+        title=f"Distribution of {column}s by Category",
+        labels={"x": column, "y": "Count"}
+    )
+    fig.update_layout(bargap=0)
+    return fig
+
+@data_layer.derived_cache()
+def correlation_figure(categories, min_weighted_score):
+    filtered_data = filter_data(categories, min_weighted_score)
+    correlation_matrix = filtered_data[["Growth Score", "Stability Score", "Adjusted Weighted Score"]].corr()
+    return px.imshow(
+        correlation_matrix,
+        text_auto=True,
+        title="Correlation Between Growth, Stability, and Weighted Scores",
+        labels={"color": "Correlation"}
+    )
+
+@data_layer.derived_cache()
+def category_bar_figure(categories, min_weighted_score, category):
+    filtered_data = filter_data(categories, min_weighted_score)
+    category_data = filtered_data[filtered_data["Category"] == category]
+    title = f"{category} Stocks - Key Metrics"
+    if len(category_data) > BAR_CHART_LIMIT:
+        category_data = category_data.nlargest(BAR_CHART_LIMIT, "Adjusted Weighted Score")
+        title += f" (Top {BAR_CHART_LIMIT} by Adjusted Weighted Score)"
+    return px.bar(
+        category_data,
+        x=category_data.index,
+        y=["Growth Score", "Stability Score", "Adjusted Weighted Score"],
+        barmode="group",
+        title=title,
+        labels={"value": "Score", "variable": "Metric"}
+    )
+
+def ticker_selector(available_stocks):
+    """
+    Searchable, paginated ticker picker; the selection persists across pages in session state.
+    """
+    if "selected_stocks" not in st.session_state:
+        st.session_state.selected_stocks = []
+
+    search = st.text_input("Search tickers:", value="").strip().upper()
+    matches = available_stocks[available_stocks.str.contains(search, regex=False)] if search else available_stocks
+    n_pages = max(1, math.ceil(len(matches) / TICKERS_PER_PAGE))
+    page_number = st.number_input(f"Page (of {n_pages})", min_value=1, max_value=n_pages, value=1, step=1)
+    options = matches[(page_number - 1) * TICKERS_PER_PAGE:page_number * TICKERS_PER_PAGE].tolist()
+
+    # One widget per search and page, seeded from the selection only when first shown, so
+    # Streamlit keeps its state between reruns instead of resetting it to a new default
+    key = f"tickers_{search}_{page_number}"
+    if key not in st.session_state:
+        st.session_state[key] = [ticker for ticker in st.session_state.selected_stocks if ticker in options]
+    page_selection = st.multiselect(
+        f"Select stocks from the dropdown ({len(matches):,} matches):",
+        options=options,
+        key=key
     )
 
+    # Keep choices made on other pages and replace this page's choices
+    st.session_state.selected_stocks = [
+        ticker for ticker in st.session_state.selected_stocks if ticker not in options
+    ] + page_selection
+    if st.session_state.selected_stocks:
+        st.button("Clear selection", on_click=clear_selection)
+    return st.session_state.selected_stocks
+
+def clear_selection():
+    st.session_state.selected_stocks = []
+    for key in [key for key in st.session_state if str(key).startswith("tickers_")]:
+        del st.session_state[key]
+
 # Main app function
 def main():
     st.set_page_config(page_title="Stock Scoring Dashboard", layout="wide")
@@ -21,9 +183,9 @@ def main():
     page = st.sidebar.radio(
         "Go to",
         [
-            "Stock Selection", 
-            "Top Ranked Stocks", 
-            "Growth vs. Stability Scores", 
+            "Stock Selection",
+            "Top Ranked Stocks",
+            "Growth vs. Stability Scores",
             "Category Comparison"
         ]
     )
@@ -46,37 +208,34 @@ def main():
     )
 
     # Apply filters
-    filtered_data = features[
-        (features['Category'].isin(category_filter)) & 
-        (features['Weighted Score'] >= min_weighted_score)
-    ]
+    filter_state = (tuple(category_filter), min_weighted_score)
+    filtered_data = filter_data(*filter_state)
 
     # Page 1: Stock Selection
     if page == "Stock Selection":
         st.subheader("Stock Selection")
 
-        # Dropdown for default stock selection
-        available_stocks = features.index.tolist()
-        selected_stocks_dropdown = st.multiselect(
-            "Select stocks from the dropdown:",
-            options=available_stocks,
-            default=available_stocks
-        )
+        # Paginated, searchable ticker selection
+        selected_stocks = ticker_selector(features.index.to_series())
 
         # Text input for custom stock tickers
         st.write("Alternatively, you can enter custom stock tickers (comma-separated):")
-        default_tickers = ",".join(selected_stocks_dropdown)
         custom_stock_input = st.text_input(
             "Enter custom stock tickers:",
-            value=default_tickers
+            value=""
         )
 
         # Process user-provided stocks
-        selected_stocks = [ticker.strip().upper() for ticker in custom_stock_input.split(",")]
-        filtered_features = filtered_data[filtered_data.index.isin(selected_stocks)]
-
-        st.success(f"{len(filtered_features)} stocks selected.")
-        st.write("Here are the selected stocks:")
+        selected_stocks = selected_stocks + [
+            ticker.strip().upper() for ticker in custom_stock_input.split(",") if ticker.strip()
+        ]
+        if selected_stocks:
+            filtered_features = filtered_data[filtered_data.index.isin(selected_stocks)]
+            st.success(f"{len(filtered_features)} stocks selected.")
+            st.write("Here are the selected stocks:")
+        else:
+            filtered_features = filtered_data
+            st.info(f"No stocks selected; showing all {len(filtered_features):,} stocks that pass the filters.")
         st.dataframe(filtered_features)
 
     # Page 2: Top Ranked Stocks
@@ -114,36 +273,14 @@ def main():
 
         # Section 1: Main Scatter Plot
         st.write("### Overall Growth vs. Stability Scores")
-        fig = px.scatter(
-            filtered_data,
-            x="Growth Score",
-            y="Stability Score",
-            color=bubble_color,
-            size="Adjusted Weighted Score",
-            hover_name=filtered_data.index,
-            title="Growth Potential vs. Long-Term Stability",
-            labels={"x": "Growth Score", "y": "Stability Score"},
-            trendline="ols" if show_trend_line else None  # Add trend line if enabled
-        )
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(scatter_figure(*filter_state, bubble_color, show_trend_line), use_container_width=True)
 
         # Section 2: Separate Scatter Plots for Each Category
         st.write("### Category-Specific Growth vs. Stability")
         categories = filtered_data["Category"].unique()
         for category in categories:
             st.write(f"#### {category} Stocks")
-            category_data = filtered_data[filtered_data["Category"] == category]
-            fig = px.scatter(
-                category_data,
-                x="Growth Score",
-                y="Stability Score",
-                color="Adjusted Weighted Score",
-                size="Adjusted Weighted Score",
-                hover_name=category_data.index,
-                title=f"Growth vs. Stability for {category} Stocks",
-                labels={"x": "Growth Score", "y": "Stability Score"}
-            )
-            st.plotly_chart(fig, use_container_width=True)
+            st.plotly_chart(category_scatter_figure(*filter_state, category), use_container_width=True)
 
         # Section 3: Top Performers and Outliers
         st.write("### Top Performers and Outliers")
@@ -157,42 +294,21 @@ def main():
         # Section 4: Distribution of Scores
         st.write("### Score Distributions")
         st.write("#### Distribution of Growth Scores")
-        fig = px.histogram(
-            filtered_data,
-            x="Growth Score",
-            color="Category",
-            title="Distribution of Growth Scores by Category",
-            labels={"x": "Growth Score", "y": "Count"}
-        )
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(histogram_figure(*filter_state, "Growth Score"), use_container_width=True)
 
         st.write("#### Distribution of Stability Scores")
-        fig = px.histogram(
-            filtered_data,
-            x="Stability Score",
-            color="Category",
-            title="Distribution of Stability Scores by Category",
-            labels={"x": "Stability Score", "y": "Count"}
-        )
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(histogram_figure(*filter_state, "Stability Score"), use_container_width=True)
 
         # Section 5: Correlation Analysis
         st.write("### Correlation Between Metrics")
-        correlation_matrix = filtered_data[["Growth Score", "Stability Score", "Adjusted Weighted Score"]].corr()
-        fig = px.imshow(
-            correlation_matrix,
-            text_auto=True,
-            title="Correlation Between Growth, Stability, and Weighted Scores",
-            labels={"color": "Correlation"}
-        )
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(correlation_figure(*filter_state), use_container_width=True)
 
     # Page 4: Category Comparison
     elif page == "Category Comparison":
         st.subheader("Category Comparison")
 
         # Summary statistics for each category
-        summary_stats = filtered_data.groupby("Category").mean()[["Growth Score", "Stability Score", "Adjusted Weighted Score"]]
+        summary_stats = filtered_data.groupby("Category", observed=True)[["Growth Score", "Stability Score", "Adjusted Weighted Score"]].mean()
         st.write("**Summary Statistics by Category:**")
         st.dataframe(summary_stats)
 
@@ -212,16 +328,7 @@ def main():
         st.write("**Detailed Charts for Each Category:**")
         for category in filtered_data["Category"].unique():
             st.write(f"**{category} Stocks:**")
-            category_data = filtered_data[filtered_data["Category"] == category]
-            fig = px.bar(
-                category_data,
-                x=category_data.index,
-                y=["Growth Score", "Stability Score", "Adjusted Weighted Score"],
-                barmode="group",
-                title=f"{category} Stocks - Key Metrics",
-                labels={"value": "Score", "variable": "Metric"}
-            )
-            st.plotly_chart(fig, use_container_width=True)
+            st.plotly_chart(category_bar_figure(*filter_state, category), use_container_width=True)
 
 if __name__ == "__main__":
     main()
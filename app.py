@@ -0,0 +1,38 @@
+import streamlit as st
+
+import data_layer
+
+# Single entry point for the dashboards: streamlit run app.py
+#
+# Each dashboard is a page script that only runs when selected, so plotly,
+# matplotlib and the datasets are imported and loaded on first visit to the
+# page that needs them rather than at startup. All pages share data_layer's
+# caches. The scripts can still be run on their own.
+
+
+def home():
+    st.title("Financial Dashboards")
+    st.write(
+        """
+        Valuation, stock scoring and sector rotation dashboards in one app.
+        Pick a dashboard in the sidebar.
+        """
+    )
+    image = data_layer.load_image("home_image")
+    if image is not None:
+        st.image(image, width="stretch")
+
+    st.page_link(valuation_page, label="Stock Valuation: DCF, CCA and DDM models")
+    st.page_link(scoring_page, label="Stock Scoring: ranked universe by category")
+    st.page_link(rotation_page, label="Sector Rotation: sector returns by economic cycle")
+
+
+valuation_page = st.Page("Streamlit.py", title="Stock Valuation", url_path="valuation")
+scoring_page = st.Page("SRMGPLTS.py", title="Stock Scoring", url_path="scoring")
+rotation_page = st.Page("Group_FDA_Project.py", title="Sector Rotation", url_path="sector-rotation")
+
+navigation = st.navigation({
+    "Home": [st.Page(home, title="Home", default=True)],
+    "Dashboards": [valuation_page, scoring_page, rotation_page],
+})
+navigation.run()
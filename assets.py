@@ -0,0 +1,36 @@
+import os
+
+import config
+
+
+def resized_image(path, width, cache_dir):
+    """
+    Path to a copy of the image scaled down to `width` pixels, rebuilt only when the source changes.
+
+    Returns None if the source image doesn't exist.
+    """
+    if not os.path.exists(path):
+        return None
+    name, extension = os.path.splitext(os.path.basename(path))
+    cached_path = os.path.join(cache_dir, f"{name}_{width}w{extension}")
+    if os.path.exists(cached_path) and os.path.getmtime(cached_path) >= os.path.getmtime(path):
+        return cached_path
+
+    from PIL import Image  # Only needed when the cached copy is missing or stale
+
+    os.makedirs(cache_dir, exist_ok=True)
+    with Image.open(path) as image:
+        if image.width > width:
+            image = image.resize((width, round(image.height * width / image.width)), Image.LANCZOS)
+        image.save(cached_path)
+    return cached_path
+
+
+def image(key):
+    """
+    Resized copy of a configured image asset (see app_config.json), or None if it isn't available.
+    """
+    entry = config.asset(key)
+    if entry is None:
+        return None
+    return resized_image(entry["path"], entry.get("width", 1200), config.data_path("asset_cache_dir"))
@@ -0,0 +1,183 @@
+import numpy as np
+import pandas as pd
+
+TRANSACTION_COST_BPS = 0.0  # Cost per unit of turnover, in basis points
+
+
+def cycle_signal(cycles, sector_by_cycle, columns):
+    """
+    Weight matrix (date x sector) holding `sector_by_cycle[cycle]` at 100% each month.
+
+    Months whose cycle has no mapped sector hold nothing.
+    """
+    columns = list(columns)
+    position = pd.Series(cycles).map({cycle: columns.index(sector) for cycle, sector in sector_by_cycle.items()
+                                      if sector in columns})
+    held = position.notna().to_numpy()
+
+    weights = np.zeros((len(position), len(columns)))
+    weights[np.flatnonzero(held), position[held].astype(int).to_numpy()] = 1.0
+    return pd.DataFrame(weights, index=getattr(cycles, 'index', None), columns=columns)
+
+
+def walk_forward_moments(returns, cycles, min_periods=1, lookback=None):
+    """
+    Walk-forward mean and standard deviation of each sector's return within the current month's cycle.
+
+    Entry (t, s) uses the months before t with the same Economic Cycle label
+    as month t (only the last `lookback` of them if given); NaN until
+    `min_periods` such observations exist.
+    """
+    values = returns.fillna(0.0)
+    observed = returns.notna().astype(float)
+    cycles = pd.Series(np.asarray(cycles), index=returns.index)
+
+    # Running sums per cycle, up to and including each month
+    sums = values.groupby(cycles).cumsum()
+    squares = (values ** 2).groupby(cycles).cumsum()
+    counts = observed.groupby(cycles).cumsum()
+    if lookback:
+        # Keep the current month and the `lookback` same-cycle months before it
+        sums = sums - sums.groupby(cycles).shift(lookback + 1).fillna(0.0)
+        squares = squares - squares.groupby(cycles).shift(lookback + 1).fillna(0.0)
+        counts = counts - counts.groupby(cycles).shift(lookback + 1).fillna(0.0)
+    # Exclude the current month
+    sums, squares, counts = sums - values, squares - values ** 2, counts - observed
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean = sums / counts
+        variance = (squares - counts * mean ** 2) / (counts - 1)
+    std = np.sqrt(variance.clip(lower=0.0)).where(counts >= 2)
+    valid = counts >= min_periods
+    return mean.where(valid), std.where(valid)
+
+
+def walk_forward_scores(returns, cycles, min_periods=1, lookback=None):
+    """
+    Expanding-window mean return of each sector within the current month's cycle,
+    using only earlier months (no look-ahead).
+
+    Entry (t, s) is the average return of sector s over all months before t that
+    had the same Economic Cycle label as month t; NaN until `min_periods` such
+    observations exist.
+    """
+    return walk_forward_moments(returns, cycles, min_periods, lookback)[0]
+
+
+def top_k_weights(scores, k=1, scheme='equal', volatility=None):
+    """
+    Long-only weights in the top `k` sectors by score each month.
+
+    scheme: 'equal' splits evenly; 'inverse_volatility' weights by 1 / volatility
+    and 'sharpe' by score / volatility, floored at zero (`volatility` is a
+    date x sector frame aligned with `scores`).
+    """
+    values = scores.to_numpy(dtype=float)
+    ranks = (-np.nan_to_num(values, nan=-np.inf)).argsort(axis=1, kind='stable').argsort(axis=1, kind='stable')
+    chosen = (ranks < k) & ~np.isnan(values)
+
+    if scheme == 'equal':
+        raw = chosen.astype(float)
+    elif scheme == 'inverse_volatility':
+        with np.errstate(divide='ignore'):
+            inverse = 1.0 / volatility.to_numpy(dtype=float)
+        raw = np.where(chosen & np.isfinite(inverse), inverse, 0.0)
+    elif scheme == 'sharpe':
+        with np.errstate(divide='ignore', invalid='ignore'):
+            sharpe = values / volatility.to_numpy(dtype=float)
+        raw = np.where(chosen & np.isfinite(sharpe), np.clip(sharpe, 0.0, None), 0.0)
+    else:
+        raise ValueError(f"Unknown weighting scheme: {scheme}")
+
+    totals = raw.sum(axis=1, keepdims=True)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        weights = np.where(totals > 0, raw / totals, 0.0)
+    return pd.DataFrame(weights, index=scores.index, columns=scores.columns)
+
+
+def _turnover(weights):
+    """
+    Sum of absolute weight changes per period along the time axis (axis -2); the first period buys in.
+    """
+    previous = np.concatenate([np.zeros_like(weights[..., :1, :]), weights[..., :-1, :]], axis=-2)
+    return np.abs(weights - previous).sum(axis=-1)
+
+
+def portfolio_returns(returns, weights, cost_bps=TRANSACTION_COST_BPS):
+    """
+    Gross and net returns, turnover, costs and cumulative performance of a weight matrix.
+
+    Weights for month t are applied to month t's returns; missing returns count as 0.
+    """
+    weights = weights.reindex(index=returns.index, columns=returns.columns).fillna(0.0)
+    r = returns.fillna(0.0).to_numpy(dtype=float)
+    w = weights.to_numpy(dtype=float)
+
+    gross = (w * r).sum(axis=1)
+    turnover = _turnover(w)
+    costs = turnover * cost_bps / 10_000
+    net = gross - costs
+
+    return pd.DataFrame({
+        'Gross Return': gross,
+        'Turnover': turnover,
+        'Transaction Cost': costs,
+        'Net Return': net,
+        'Cumulative Return': net.cumsum(),
+        'Growth of $1': np.cumprod(1 + net),
+    }, index=returns.index)
+
+
+def batch_backtest(returns, weight_stack, cost_bps=TRANSACTION_COST_BPS, periods_per_year=12):
+    """
+    Backtest many strategy variants at once.
+
+    `weight_stack` is an array of shape (variants, dates, sectors) aligned with
+    `returns`; `cost_bps` is a scalar or one value per variant. Returns
+    (net returns as a date x variant frame, per-variant summary frame).
+    """
+    r = returns.fillna(0.0).to_numpy(dtype=float)
+    w = np.asarray(weight_stack, dtype=float)
+    cost = np.broadcast_to(np.asarray(cost_bps, dtype=float), (w.shape[0],))[:, None]
+
+    gross = np.einsum('vts,ts->vt', w, r)
+    turnover = _turnover(w)
+    net = gross - turnover * cost / 10_000
+
+    mean = net.mean(axis=1)
+    std = net.std(axis=1, ddof=1) if net.shape[1] > 1 else np.full(len(net), np.nan)
+    growth = np.cumprod(1 + net, axis=1)
+    drawdown = growth / np.maximum.accumulate(growth, axis=1) - 1
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        summary = pd.DataFrame({
+            'Total Return': growth[:, -1] - 1 if net.shape[1] else np.zeros(len(net)),
+            'Annualized Return': (1 + mean) ** periods_per_year - 1,
+            'Annualized Volatility': std * np.sqrt(periods_per_year),
+            'Sharpe Ratio': mean / std * np.sqrt(periods_per_year),
+            'Max Drawdown': drawdown.min(axis=1) if net.shape[1] else np.zeros(len(net)),
+            'Average Turnover': turnover.mean(axis=1),
+        })
+    return pd.DataFrame(net.T, index=returns.index), summary
+
+
+def walk_forward_variants(returns, cycles, top_k=(1, 2, 3), min_periods=(1, 6, 12, 24), cost_bps=(0.0, 10.0)):
+    """
+    Walk-forward best-sector-per-cycle strategies over a grid of parameters, backtested in one batch.
+
+    Returns (net returns as a date x variant frame, summary frame with the
+    parameters of each variant).
+    """
+    stacks = []
+    params = []
+    for periods in min_periods:
+        scores = walk_forward_scores(returns, cycles, periods)
+        for k in top_k:
+            weights = top_k_weights(scores, k).to_numpy()
+            for cost in cost_bps:
+                stacks.append(weights)
+                params.append({'Min Periods': periods, 'Top K': k, 'Cost (bps)': cost})
+
+    params = pd.DataFrame(params)
+    net, summary = batch_backtest(returns, np.stack(stacks), params['Cost (bps)'].to_numpy())
+    return net, pd.concat([params, summary], axis=1)
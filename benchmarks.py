@@ -0,0 +1,350 @@
+import argparse
+import datetime
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+import backtest
+import cycle_cube
+import snapshot
+import valuation
+import valuation_query
+
+MACRO_COLUMNS = ['GDP Growth', 'Unemployment Rate', 'Interest Rate', 'Inflation Rate']
+SECTORS = [
+    'Technology', 'Financials', 'Energy', 'Healthcare', 'Consumer Staples',
+    'Utilities', 'Materials', 'Industrials', 'Real Estate'
+]
+CATEGORIES = ['Growth-Focused', 'Stability-Focused', 'Balanced']
+
+DEFAULT_TICKERS = [10, 1_000, 10_000, 100_000]
+DEFAULT_YEARS = [25, 50, 100]
+REGRESSION_TOLERANCE = 1.25  # A case is a regression if it got 25% slower
+REGRESSION_FLOOR_SECONDS = 0.005  # ... and is not under this in both runs (timer noise)
+REGRESSION_MIN_REPEAT = 3  # Medians of fewer runs are not compared
+
+
+# Synthetic inputs with the exact schemas of the repo's CSV files
+
+def synthetic_tickers(n):
+    letters = np.array(list("ABCDEFGHIJKLMNOPQRSTUVWXYZ"))
+    digits = np.arange(n)
+    names = letters[digits % 26].astype(object)
+    for width in range(1, 4):
+        names = names + letters[(digits // 26 ** width) % 26].astype(object)
+    return pd.Index(names + pd.Series(digits).astype(str).str.zfill(len(str(n))).to_numpy(), name='Ticker')
+
+
+def synthetic_combined_data(years=25, sector_copies=1, seed=0):
+    """
+    combined_data.csv layout: month-end index, *_ETF/*_CRSP sector returns, macro columns, Economic Cycle.
+
+    `sector_copies` repeats the sector set to make wider panels (e.g. 55 copies for ~1000 columns).
+    """
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range('2000-01-31', periods=years * 12, freq=pd.offsets.MonthEnd())
+    sectors = [f"{sector}{'' if copy == 0 else f' {copy}'}" for copy in range(sector_copies) for sector in SECTORS]
+    etf_columns = [f"{sector}_ETF" for sector in sectors]
+    crsp_columns = [f"{sector}_CRSP" for sector in sectors]
+
+    data = pd.DataFrame(
+        rng.normal(0.005, 0.05, size=(len(dates), len(etf_columns) + len(crsp_columns))),
+        index=dates, columns=etf_columns + crsp_columns
+    )
+    data['GDP Growth'] = rng.normal(2.0, 2.5, len(dates))
+    data['Unemployment Rate'] = rng.normal(5.5, 1.5, len(dates))
+    data['Interest Rate'] = rng.normal(3.5, 1.0, len(dates))
+    data['Inflation Rate'] = rng.normal(0.2, 0.3, len(dates))
+    data['Economic Cycle'] = np.select(
+        [(data['GDP Growth'] > 0) & (data['Unemployment Rate'] < data['Unemployment Rate'].mean()), data['GDP Growth'] <= 0],
+        ['Expansion', 'Contraction'], default='Neutral'
+    )
+    return data, {'ETF Columns': etf_columns, 'CRSP Columns': crsp_columns}
+
+
+def synthetic_features(n_tickers, seed=0):
+    """
+    features.csv layout, indexed by Ticker.
+    """
+    rng = np.random.default_rng(seed)
+    features = pd.DataFrame({
+        'Volatility': rng.uniform(0.1, 0.7, n_tickers),
+        'Momentum': rng.uniform(-0.5, 0.5, n_tickers),
+        'ROA (Return on Assets)': rng.normal(0.05, 0.1, n_tickers),
+        'ROE (Return on Equity)': rng.normal(0.1, 0.3, n_tickers),
+        'Payout Ratio': rng.uniform(0, 1, n_tickers),
+        'Altman Z-Score': rng.normal(2, 2, n_tickers),
+        'Predicted Return': rng.normal(0.05, 0.05, n_tickers),
+        'Weighted Score': rng.normal(0.5, 0.5, n_tickers),
+    }, index=synthetic_tickers(n_tickers))
+    features['Rank'] = features['Weighted Score'].rank(ascending=False)
+    features['Growth Score'] = rng.uniform(0, 1, n_tickers)
+    features['Stability Score'] = rng.uniform(0, 1, n_tickers)
+    features['Adjusted Weighted Score'] = features['Weighted Score'].clip(lower=0) + 0.01
+    features['Category'] = rng.choice(CATEGORIES, n_tickers)
+    features['Top Stock'] = features['Rank'] <= 10
+    return features
+
+
+def synthetic_compustat(n_tickers, years=6, seed=0):
+    """
+    Compustat funda extract with the columns the valuation notebook pulls.
+    """
+    rng = np.random.default_rng(seed)
+    n = n_tickers * years
+    tickers = np.repeat(synthetic_tickers(n_tickers).to_numpy(), years)
+    return pd.DataFrame({
+        'gvkey': np.repeat(np.arange(n_tickers), years).astype(str),
+        'tic': tickers,
+        'datadate': np.tile(pd.date_range('2018-12-31', periods=years, freq=pd.offsets.YearEnd()), n_tickers),
+        'at': rng.uniform(1e3, 1e5, n),
+        'lt': rng.uniform(5e2, 5e4, n),
+        'ebit': rng.normal(1e3, 5e2, n),
+        'revt': rng.uniform(1e3, 1e5, n),
+        'ni': rng.normal(500, 400, n),
+        'oibdp': rng.normal(1.5e3, 7e2, n),
+        'capx': rng.uniform(0, 8e2, n),
+        'dvpsp_f': np.where(rng.uniform(size=n) < 0.5, rng.uniform(0.1, 3, n), 0.0),
+        'csho': rng.uniform(10, 1e4, n),
+        'prcc_f': rng.uniform(5, 500, n),
+        'che': rng.uniform(10, 1e4, n),
+        'naicsh': rng.choice([334111, 334413, 325412, 522110, 454110, 336111], n),
+    })
+
+
+def synthetic_valuation_results(n_tickers, seed=0):
+    """
+    final_valuation_results_with_prices.csv layout.
+    """
+    compustat = synthetic_compustat(n_tickers, seed=seed)
+    rng = np.random.default_rng(seed)
+    tickers = synthetic_tickers(n_tickers)
+    return valuation.value_universe(compustat, dict(zip(tickers, rng.uniform(5, 500, n_tickers))))
+
+
+# Timing
+
+def time_case(function, repeat=3):
+    """
+    Median and best wall time of `function()` over `repeat` runs.
+    """
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return {'median_seconds': statistics.median(times), 'min_seconds': min(times), 'repeat': repeat}
+
+
+def run_benchmarks(tickers=DEFAULT_TICKERS, years=DEFAULT_YEARS, sector_copies=1, repeat=3):
+    """
+    Time every data path on synthetic inputs; returns a list of result records.
+    """
+    results = []
+
+    def record(path, name, size, function):
+        timing = time_case(function, repeat)
+        results.append({'path': path, 'case': name, **size, **timing})
+        print(f"{path:<10} {name:<32} {json.dumps(size):<40} {timing['median_seconds']:.4f}s")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for n_years in years:
+            combined_data, metadata = synthetic_combined_data(n_years, sector_copies)
+            size = {'years': n_years, 'columns': combined_data.shape[1]}
+
+            # Load: CSV parse vs memory-mapped snapshot
+            csv_path = os.path.join(tmp, f"combined_data_{n_years}.csv")
+            arrow_path = os.path.join(tmp, f"combined_data_{n_years}.arrow")
+            combined_data.to_csv(csv_path)
+            snapshot.write_snapshot(combined_data, arrow_path, metadata)
+            record('load', 'combined_data csv', size, lambda: pd.read_csv(csv_path, index_col=0, parse_dates=True))
+            record('load', 'combined_data snapshot', size, lambda: snapshot.read_snapshot(arrow_path))
+            record('load', 'combined_data snapshot 1 column', size,
+                   lambda: snapshot.read_snapshot(arrow_path, ['GDP Growth']))
+
+            # Aggregate: per-cycle cube
+            record('aggregate', 'cycle cube', size, lambda: cycle_cube.build_cube(combined_data, metadata))
+
+            # Backtest: in-sample signal and walk-forward variant grid
+            sector_columns = metadata['ETF Columns'] + metadata['CRSP Columns']
+            best = combined_data.groupby('Economic Cycle', observed=True)[sector_columns].mean().idxmax(axis=1).to_dict()
+            record('backtest', 'in-sample best sector', size, lambda: backtest.portfolio_returns(
+                combined_data[sector_columns], backtest.cycle_signal(combined_data['Economic Cycle'], best, sector_columns)
+            ))
+            record('backtest', 'walk-forward variants', size, lambda: backtest.walk_forward_variants(
+                combined_data[sector_columns], combined_data['Economic Cycle']
+            ))
+
+        for n_tickers in tickers:
+            size = {'tickers': n_tickers}
+
+            # Load: features table
+            features = synthetic_features(n_tickers)
+            features_csv = os.path.join(tmp, f"features_{n_tickers}.csv")
+            features_arrow = os.path.join(tmp, f"features_{n_tickers}.arrow")
+            with open(features_csv, "w") as file:
+                file.write("# Stock Ranking Data - synthetic\n")
+                features.to_csv(file, float_format="%.2f")
+            snapshot.write_snapshot(features, features_arrow)
+            record('load', 'features csv', size, lambda: pd.read_csv(features_csv, index_col=0, skiprows=1))
+            record('load', 'features snapshot', size, lambda: snapshot.read_snapshot(features_arrow))
+
+            # Filter: features sidebar filter (the expression of SRMGPLTS.filter_data, which is
+            # defined inside the Streamlit script and can't be imported here)
+            categories = CATEGORIES[:2]
+            record('filter', 'features category/score', size, lambda: features[
+                features['Category'].isin(categories) & (features['Weighted Score'] >= 0.5)
+            ])
+
+            # Valuation: full batch from a Compustat extract
+            compustat = synthetic_compustat(n_tickers)
+            record('valuation', 'batch valuation', size, lambda: valuation.value_universe(compustat))
+
+            # Filter: valuation query layer (fresh instance so memoization does not hide the cost)
+            valuation_results = synthetic_valuation_results(n_tickers)
+            selection = valuation_results['Ticker'].iloc[::2].tolist()
+            record('filter', 'valuation select', size, lambda: valuation_query.ValuationQuery(
+                valuation_results).select(selection))
+            record('filter', 'valuation select + gap', size, lambda: valuation_query.ValuationQuery(
+                valuation_results).gap_analysis(selection))
+
+    return results
+
+
+# Cold start: each run is a fresh interpreter rendering the script's first page headlessly
+
+APP_SCRIPTS = {
+    'shell': ['app.py'],
+    'separate': ['Streamlit.py', 'SRMGPLTS.py', 'Group_FDA_Project.py'],
+}
+STARTUP_CODE = (
+    "import sys; from streamlit.testing.v1 import AppTest; "
+    "at = AppTest.from_file(sys.argv[1], default_timeout=300).run(); "
+    "sys.exit(1 if at.exception else 0)"
+)
+
+
+def time_startup(script, config_path):
+    start = time.perf_counter()
+    subprocess.run(
+        [sys.executable, "-c", STARTUP_CODE, os.path.join(os.path.dirname(os.path.abspath(__file__)), script)],
+        env={**os.environ, 'DASHBOARD_CONFIG': config_path}, check=True, capture_output=True
+    )
+    return time.perf_counter() - start
+
+
+def write_synthetic_app(directory, n_tickers=1_000, years=25, **config):
+    """
+    Write the dashboards' CSV datasets and a config pointing at them; returns the config path.
+    """
+    combined_data, metadata = synthetic_combined_data(years)
+    combined_data.to_csv(os.path.join(directory, "combined_data.csv"))
+    with open(os.path.join(directory, "combined_data_metadata.json"), "w") as f:
+        json.dump(metadata, f)
+    with open(os.path.join(directory, "features.csv"), "w") as file:
+        file.write("# Stock Ranking Data - synthetic\n")
+        synthetic_features(n_tickers).to_csv(file, float_format="%.2f")
+    synthetic_valuation_results(n_tickers).to_csv(os.path.join(directory, "final_valuation_results_with_prices.csv"), index=False)
+
+    config_path = os.path.join(directory, "app_config.json")
+    with open(config_path, "w") as f:
+        json.dump({'data_dirs': {name: directory for name in snapshot.DATASETS}, **config}, f)
+    return config_path
+
+
+def run_startup_benchmarks(n_tickers=1_000, years=25, repeat=3):
+    """
+    First-paint time of the app shell versus starting the three dashboards separately.
+
+    Needs streamlit (streamlit.testing) in the running interpreter.
+    """
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        config_path = write_synthetic_app(tmp, n_tickers, years)
+        for mode, scripts in APP_SCRIPTS.items():
+            size = {'tickers': n_tickers, 'years': years}
+            timing = time_case(lambda: sum(time_startup(script, config_path) for script in scripts), repeat)
+            results.append({'path': 'startup', 'case': f"first paint ({mode})", **size, **timing})
+            print(f"{'startup':<10} {'first paint (' + mode + ')':<32} {json.dumps(size):<40} {timing['median_seconds']:.4f}s")
+    return results
+
+
+def save_results(results, path):
+    report = {
+        'timestamp': datetime.datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'machine': platform.machine(),
+        'results': results,
+    }
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=2)
+    return report
+
+
+def compare(baseline_path, results, tolerance=REGRESSION_TOLERANCE, floor=REGRESSION_FLOOR_SECONDS,
+            min_repeat=REGRESSION_MIN_REPEAT):
+    """
+    Cases whose median time grew by more than `tolerance` versus a saved baseline run.
+
+    Cases under `floor` seconds in both runs, or timed fewer than `min_repeat`
+    times in either, are skipped: their ratios are mostly noise.
+    """
+    with open(baseline_path, 'r') as f:
+        baseline = json.load(f)['results']
+
+    def key(record):
+        return (record['path'], record['case'], tuple(sorted((k, record[k]) for k in ('years', 'columns', 'tickers') if k in record)))
+
+    previous = {key(record): record for record in baseline}
+    regressions = []
+    for record in results:
+        old = previous.get(key(record))
+        if not old or min(record['repeat'], old.get('repeat', 1)) < min_repeat:
+            continue
+        if max(record['median_seconds'], old['median_seconds']) < floor:
+            continue
+        if record['median_seconds'] > old['median_seconds'] * tolerance:
+            regressions.append({**record, 'baseline_seconds': old['median_seconds'],
+                                'slowdown': record['median_seconds'] / old['median_seconds']})
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time the dashboard and pipeline data paths on synthetic universes.")
+    parser.add_argument("--tickers", type=int, nargs="+", default=DEFAULT_TICKERS, help="Universe sizes")
+    parser.add_argument("--years", type=int, nargs="+", default=DEFAULT_YEARS, help="Panel lengths in years")
+    parser.add_argument("--sector-copies", type=int, default=1, help="Repeat the sector set to widen the panel")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per case")
+    parser.add_argument("--output", default="benchmark_results.json", help="Where to write this run")
+    parser.add_argument("--baseline", default=None, help="Earlier results JSON to check for regressions")
+    parser.add_argument("--startup", action="store_true", help="Also time cold start of the app shell vs separate apps")
+    args = parser.parse_args()
+
+    results = run_benchmarks(args.tickers, args.years, args.sector_copies, args.repeat)
+    if args.startup:
+        results += run_startup_benchmarks(repeat=args.repeat)
+    save_results(results, args.output)
+    print(f"Benchmark results saved to '{args.output}'")
+
+    if args.baseline:
+        regressions = compare(args.baseline, results)
+        for regression in regressions:
+            print(f"REGRESSION {regression['path']} {regression['case']}: "
+                  f"{regression['baseline_seconds']:.4f}s -> {regression['median_seconds']:.4f}s "
+                  f"({regression['slowdown']:.2f}x)")
+        if regressions:
+            raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,282 @@
+import argparse
+import datetime
+import glob
+import json
+import os
+import sqlite3
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# Union of the funda columns pulled by the FDA and AVF notebooks
+FUNDA_COLUMNS = [
+    'gvkey', 'tic', 'datadate', 'at', 'lt', 'ebit', 'revt', 'ni', 'oibdp', 'capx', 'dvpsp_f', 'dvt',
+    'csho', 'prcc_f', 'che', 'mkvalt', 'naicsh'
+]
+KEY_COLUMNS = ['gvkey', 'datadate']
+
+STORE_DIR = "compustat_store"
+WATERMARK_FILE = "watermark.json"
+START_DATE = '2018-01-01'
+RESTATEMENT_LOOKBACK_DAYS = 730  # Filings this close to the watermark are pulled again to catch restatements
+CHUNK_SIZE = 200_000
+
+FUNDA_QUERY = """
+    SELECT {columns}
+    FROM {table}
+    WHERE indfmt = 'INDL'
+      AND datafmt = 'STD'
+      AND popsrc = 'D'
+      AND consol = 'C'
+      AND datadate >= :since{ticker_filter}
+"""
+
+
+def fiscal_year(datadate):
+    """
+    Compustat fiscal year: fiscal years ending January-May belong to the previous calendar year.
+    """
+    datadate = pd.to_datetime(pd.Series(datadate))
+    return (datadate.dt.year - (datadate.dt.month <= 5)).to_numpy()
+
+
+def funda_query(since, tickers=None, table='comp.funda', columns=FUNDA_COLUMNS):
+    """
+    (query, params): the funda pull with the date and tickers as named bind parameters (:since, :tic0, ...).
+    """
+    params = {'since': str(since)}
+    ticker_filter = ""
+    if tickers is not None:
+        params.update({f"tic{i}": str(ticker) for i, ticker in enumerate(tickers)})
+        placeholders = ', '.join(f":tic{i}" for i in range(len(tickers)))
+        ticker_filter = f"\n      AND tic IN ({placeholders})" if tickers else "\n      AND 1 = 0"
+    return FUNDA_QUERY.format(columns=", ".join(columns), table=table, ticker_filter=ticker_filter), params
+
+
+def read_query(query, params, con, chunk_size):
+    """
+    Run a query with named (:name) parameters in chunks, on a sqlite3 connection or a SQLAlchemy engine.
+    """
+    if not isinstance(con, sqlite3.Connection):
+        from sqlalchemy import text  # Driver-independent named parameters (WRDS is PostgreSQL)
+        query = text(query)
+    return pd.read_sql(query, con, params=params, chunksize=chunk_size)
+
+
+# Watermark
+
+def load_watermark(store_dir=STORE_DIR):
+    path = os.path.join(store_dir, WATERMARK_FILE)
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+def save_watermark(watermark, store_dir=STORE_DIR):
+    os.makedirs(store_dir, exist_ok=True)
+    with open(os.path.join(store_dir, WATERMARK_FILE), 'w') as f:
+        json.dump(watermark, f, indent=2)
+
+
+def pull_plan(watermark, tickers=None, start_date=START_DATE, lookback_days=RESTATEMENT_LOOKBACK_DAYS):
+    """
+    The (since, tickers) queries needed to bring the store up to date.
+
+    Tickers already in the store are pulled from the watermark minus the
+    restatement look-back; tickers the store has never seen are pulled in full.
+    """
+    if watermark is None:
+        return [(start_date, tickers)]
+
+    since = (pd.Timestamp(watermark['datadate']) - pd.Timedelta(days=lookback_days)).strftime('%Y-%m-%d')
+    since = max(since, start_date)
+    stored = watermark['tickers']
+    if stored is None:
+        return [(since, tickers)]  # Every ticker has been extracted before
+    if tickers is None:
+        return [(start_date, None)]  # Only some tickers were extracted before
+
+    known = [ticker for ticker in tickers if ticker in set(stored)]
+    new = [ticker for ticker in tickers if ticker not in set(stored)]
+    return [plan for plan in [(since, known), (start_date, new)] if plan[1]]
+
+
+# Fiscal-year partitions
+
+def partition_path(store_dir, year):
+    return os.path.join(store_dir, f"fyear={int(year)}", "part.parquet")
+
+
+def partition_years(store_dir=STORE_DIR):
+    paths = glob.glob(os.path.join(store_dir, "fyear=*", "part.parquet"))
+    return sorted(int(os.path.basename(os.path.dirname(path)).split("=")[1]) for path in paths)
+
+
+def read_partition(store_dir, year, columns=None, tickers=None):
+    path = partition_path(store_dir, year)
+    if not os.path.exists(path):
+        return None
+    filters = [('tic', 'in', list(tickers))] if tickers is not None else None
+    return pq.read_table(path, columns=columns, filters=filters).to_pandas()
+
+
+def write_partition(df, store_dir, year):
+    """
+    Replace a partition; written to a temporary file first so readers never see a half-written file.
+    """
+    path = partition_path(store_dir, year)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    pq.write_table(pa.Table.from_pandas(df, preserve_index=False), path + ".tmp")
+    os.replace(path + ".tmp", path)
+
+
+def normalize(chunk, columns=FUNDA_COLUMNS):
+    """
+    Consistent types for a pulled chunk, whatever database it came from.
+    """
+    chunk = chunk.reindex(columns=columns).copy()
+    chunk['gvkey'] = chunk['gvkey'].astype(str)
+    chunk['tic'] = chunk['tic'].astype(str).str.upper().str.strip()
+    chunk['datadate'] = pd.to_datetime(chunk['datadate'])
+    numeric = [col for col in columns if col not in ('gvkey', 'tic', 'datadate')]
+    chunk[numeric] = chunk[numeric].apply(pd.to_numeric, errors='coerce').astype(float)
+    return chunk
+
+
+def merge_partition(existing, incoming):
+    """
+    Upsert `incoming` rows into a partition by (gvkey, datadate).
+
+    Returns (merged, new rows, restated rows); merged is None if nothing changed.
+    """
+    incoming = incoming.drop_duplicates(KEY_COLUMNS, keep='last')
+    if existing is None or existing.empty:
+        return incoming.sort_values(KEY_COLUMNS, ignore_index=True), len(incoming), 0
+
+    existing = existing.set_index(KEY_COLUMNS)
+    incoming = incoming.set_index(KEY_COLUMNS)
+    seen = incoming.index.isin(existing.index)
+
+    # Rows already stored count as restated only if a value differs
+    old = existing.reindex(incoming.index[seen])[incoming.columns]
+    new = incoming[seen]
+    differs = ~((old == new) | (old.isna() & new.isna())).all(axis=1).to_numpy()
+    n_new, n_restated = int((~seen).sum()), int(differs.sum())
+    if n_new == 0 and n_restated == 0:
+        return None, 0, 0
+
+    changed = pd.concat([new[differs], incoming[~seen]])
+    merged = pd.concat([existing.drop(changed.index, errors='ignore'), changed])
+    return merged.reset_index().sort_values(KEY_COLUMNS, ignore_index=True), n_new, n_restated
+
+
+def extract(con, store_dir=STORE_DIR, tickers=None, start_date=START_DATE, table='comp.funda',
+            lookback_days=RESTATEMENT_LOOKBACK_DAYS, chunk_size=CHUNK_SIZE):
+    """
+    Pull new or restated funda filings since the last run into the fiscal-year store.
+
+    `con` is anything pandas.read_sql accepts (the WRDS connection's engine, or
+    a sqlite3 connection from `local_connection` for offline runs). Chunks are
+    merged into their partitions as they arrive, so only one chunk is held in
+    memory. Returns a per-partition summary of new and restated rows.
+    """
+    watermark = load_watermark(store_dir)
+    if tickers is not None:
+        tickers = sorted({str(ticker).upper().strip() for ticker in tickers})
+
+    summary = {}
+    max_datadate = pd.Timestamp(watermark['datadate']) if watermark else None
+    for since, plan_tickers in pull_plan(watermark, tickers, start_date, lookback_days):
+        query, params = funda_query(since, plan_tickers, table)
+        for chunk in read_query(query, params, con, chunk_size):
+            if chunk.empty:
+                continue
+            chunk = normalize(chunk)
+            chunk_max = chunk['datadate'].max()
+            max_datadate = chunk_max if max_datadate is None else max(max_datadate, chunk_max)
+
+            for year, rows in chunk.groupby(fiscal_year(chunk['datadate'])):
+                merged, n_new, n_restated = merge_partition(read_partition(store_dir, year), rows)
+                if merged is not None:
+                    write_partition(merged, store_dir, year)
+                counts = summary.setdefault(int(year), {'new': 0, 'restated': 0})
+                counts['new'] += n_new
+                counts['restated'] += n_restated
+
+    stored_tickers = None
+    if tickers is not None and (watermark is None or watermark['tickers'] is not None):
+        stored_tickers = sorted(set(tickers) | set(watermark['tickers'] if watermark else []))
+    save_watermark({
+        'datadate': max_datadate.strftime('%Y-%m-%d') if max_datadate is not None else start_date,
+        'tickers': stored_tickers,
+        'updated': datetime.datetime.now().isoformat(timespec='seconds'),
+    }, store_dir)
+
+    return pd.DataFrame.from_dict(summary, orient='index', columns=['new', 'restated']).rename_axis('fyear')
+
+
+def read_store(store_dir=STORE_DIR, columns=None, years=None, tickers=None):
+    """
+    Filings from the store, reading only the requested columns, fiscal years and tickers.
+    """
+    years = partition_years(store_dir) if years is None else years
+    if columns is not None:
+        columns = list(dict.fromkeys(list(columns)))
+    if tickers is not None:
+        tickers = [str(ticker).upper().strip() for ticker in tickers]
+    frames = [read_partition(store_dir, year, columns, tickers) for year in years]
+    frames = [frame for frame in frames if frame is not None]
+    if not frames:
+        return pd.DataFrame(columns=columns or FUNDA_COLUMNS)
+    return pd.concat(frames, ignore_index=True)
+
+
+# Offline stand-in for WRDS
+
+def local_connection(path):
+    """
+    Open a SQLite file as a stand-in for WRDS, so `comp.funda` resolves offline.
+    """
+    con = sqlite3.connect(":memory:")
+    con.execute("ATTACH DATABASE ? AS comp", (path,))
+    return con
+
+
+def write_local_funda(funda, path, if_exists='append'):
+    """
+    Store funda rows as the funda table of a local stand-in database.
+
+    Missing indfmt/datafmt/popsrc/consol columns are filled with the standard filter values.
+    """
+    funda = funda.assign(datadate=pd.to_datetime(funda['datadate']).dt.strftime('%Y-%m-%d'))
+    for column, value in {'indfmt': 'INDL', 'datafmt': 'STD', 'popsrc': 'D', 'consol': 'C'}.items():
+        if column not in funda.columns:
+            funda[column] = value
+    for column in FUNDA_COLUMNS:
+        if column not in funda.columns:
+            funda[column] = np.nan
+    with sqlite3.connect(path) as con:
+        funda.to_sql('funda', con, if_exists=if_exists, index=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Incrementally extract Compustat funda into a fiscal-year store.")
+    parser.add_argument("--store", default=STORE_DIR, help="Store directory")
+    parser.add_argument("--tickers", nargs="*", default=None, help="Only these tickers (default: all)")
+    parser.add_argument("--sqlite", default=None, help="Local SQLite file with a funda table instead of WRDS")
+    parser.add_argument("--start-date", default=START_DATE, help="Earliest datadate on the first run")
+    args = parser.parse_args()
+
+    if args.sqlite:
+        con = local_connection(args.sqlite)
+    else:
+        import wrds
+        con = wrds.Connection().engine
+    print(extract(con, args.store, args.tickers, args.start_date))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+import json
+import os
+
+# Data locations and static assets for the dashboards. Edit app_config.json
+# (or point DASHBOARD_CONFIG at another file) instead of hardcoding paths.
+CONFIG_FILE = os.environ.get("DASHBOARD_CONFIG", os.path.join(os.path.dirname(os.path.abspath(__file__)), "app_config.json"))
+
+DEFAULT_CONFIG = {
+    "data_dirs": {"valuation_results": ".", "features": ".", "combined_data": ".", "strategy_leaderboard": "."},
+    "dcf_bands": "dcf_sensitivity/dcf_percentiles.csv",
+    "asset_cache_dir": ".asset_cache",
+    # Static images by key, e.g. {"home_image": {"path": "assets/home.webp", "width": 1200}};
+    # relative paths are taken from the config file's directory
+    "assets": {},
+    "live_quotes": {"source": "yfinance", "throttle_seconds": 2.0},  # "simulated": random walk, for demos and tests
+    "serving": {"shared_data": False},  # True also turns on pandas copy-on-write for the process (pandas < 3)
+}
+
+_config = None
+
+
+def load_config(path=CONFIG_FILE):
+    """
+    The dashboard config: DEFAULT_CONFIG overlaid with the JSON file at `path`, if it exists.
+    """
+    config = {key: (dict(value) if isinstance(value, dict) else value) for key, value in DEFAULT_CONFIG.items()}
+    if os.path.exists(path):
+        with open(path, 'r') as f:
+            for key, value in json.load(f).items():
+                if isinstance(value, dict) and isinstance(config.get(key), dict):
+                    config[key].update(value)
+                else:
+                    config[key] = value
+    config["base_dir"] = os.path.dirname(os.path.abspath(path))
+    return config
+
+
+def get_config():
+    global _config
+    if _config is None:
+        _config = load_config()
+    return _config
+
+
+def resolve(path):
+    """
+    Absolute path; relative paths are taken from the config file's directory.
+    """
+    path = os.path.expanduser(path)
+    return path if os.path.isabs(path) else os.path.join(get_config()["base_dir"], path)
+
+
+def data_dir(name):
+    """
+    Directory holding the CSV (and snapshot) of a dataset in snapshot.DATASETS.
+    """
+    return resolve(get_config()["data_dirs"].get(name, "."))
+
+
+def data_path(key):
+    return resolve(get_config()[key])
+
+
+def asset(key):
+    """
+    Config entry of a static asset: {'path': ..., 'width': ...}, or None if not configured.
+    """
+    entry = get_config()["assets"].get(key)
+    if entry is None:
+        return None
+    return {**entry, "path": resolve(entry["path"])}
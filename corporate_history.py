@@ -0,0 +1,227 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+import peer_index
+
+HISTORY_DIR = "corporate_history"
+HISTORY_FILE = "history.csv"  # Long format, appended to; the last row of a (Ticker, Metric, Date) wins
+LATEST_FILE = "latest.csv"  # One row per (Ticker, Metric), rewritten on every append
+RESTATEMENT_DAYS = 730  # Stored rows this recent can be restated (compustat_store re-pulls them)
+
+HISTORY_COLUMNS = ['Ticker', 'Date', 'Metric', 'Value']
+LATEST_COLUMNS = ['Ticker', 'Metric', 'Date', 'Value', 'Rows', 'Sum', 'Count']
+KEY_COLUMNS = ['Ticker', 'Metric']
+ROW_KEY = ['Ticker', 'Metric', 'Date']
+
+# Metrics whose period-over-period growth is stored as a metric of its own
+GROWTH_METRICS = {'FCF': 'FCF Growth', 'Dividend': 'Dividend Growth'}
+
+
+def fundamentals_long(compustat_data):
+    """
+    FCF, P/E and EV/EBITDA of every Compustat filing as long rows (Ticker, Date, Metric, Value).
+    """
+    multiples = peer_index.peer_multiples(compustat_data)
+    wide = pd.DataFrame({
+        'Ticker': multiples['tic'],
+        'Date': multiples['datadate'],
+        'FCF': compustat_data['oibdp'] - compustat_data['capx'],
+        'P/E': multiples['P/E'],
+        'EV/EBITDA': multiples['EV/EBITDA'],
+    })
+    return wide.melt(id_vars=['Ticker', 'Date'], var_name='Metric', value_name='Value')[HISTORY_COLUMNS]
+
+
+def dividends_long(dividends_data):
+    """
+    Dividend payments as long rows; `dividends_data` maps ticker -> Series of dividends indexed by date.
+    """
+    series = {ticker: dividends for ticker, dividends in dividends_data.items() if len(dividends)}
+    if not series:
+        return pd.DataFrame(columns=HISTORY_COLUMNS)
+    stacked = pd.concat(series, names=['Ticker', 'Date']).rename('Value').reset_index()
+    dates = pd.to_datetime(stacked['Date'], utc=True)
+    return stacked.assign(
+        Date=dates.dt.tz_localize(None).dt.normalize(),
+        Metric='Dividend',
+        Value=pd.to_numeric(stacked['Value'], errors='coerce'),
+    )[HISTORY_COLUMNS]
+
+
+def with_growth(rows, latest=None):
+    """
+    Add growth rows (pct_change within each ticker) for the GROWTH_METRICS in `rows`.
+
+    The first new value of a ticker grows from its last stored value in
+    `latest`, so appending in pieces gives the same growth as one pass.
+    """
+    values = rows[rows['Metric'].isin(list(GROWTH_METRICS))]
+    series = values.assign(stored=False)
+    if latest is not None and len(latest):
+        previous = latest.loc[latest['Metric'].isin(list(GROWTH_METRICS)), HISTORY_COLUMNS]
+        series = pd.concat([previous.assign(stored=True), series], ignore_index=True)
+    series = series.sort_values(['Ticker', 'Metric', 'Date'], kind='stable', ignore_index=True)
+
+    prior = series.groupby(KEY_COLUMNS, sort=False)['Value'].shift()
+    with np.errstate(divide='ignore', invalid='ignore'):
+        growth = series['Value'] / prior - 1
+    growth_rows = series.assign(Metric=series['Metric'].map(GROWTH_METRICS), Value=growth)
+    growth_rows = growth_rows[~growth_rows['stored'].to_numpy(dtype=bool)][HISTORY_COLUMNS]
+    return pd.concat([rows, growth_rows], ignore_index=True)
+
+
+def update_latest(latest, rows):
+    """
+    Fold appended rows into the per-(Ticker, Metric) snapshot: last date and value, row count and running sum.
+    """
+    rows = rows.sort_values(['Ticker', 'Metric', 'Date'], kind='stable')
+    grouped = rows.groupby(KEY_COLUMNS)
+    added = pd.DataFrame({
+        'Date': grouped['Date'].last(),
+        'Value': grouped['Value'].last(),
+        'Rows': grouped.size(),
+        'Sum': grouped['Value'].sum(),
+        'Count': grouped['Value'].count(),
+    })
+    if latest is None or latest.empty:
+        return added.reset_index()[LATEST_COLUMNS]
+
+    latest = latest.set_index(KEY_COLUMNS)
+    merged = added.combine_first(latest)
+    totals = ['Rows', 'Sum', 'Count']
+    merged[totals] = latest[totals].reindex(merged.index, fill_value=0) + added[totals].reindex(merged.index, fill_value=0)
+    return merged.reset_index()[LATEST_COLUMNS]
+
+
+def read_latest(history_dir=HISTORY_DIR):
+    """
+    The latest-value snapshot, with the 'Average' of every metric over its whole history
+    (for the growth metrics, the average growth rate).
+    """
+    path = os.path.join(history_dir, LATEST_FILE)
+    if not os.path.exists(path):
+        return pd.DataFrame(columns=LATEST_COLUMNS + ['Average'])
+    latest = pd.read_csv(path, parse_dates=['Date'], float_precision='round_trip')
+    with np.errstate(divide='ignore', invalid='ignore'):
+        latest['Average'] = latest['Sum'] / latest['Count']
+    return latest
+
+
+def _keys(frame, columns=KEY_COLUMNS):
+    return pd.MultiIndex.from_frame(frame[columns])
+
+
+def _changed(rows, stored):
+    """
+    The rows whose value differs from (or is missing in) `stored`, matched on (Ticker, Metric, Date).
+    """
+    compared = rows.merge(stored[ROW_KEY + ['Value']], on=ROW_KEY, how='left', suffixes=('', ' Stored'), indicator=True)
+    same = (compared['_merge'] == 'both') & (
+        (compared['Value'] == compared['Value Stored']) | (compared['Value'].isna() & compared['Value Stored'].isna())
+    )
+    return rows[~same.to_numpy()]
+
+
+def _restate(rows, history_dir):
+    """
+    Recompute whole series for restated (Ticker, Metric) keys.
+
+    Returns (rows to append: changed values and growth rows, latest rows of those series).
+    """
+    metrics = set(rows['Metric']) | {GROWTH_METRICS[metric] for metric in set(rows['Metric']) & set(GROWTH_METRICS)}
+    stored = read_history(history_dir, metrics=metrics, tickers=rows['Ticker'].unique())
+    base_keys = _keys(rows).unique()
+    growth_keys = pd.MultiIndex.from_tuples(
+        [(ticker, GROWTH_METRICS[metric]) for ticker, metric in base_keys if metric in GROWTH_METRICS], names=KEY_COLUMNS
+    )
+    stored = stored[_keys(stored).isin(base_keys.append(growth_keys))]
+
+    series = pd.concat([stored[_keys(stored).isin(base_keys)], rows], ignore_index=True)
+    series = series.drop_duplicates(ROW_KEY, keep='last').sort_values(ROW_KEY, kind='stable', ignore_index=True)
+    series = with_growth(series).sort_values(ROW_KEY, kind='stable', ignore_index=True)
+    return _changed(series, stored), update_latest(None, series)
+
+
+def append_history(rows, history_dir=HISTORY_DIR, restatement_days=RESTATEMENT_DAYS):
+    """
+    Append new rows, and restated values of recent ones, with their growth rows.
+
+    Rows newer than what is stored for their (Ticker, Metric) are appended and
+    folded into the snapshot of last values and running sums, so the cost of
+    such an append doesn't depend on the size of the stored history. Rows up
+    to `restatement_days` before the stored last date are compared with the
+    stored history; changed ones are upserted on (Ticker, Metric, Date): the
+    new values are appended (read_history keeps the last value of each row)
+    and the growth rows and snapshot of their series are recomputed.
+    Returns the appended rows.
+    """
+    os.makedirs(history_dir, exist_ok=True)
+    latest = read_latest(history_dir)[LATEST_COLUMNS]
+
+    rows = rows.dropna(subset=['Date'])[HISTORY_COLUMNS].drop_duplicates(ROW_KEY, keep='last')
+    restated_latest = None
+    appended = []
+    if len(latest):
+        stored_date = rows.merge(latest[KEY_COLUMNS + ['Date']], on=KEY_COLUMNS, how='left', suffixes=('', ' Stored'))['Date Stored']
+        newer = (stored_date.isna() | (rows['Date'].to_numpy() > stored_date)).to_numpy()
+        recent = (rows['Date'].to_numpy() >= stored_date - pd.Timedelta(days=restatement_days)).to_numpy() & ~newer
+
+        candidates = rows[recent]
+        if len(candidates):
+            stored = read_history(history_dir, metrics=candidates['Metric'].unique(), tickers=candidates['Ticker'].unique())
+            restated = _changed(candidates, stored)
+            if len(restated):
+                # Whole series of restated keys, with their new rows
+                in_restated = _keys(rows).isin(_keys(restated))
+                restated_rows, restated_latest = _restate(rows[in_restated & (newer | recent)], history_dir)
+                appended.append(restated_rows)
+                newer = newer & ~in_restated
+        rows = rows[newer]
+
+    if len(rows):
+        rows = with_growth(rows, latest)
+        appended.append(rows)
+    if not appended:
+        return rows
+    appended = pd.concat(appended, ignore_index=True).sort_values(ROW_KEY, kind='stable', ignore_index=True)
+
+    # Appended before the snapshot is replaced: if writing the snapshot fails, the next
+    # run appends the same rows again and read_history keeps one of each
+    path = os.path.join(history_dir, HISTORY_FILE)
+    appended[HISTORY_COLUMNS].to_csv(path, mode='a', header=not os.path.exists(path), index=False)
+
+    if restated_latest is not None:
+        latest = pd.concat([latest[~_keys(latest).isin(_keys(restated_latest))], restated_latest], ignore_index=True)
+    updated = update_latest(latest, rows) if len(rows) else latest.sort_values(KEY_COLUMNS, ignore_index=True)
+    updated.to_csv(os.path.join(history_dir, LATEST_FILE + ".tmp"), index=False)
+    os.replace(os.path.join(history_dir, LATEST_FILE + ".tmp"), os.path.join(history_dir, LATEST_FILE))
+    return appended[HISTORY_COLUMNS]
+
+
+def read_history(history_dir=HISTORY_DIR, metrics=None, tickers=None):
+    """
+    The stored long-format history (last value of each row), optionally only some metrics and tickers.
+    """
+    path = os.path.join(history_dir, HISTORY_FILE)
+    if not os.path.exists(path):
+        return pd.DataFrame(columns=HISTORY_COLUMNS)
+    history = pd.read_csv(path, parse_dates=['Date'], float_precision='round_trip').drop_duplicates(ROW_KEY, keep='last')
+    if metrics is not None:
+        history = history[history['Metric'].isin(list(metrics))]
+    if tickers is not None:
+        history = history[history['Ticker'].isin(list(tickers))]
+    return history.reset_index(drop=True)
+
+
+def to_wide(history, metrics):
+    """
+    One column per metric, one row per (Ticker, Date), sorted by ticker and date.
+    """
+    history = history[history['Metric'].isin(list(metrics))]
+    history = history.drop_duplicates(['Ticker', 'Date', 'Metric'], keep='last')
+    wide = history.set_index(['Ticker', 'Date', 'Metric'])['Value'].unstack('Metric')
+    wide = wide.reindex(columns=list(metrics)).sort_index().reset_index()
+    wide.columns.name = None
+    return wide
@@ -0,0 +1,188 @@
+import numpy as np
+import pandas as pd
+
+MACRO_COLUMNS = ['GDP Growth', 'Unemployment Rate', 'Interest Rate', 'Inflation Rate']
+
+# Windows offered on the dashboard: None is the full sample / expanding window
+WINDOWS = {'Expanding': None, 'Rolling 36 months': 36, 'Rolling 60 months': 60}
+SECTOR_CHUNK = 64  # Sector columns processed together when building a history
+
+# Only the macro x sector cross block is computed. For every pair the sums
+# n, sum x, sum y, sum x^2, sum y^2 and sum xy run over the months where both
+# series have a value, which is how DataFrame.corr and rolling().corr() treat
+# NaNs. Values are shifted by a per-column constant first; correlation doesn't
+# change, but the running sums lose far less precision.
+
+
+def _pair_sums(x, y):
+    """
+    Per-row contributions to the six pairwise sums; x is rows x macro, y is rows x sector.
+
+    Returns arrays of shape rows x macro x sector.
+    """
+    x_valid, y_valid = ~np.isnan(x), ~np.isnan(y)
+    x0, y0 = np.where(x_valid, x, 0.0), np.where(y_valid, y, 0.0)
+    xv, yv = x_valid[:, :, None], y_valid[:, None, :]
+    return {
+        'n': (xv & yv).astype(float),
+        'sx': x0[:, :, None] * yv,
+        'sy': xv * y0[:, None, :],
+        'sxx': (x0 ** 2)[:, :, None] * yv,
+        'syy': xv * (y0 ** 2)[:, None, :],
+        'sxy': x0[:, :, None] * y0[:, None, :],
+    }
+
+
+def _correlation(sums, min_periods):
+    n = sums['n']
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cov = sums['sxy'] - sums['sx'] * sums['sy'] / n
+        var_x = sums['sxx'] - sums['sx'] ** 2 / n
+        var_y = sums['syy'] - sums['sy'] ** 2 / n
+        corr = cov / np.sqrt(var_x * var_y)
+    corr = np.clip(corr, -1.0, 1.0)
+    return np.where((n >= max(min_periods, 2)) & (var_x > 0) & (var_y > 0), corr, np.nan)
+
+
+def _default_min_periods(window):
+    # pandas defaults: rolling(window) needs a full window, expanding() one pair
+    return 1 if window is None else window
+
+
+def cross_correlation(data, macro_columns=MACRO_COLUMNS, sector_columns=None, min_periods=1):
+    """
+    Full-sample macro x sector correlations, equal to data.corr().loc[macro_columns, sector_columns].
+    """
+    history = correlation_history(data, macro_columns, sector_columns, min_periods=min_periods, last_only=True)
+    return pd.DataFrame(history['values'][-1], index=history['macro'], columns=history['sectors'])
+
+
+def correlation_history(data, macro_columns=MACRO_COLUMNS, sector_columns=None, window=None,
+                        min_periods=None, last_only=False):
+    """
+    Macro x sector correlations at every date over an expanding (window=None) or rolling window.
+
+    Matches data[x].rolling(window).corr(data[y]) / expanding().corr() pair by pair.
+    Returns {'dates', 'macro', 'sectors', 'window', 'values'} with values of shape
+    dates x macro x sector (only the last date if `last_only`).
+    """
+    if sector_columns is None:
+        sector_columns = [col for col in data.columns if '_ETF' in col or '_CRSP' in col]
+    min_periods = _default_min_periods(window) if min_periods is None else min_periods
+
+    x = data[macro_columns].to_numpy(dtype=float)
+    y_all = data[sector_columns].to_numpy(dtype=float)
+    with np.errstate(invalid='ignore'):
+        x = x - np.nan_to_num(np.nanmean(x, axis=0)) if len(x) else x
+        y_all = y_all - np.nan_to_num(np.nanmean(y_all, axis=0)) if len(y_all) else y_all
+
+    n_dates = 1 if last_only else len(data)
+    values = np.full((n_dates, len(macro_columns), len(sector_columns)), np.nan)
+    for start in range(0, len(sector_columns), SECTOR_CHUNK):
+        stop = min(start + SECTOR_CHUNK, len(sector_columns))
+        contributions = _pair_sums(x, y_all[:, start:stop])
+        if last_only:
+            rows = slice(-window, None) if window else slice(None)
+            sums = {key: part[rows].sum(axis=0)[None] for key, part in contributions.items()}
+        else:
+            sums = {}
+            for key, part in contributions.items():
+                total = np.cumsum(part, axis=0)
+                if window:
+                    total[window:] = total[window:] - total[:-window]
+                sums[key] = total
+        values[:, :, start:stop] = _correlation(sums, min_periods)
+
+    return {
+        'dates': data.index[-1:] if last_only else data.index,
+        'macro': list(macro_columns),
+        'sectors': list(sector_columns),
+        'window': window,
+        'values': values,
+    }
+
+
+def history_at(history, date, sector_columns=None):
+    """
+    Macro x sector correlation matrix as of `date` (the last date on or before it).
+    """
+    position = history['dates'].searchsorted(pd.Timestamp(date), side='right') - 1
+    if position < 0:
+        raise KeyError(f"No correlations on or before {date}.")
+    matrix = pd.DataFrame(history['values'][position], index=history['macro'], columns=history['sectors'])
+    return matrix if sector_columns is None else matrix[list(sector_columns)]
+
+
+# Incremental updates
+#
+# The state keeps the six running sums per pair and, for rolling windows, the
+# last `window` rows in a ring buffer, so a new month adds its row and removes
+# the one leaving the window: O(1) work per pair.
+
+def init_state(data, macro_columns=MACRO_COLUMNS, sector_columns=None, window=None, min_periods=None):
+    """
+    Build the running state from a history (date x column).
+    """
+    if sector_columns is None:
+        sector_columns = [col for col in data.columns if '_ETF' in col or '_CRSP' in col]
+    macro_columns, sector_columns = list(macro_columns), list(sector_columns)
+    with np.errstate(invalid='ignore'):
+        shift = np.nan_to_num(np.nanmean(data[macro_columns + sector_columns].to_numpy(dtype=float), axis=0)) \
+            if len(data) else np.zeros(len(macro_columns) + len(sector_columns))
+    shape = (len(macro_columns), len(sector_columns))
+    state = {
+        'macro': macro_columns,
+        'sectors': sector_columns,
+        'window': window,
+        'min_periods': _default_min_periods(window) if min_periods is None else min_periods,
+        'shift': shift,
+        'sums': {key: np.zeros(shape) for key in ('n', 'sx', 'sy', 'sxx', 'syy', 'sxy')},
+        'buffer': np.full((window or 0, len(shift)), np.nan),
+        'rows': 0,
+        'last_date': None,
+    }
+    for date, row in zip(data.index, data[macro_columns + sector_columns].to_numpy(dtype=float)):
+        update_state(state, date, row)
+    return state
+
+
+def update_state(state, date, row):
+    """
+    Add one month (array ordered as state['macro'] + state['sectors']) to the state in place.
+    """
+    row = np.asarray(row, dtype=float) - state['shift']
+    n_macro = len(state['macro'])
+    entering = _pair_sums(row[None, :n_macro], row[None, n_macro:])
+    for key, part in entering.items():
+        state['sums'][key] += part[0]
+
+    window = state['window']
+    if window:
+        position = state['rows'] % window
+        if state['rows'] >= window:
+            leaving = state['buffer'][position]
+            for key, part in _pair_sums(leaving[None, :n_macro], leaving[None, n_macro:]).items():
+                state['sums'][key] -= part[0]
+        state['buffer'][position] = row
+    state['rows'] += 1
+    state['last_date'] = date
+    return state
+
+
+def state_matrix(state):
+    """
+    Current macro x sector correlation matrix from the state.
+    """
+    return pd.DataFrame(_correlation(state['sums'], state['min_periods']),
+                        index=state['macro'], columns=state['sectors'])
+
+
+def update_correlations(state, new_data):
+    """
+    Apply the months in `new_data` that come after the state's last date; returns the refreshed matrix.
+    """
+    if state['last_date'] is not None:
+        new_data = new_data[new_data.index > state['last_date']]
+    for date, row in zip(new_data.index, new_data[state['macro'] + state['sectors']].to_numpy(dtype=float)):
+        update_state(state, date, row)
+    return state_matrix(state)
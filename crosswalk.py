@@ -0,0 +1,122 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+CROSSWALK_COLUMNS = ['gvkey', 'tic', 'symbol', 'match_type', 'score']
+CROSSWALK_FILE = "ticker_crosswalk.csv"
+SCORE_CUTOFF = 90  # Minimum fuzzy score; weaker matches are left unmatched instead of guessed
+UNMATCHED = 'unmatched'  # match_type of pairs with no symbol, so misses are cached too
+
+
+def normalize_ticker(tickers):
+    """
+    Canonical form of a ticker so Compustat and Yahoo spellings line up (BRK.B, BRK/B, BRK B -> BRK-B).
+    """
+    return (
+        pd.Series(tickers, dtype=object).astype(str)
+        .str.upper()
+        .str.strip()
+        .str.replace(r'[.\/\s_]+', '-', regex=True)
+        .str.strip('-')
+    )
+
+
+def _fuzzy_matches(tics, symbols, score_cutoff):
+    """
+    Fuzzy-match leftover tickers, only comparing against symbols with the same first character.
+    """
+    from fuzzywuzzy import process
+
+    normalized_symbols = pd.Series(normalize_ticker(symbols).to_numpy(), index=symbols)
+    blocks = {key: list(group.index) for key, group in normalized_symbols.groupby(normalized_symbols.str[:1])}
+
+    matches = []
+    for tic, normalized in zip(tics, normalize_ticker(tics)):
+        candidates = blocks.get(normalized[:1], [])
+        best = process.extractOne(normalized, candidates, score_cutoff=score_cutoff) if candidates else None
+        matches.append((best[0], best[1]) if best else (np.nan, np.nan))
+    return matches
+
+
+def match_tickers(pairs, symbols, score_cutoff=SCORE_CUTOFF):
+    """
+    Match (gvkey, tic) pairs to Yahoo symbols: exact, then normalized, then blocked fuzzy for the rest.
+    """
+    pairs = pairs[['gvkey', 'tic']].drop_duplicates().reset_index(drop=True)
+    symbols = pd.Index(pd.unique(pd.Series(symbols, dtype=object)))
+
+    result = pairs.assign(symbol=np.nan, match_type=np.nan, score=np.nan).astype({'symbol': object, 'match_type': object})
+
+    # Exact matches
+    exact = pairs['tic'].isin(symbols)
+    result.loc[exact, 'symbol'] = pairs.loc[exact, 'tic']
+    result.loc[exact, ['match_type', 'score']] = ['exact', 100]
+
+    # Normalized matches (BRK.B vs BRK-B)
+    normalized_lookup = pd.Series(symbols, index=normalize_ticker(symbols).to_numpy())
+    normalized_lookup = normalized_lookup[~normalized_lookup.index.duplicated()]
+    normalized = normalize_ticker(pairs['tic']).map(normalized_lookup)
+    hit = ~exact & normalized.notna().to_numpy()
+    result.loc[hit, 'symbol'] = normalized[hit].to_numpy()
+    result.loc[hit, ['match_type', 'score']] = ['normalized', 100]
+
+    # Blocked fuzzy matching only for the misses
+    missing = result['symbol'].isna() & pairs['tic'].notna()
+    if missing.any():
+        matches = _fuzzy_matches(pairs.loc[missing, 'tic'].tolist(), symbols, score_cutoff)
+        result.loc[missing, 'symbol'] = [symbol for symbol, _ in matches]
+        result.loc[missing, 'score'] = [score for _, score in matches]
+        result.loc[missing & result['symbol'].notna(), 'match_type'] = 'fuzzy'
+    result.loc[result['symbol'].isna(), 'match_type'] = UNMATCHED
+
+    return result[CROSSWALK_COLUMNS]
+
+
+def load_crosswalk(path=CROSSWALK_FILE):
+    """
+    Load the on-disk crosswalk, or an empty one if it has not been built yet.
+    """
+    if not os.path.exists(path):
+        return pd.DataFrame(columns=CROSSWALK_COLUMNS)
+    return pd.read_csv(path, dtype={'gvkey': str, 'tic': str, 'symbol': str, 'match_type': str})
+
+
+def build_crosswalk(compustat_data, symbols, path=CROSSWALK_FILE, score_cutoff=SCORE_CUTOFF, retry_unmatched=False):
+    """
+    Update the persistent gvkey <-> Compustat tic <-> Yahoo symbol crosswalk.
+
+    Pairs already resolved in the cached crosswalk to a symbol that is still in
+    `symbols` are reused, as are cached misses unless `retry_unmatched`;
+    everything else is matched again. The new matches are merged into the
+    cache at `path` (pass path=None to skip the cache), which keeps the pairs
+    of earlier pulls. Returns the crosswalk of the pairs in `compustat_data`.
+    """
+    pairs = compustat_data[['gvkey', 'tic']].dropna(subset=['tic']).astype(str)
+    pairs = pairs.assign(tic=pairs['tic'].str.strip()).drop_duplicates()
+
+    cached = load_crosswalk(path) if path else pd.DataFrame(columns=CROSSWALK_COLUMNS)
+    valid = cached['symbol'].isin(pd.Series(symbols, dtype=object))
+    if not retry_unmatched:
+        valid |= cached['match_type'].eq(UNMATCHED)
+    known = pairs.merge(cached.loc[valid, ['gvkey', 'tic']], on=['gvkey', 'tic'], how='left', indicator=True)['_merge'] == 'both'
+
+    new_matches = match_tickers(pairs[~known.to_numpy()], symbols, score_cutoff)
+    reused = cached[valid].merge(pairs, on=['gvkey', 'tic'], how='inner')
+    crosswalk = pd.concat([reused, new_matches], ignore_index=True)[CROSSWALK_COLUMNS]
+
+    if path:
+        # Replace the rematched pairs, keep every other cached pair
+        keys = pd.MultiIndex.from_frame(cached[['gvkey', 'tic']])
+        stale = keys.isin(pd.MultiIndex.from_frame(new_matches[['gvkey', 'tic']]))
+        pd.concat([cached[~stale], new_matches], ignore_index=True)[CROSSWALK_COLUMNS].to_csv(path, index=False)
+    return crosswalk
+
+
+def attach_symbols(compustat_data, crosswalk):
+    """
+    Add a 'best_match' column with each row's Yahoo symbol via a single keyed merge (NaN when unmatched).
+    """
+    keys = compustat_data[['gvkey', 'tic']].astype(str).assign(tic=lambda df: df['tic'].str.strip())
+    symbols = keys.merge(crosswalk[['gvkey', 'tic', 'symbol']], on=['gvkey', 'tic'], how='left')['symbol']
+    return compustat_data.assign(best_match=symbols.to_numpy())
@@ -0,0 +1,90 @@
+import sqlite3
+
+import numpy as np
+import pandas as pd
+
+# SIC ranges used by classify_sector in Group_FDA_Project.ipynb: [lower, upper) -> sector
+SIC_BOUNDS = np.array([1000, 2000, 3000, 4000, 5000, 6000, 7000, 8000, 9000, 10000])
+SIC_SECTORS = [
+    'Technology', 'Materials', 'Industrials', 'Utilities', 'Consumer Staples',
+    'Financials', 'Real Estate', 'Healthcare', 'Energy'
+]
+SECTORS = SIC_SECTORS + ['Unknown']
+
+CRSP_QUERY = """
+    SELECT date, ret, hsiccd
+    FROM {table}
+    WHERE date >= '{start_date}' AND ret IS NOT NULL
+"""
+
+CHUNK_SIZE = 1_000_000
+
+
+def classify_sectors(sic):
+    """
+    Vectorized classify_sector: map an array of SIC codes to sector codes (indexes into SECTORS).
+    """
+    sic = np.asarray(sic, dtype=float)
+    codes = np.searchsorted(SIC_BOUNDS, sic, side='right') - 1
+
+    # Outside 1000-9999 (or missing) is Unknown
+    unknown = np.isnan(sic) | (codes < 0) | (codes >= len(SIC_SECTORS))
+    codes[unknown] = len(SIC_SECTORS)
+    return codes
+
+
+def aggregate_chunk(chunk, freq='M'):
+    """
+    Sum and count of returns per (period, sector) for one chunk of dsf rows.
+    """
+    periods = pd.to_datetime(chunk['date']).dt.to_period(freq)
+    sectors = pd.Categorical.from_codes(classify_sectors(chunk['hsiccd']), categories=SECTORS)
+    returns = pd.to_numeric(chunk['ret'], errors='coerce')
+    return returns.groupby([periods.to_numpy(), sectors], observed=True).agg(['sum', 'count'])
+
+
+def stream_sector_returns(con, start_date='2000-01-01', table='crsp.dsf', chunk_size=CHUNK_SIZE, freq='M'):
+    """
+    Equal-weighted average return per sector and period, read from CRSP in chunks.
+
+    Only running sums and counts per (period, sector) are kept between chunks, so
+    memory stays flat no matter how many rows the query returns. `con` is anything
+    pandas.read_sql accepts (the WRDS connection's engine, or a sqlite3 connection
+    from `local_connection` for offline runs). With freq='M' the result is indexed
+    by month end so it lines up with the resampled ETF returns.
+    """
+    query = CRSP_QUERY.format(table=table, start_date=start_date)
+    totals = None
+    for chunk in pd.read_sql(query, con, chunksize=chunk_size):
+        partial = aggregate_chunk(chunk, freq)
+        totals = partial if totals is None else totals.add(partial, fill_value=0)
+
+    if totals is None or totals.empty:  # read_sql yields one empty chunk when nothing matches
+        return pd.DataFrame(columns=SECTORS, dtype=float)
+
+    # Average return per (period, sector), one column per sector
+    sector_returns = (totals['sum'] / totals['count']).unstack()
+    sector_returns.index = pd.PeriodIndex(sector_returns.index, freq=freq).to_timestamp(how='end').normalize()
+    sector_returns.index.name = 'date'
+    sector_returns.columns = sector_returns.columns.astype(str)
+    sector_returns.columns.name = 'Sector'
+    return sector_returns.sort_index()
+
+
+def local_connection(path):
+    """
+    Open a SQLite file as a stand-in for WRDS, so `crsp.dsf` resolves offline.
+    """
+    con = sqlite3.connect(":memory:")
+    con.execute("ATTACH DATABASE ? AS crsp", (path,))
+    return con
+
+
+def write_local_dsf(dsf, path, if_exists='append'):
+    """
+    Store a DataFrame with date, ret and hsiccd columns as the dsf table of a local stand-in database.
+    """
+    with sqlite3.connect(path) as con:
+        dsf[['date', 'ret', 'hsiccd']].assign(date=pd.to_datetime(dsf['date']).dt.strftime('%Y-%m-%d')).to_sql(
+            'dsf', con, if_exists=if_exists, index=False
+        )
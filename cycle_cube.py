@@ -0,0 +1,62 @@
+import hashlib
+
+import pandas as pd
+
+import correlation
+
+MACRO_COLUMNS = ['GDP Growth', 'Unemployment Rate', 'Interest Rate', 'Inflation Rate']
+RISK_FREE_RATE = 0.005  # Example monthly risk-free rate
+DATA_TYPES = ['ETFs', 'CRSP', 'Both']
+
+
+def dataset_hash(df):
+    """
+    Content hash of a DataFrame (values, index and column names).
+    """
+    digest = hashlib.sha256()
+    digest.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+    digest.update("\x1f".join(map(str, df.columns)).encode())
+    return digest.hexdigest()
+
+
+def selected_columns(metadata, data_type):
+    """
+    Sector columns for a data type choice ('ETFs', 'CRSP' or 'Both').
+    """
+    if data_type == 'ETFs':
+        return list(metadata['ETF Columns'])
+    elif data_type == 'CRSP':
+        return list(metadata['CRSP Columns'])
+    return list(metadata['ETF Columns']) + list(metadata['CRSP Columns'])
+
+
+def build_cube(combined_data, metadata, macro_columns=MACRO_COLUMNS, risk_free_rate=RISK_FREE_RATE):
+    """
+    Precompute every per-cycle statistic the sector rotation dashboard shows.
+
+    Statistics are computed once over all ETF and CRSP columns and then sliced
+    per data type. Returns {'hash': ..., 'ETFs': view, 'CRSP': view, 'Both': view}
+    where each view holds:
+      mean, std, count, sharpe -- Economic Cycle x sector
+      corr                     -- macro indicator x sector (pairwise complete, as DataFrame.corr)
+      best, worst              -- {cycle: sector} by mean return
+    """
+    sector_columns = selected_columns(metadata, 'Both')
+    grouped = combined_data.groupby('Economic Cycle', observed=True)[sector_columns]
+
+    stats = {
+        'mean': grouped.mean(),
+        'std': grouped.std(),
+        'count': grouped.count(),
+    }
+    stats['sharpe'] = (stats['mean'] - risk_free_rate) / stats['std']
+    stats['corr'] = correlation.cross_correlation(combined_data, macro_columns, sector_columns)
+
+    cube = {'hash': dataset_hash(combined_data)}
+    for data_type in DATA_TYPES:
+        columns = selected_columns(metadata, data_type)
+        view = {stat: frame[columns] for stat, frame in stats.items()}
+        view['best'] = view['mean'].idxmax(axis=1).to_dict()
+        view['worst'] = view['mean'].idxmin(axis=1).to_dict()
+        cube[data_type] = view
+    return cube
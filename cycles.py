@@ -0,0 +1,119 @@
+import numpy as np
+import pandas as pd
+
+# How the "low unemployment" threshold is computed:
+#   full      -- mean over the whole sample (the notebook's original rule; looks ahead)
+#   expanding -- mean of all months up to and including the current one
+#   rolling   -- mean of the last `window` months
+THRESHOLD_RULES = ('full', 'expanding', 'rolling')
+DEFAULT_WINDOW = 60
+
+
+def unemployment_threshold(unemployment, rule='full', window=DEFAULT_WINDOW):
+    """
+    Unemployment threshold per month under the given rule.
+    """
+    if rule == 'full':
+        return pd.Series(unemployment.mean(), index=unemployment.index)
+    elif rule == 'expanding':
+        return unemployment.expanding().mean()
+    elif rule == 'rolling':
+        return unemployment.rolling(window, min_periods=1).mean()
+    raise ValueError(f"Unknown threshold rule: {rule}. Expected one of {THRESHOLD_RULES}.")
+
+
+def classify(gdp_growth, unemployment, threshold, gdp_threshold=0.0):
+    """
+    Vectorized label_cycles: Expansion, Contraction, Neutral or Unknown per month.
+
+    Expansion needs GDP growth above `gdp_threshold` and unemployment below
+    its threshold; Contraction is GDP growth at or below zero.
+    """
+    gdp_growth = np.asarray(gdp_growth, dtype=float)
+    unemployment = np.asarray(unemployment, dtype=float)
+    threshold = np.asarray(threshold, dtype=float)
+
+    return np.select(
+        [
+            np.isnan(gdp_growth) | np.isnan(unemployment),
+            (gdp_growth > gdp_threshold) & (unemployment < threshold),
+            gdp_growth <= 0,
+        ],
+        ['Unknown', 'Expansion', 'Contraction'],
+        default='Neutral',
+    )
+
+
+def label_cycles(data, rule='full', window=DEFAULT_WINDOW, gdp_threshold=0.0):
+    """
+    Label every month of `data` (with 'GDP Growth' and 'Unemployment Rate' columns) in one pass.
+    """
+    threshold = unemployment_threshold(data['Unemployment Rate'], rule, window)
+    return pd.Series(
+        classify(data['GDP Growth'], data['Unemployment Rate'], threshold, gdp_threshold),
+        index=data.index,
+        name='Economic Cycle',
+    )
+
+
+def label_state(data, rule='expanding', window=DEFAULT_WINDOW, gdp_threshold=0.0):
+    """
+    Summary of labeled history needed to label later months without re-reading it.
+
+    Later months are labeled with the same rule, window and `gdp_threshold`.
+    """
+    if rule == 'full':
+        raise ValueError("The 'full' rule uses future months, so new months cannot be labeled incrementally.")
+    if rule not in THRESHOLD_RULES:
+        raise ValueError(f"Unknown threshold rule: {rule}. Expected one of {THRESHOLD_RULES}.")
+
+    unemployment = data['Unemployment Rate']
+    return {
+        'rule': rule,
+        'window': window,
+        'gdp_threshold': gdp_threshold,
+        'last_date': data.index.max() if len(data) else None,
+        'sum': float(unemployment.sum()),
+        'count': int(unemployment.count()),
+        'tail': unemployment.iloc[-(window - 1):].tolist() if window > 1 else [],
+    }
+
+
+def label_new_months(data, state):
+    """
+    Label only the months of `data` after the state's last labeled month.
+
+    Returns (labels for the new months, updated state). History is never
+    relabeled, so the nightly FRED refresh costs O(new months).
+    """
+    if state['last_date'] is not None:
+        data = data[data.index > state['last_date']]
+    unemployment = data['Unemployment Rate'].astype(float)
+    window = state['window']
+
+    if state['rule'] == 'expanding':
+        sums = state['sum'] + unemployment.fillna(0).cumsum()
+        counts = state['count'] + unemployment.notna().cumsum()
+        threshold = sums / counts.where(counts > 0)
+    else:
+        # Rolling mean over the carried-over tail followed by the new months
+        history = pd.Series(state['tail'] + unemployment.tolist(), dtype=float)
+        threshold = history.rolling(window, min_periods=1).mean().iloc[len(state['tail']):].to_numpy()
+
+    labels = pd.Series(
+        classify(data['GDP Growth'], unemployment, threshold, state.get('gdp_threshold', 0.0)),
+        index=data.index,
+        name='Economic Cycle',
+    )
+
+    combined_tail = state['tail'] + unemployment.tolist()
+    new_state = {
+        'rule': state['rule'],
+        'window': window,
+        'gdp_threshold': state.get('gdp_threshold', 0.0),
+        'last_date': data.index.max() if len(data) else state['last_date'],
+        'sum': state['sum'] + float(unemployment.sum()),
+        'count': state['count'] + int(unemployment.count()),
+        'tail': combined_tail[-(window - 1):] if window > 1 else [],
+    }
+    return labels, new_state
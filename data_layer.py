@@ -0,0 +1,86 @@
+import os
+
+import pandas as pd
+import streamlit as st
+
+import assets
+import config
+import instrumentation
+import snapshot
+
+# Shared by every dashboard page: each dataset's snapshot is memory-mapped once
+# per process and its frames are cached by column selection, whichever page
+# asks first.
+#
+# By default frames come from st.cache_data, which hands every rerun its own
+# copy. With "serving": {"shared_data": true} in the config, every session
+# gets the same frame instead: numeric columns are read-only views of the
+# memory-mapped snapshot and pandas copies on write, so a session that
+# modifies a frame only copies what it changes and memory no longer grows
+# with the number of sessions. Copy-on-write is a process-wide pandas option,
+# so it is only switched on when a shared frame is first served, not when this
+# module is imported.
+
+def shared_data():
+    return bool(config.get_config()["serving"]["shared_data"])
+
+def derived_cache():
+    """
+    Cache decorator for frames and figures a page derives from the loaded data.
+
+    st.cache_data by default; st.cache_resource when shared_data is on, so
+    derived results are shared by every session like the frames they are
+    built from. Pages must treat what they get back as read-only.
+    """
+    return st.cache_resource if shared_data() else st.cache_data
+
+def enable_copy_on_write():
+    if int(pd.__version__.split(".")[0]) < 3:
+        pd.set_option("mode.copy_on_write", True)  # Always on from pandas 3
+
+def dataset_stamp(name):
+    """
+    Modification times of a dataset's CSV and snapshot; changes whenever either is rewritten.
+
+    Every cache below is keyed on it, so a rebuilt snapshot is reopened and
+    its frames reloaded on the next rerun instead of serving the old ones.
+    """
+    spec = snapshot.DATASETS[name]
+    paths = [os.path.join(config.data_dir(name), spec[key]) for key in ("csv", "snapshot")]
+    return tuple(os.path.getmtime(path) if os.path.exists(path) else None for path in paths)
+
+def open_data(name):
+    return _open_data(name, dataset_stamp(name))
+
+@instrumentation.cached(st.cache_resource, name="open_data")
+def _open_data(name, stamp):
+    return snapshot.open_dataset(name, config.data_dir(name))
+
+@instrumentation.cached(st.cache_data, name="load_data")
+def _copied_data(name, columns, stamp):
+    table, snapshot_metadata = open_data(name)
+    return snapshot.to_pandas(table, snapshot_metadata, columns)
+
+@instrumentation.cached(st.cache_resource, name="load_data (shared)")
+def _shared_data(name, columns, stamp):
+    table, snapshot_metadata = open_data(name)
+    return snapshot.to_pandas(table, snapshot_metadata, columns)
+
+def load_data(name, columns=None):
+    columns = tuple(columns) if columns is not None else None
+    if not shared_data():
+        return _copied_data(name, columns, dataset_stamp(name))
+    enable_copy_on_write()
+    return _shared_data(name, columns, dataset_stamp(name))
+
+def load_metadata(name):
+    return _load_metadata(name, dataset_stamp(name))
+
+@instrumentation.cached(st.cache_data, name="load_metadata")
+def _load_metadata(name, stamp):
+    # Metadata (e.g. ETF/CRSP column lists) stored in the snapshot alongside the data
+    return open_data(name)[1]["metadata"]
+
+@instrumentation.cached(st.cache_resource)
+def load_image(key):
+    return assets.image(key)
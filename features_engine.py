@@ -0,0 +1,192 @@
+import numpy as np
+import pandas as pd
+
+TRADING_DAYS = 252
+SHORT_WINDOW = 50
+LONG_WINDOW = 200
+MOMENTUM_CAP = 0.5  # Cap Momentum values between -0.5 and 0.5
+
+FUNDAMENTAL_COLUMNS = ['roa', 'roe', 'payout_ratio', 'z_score']
+
+# Column names used in features.csv
+FEATURE_NAMES = {
+    "roa": "ROA (Return on Assets)",
+    "roe": "ROE (Return on Equity)",
+    "payout_ratio": "Payout Ratio",
+    "z_score": "Altman Z-Score",
+}
+
+
+def daily_returns(close_prices):
+    """
+    Returns between consecutive available prices; days without a price have no return.
+    """
+    return close_prices.ffill().pct_change(fill_method=None).where(close_prices.notna())
+
+
+def price_features(close_prices):
+    """
+    Volatility and 50/200-day momentum for every symbol of a date x symbol price panel.
+    """
+    filled = close_prices.ffill()
+    momentum = (
+        filled.rolling(SHORT_WINDOW).mean().iloc[-1] / filled.rolling(LONG_WINDOW).mean().iloc[-1] - 1
+    ).clip(lower=-MOMENTUM_CAP, upper=MOMENTUM_CAP)
+
+    return pd.DataFrame({
+        'Volatility': daily_returns(close_prices).std() * np.sqrt(TRADING_DAYS),
+        'Momentum': momentum,
+    })
+
+
+def fundamental_features(compustat_data):
+    """
+    ROA, ROE, payout ratio and Altman Z-score from the most recent filing of each matched symbol.
+
+    Expects the 'best_match' column added by crosswalk.attach_symbols.
+    """
+    data = compustat_data.copy()
+    data['roa'] = data['ni'] / data['at']
+    data['roe'] = data['ni'] / (data['at'] - data['lt'])
+    data['payout_ratio'] = data['dvt'] / data['ni']
+    data['z_score'] = (
+        1.2 * (data['che'] - data['lt']) / data['at'] +  # Working Capital / Total Assets
+        1.4 * (data['ni'] / data['at']) +                 # Retained Earnings / Total Assets
+        3.3 * (data['ebit'] / data['at']) +               # EBIT / Total Assets
+        0.6 * (data['mkvalt'] / data['lt']) +             # Market Value of Equity / Total Liabilities
+        1.0 * (data['revt'] / data['at'])                 # Sales / Total Assets
+    )
+
+    # Handle Missing Values and Infinite Calculations
+    data[FUNDAMENTAL_COLUMNS] = data[FUNDAMENTAL_COLUMNS].replace([np.inf, -np.inf], np.nan)
+    data = data.dropna(subset=['best_match'] + FUNDAMENTAL_COLUMNS)
+
+    latest = data.sort_values('datadate').groupby('best_match')[FUNDAMENTAL_COLUMNS].last()
+    latest.index.name = 'Ticker'
+    return latest
+
+
+def build_features(prices, fundamentals):
+    """
+    Join price features and fundamentals with a single keyed merge.
+    """
+    features = prices.join(fundamentals, how='left')
+    features.index.name = 'Ticker'
+    return features
+
+
+# Incremental updates
+#
+# The state keeps, per symbol, running sums for the return volatility and the
+# last LONG_WINDOW forward-filled prices in a ring buffer with running window
+# sums, so adding a day costs O(symbols) instead of re-reading the history.
+
+def init_state(close_prices):
+    """
+    Build the rolling state from a price history (date x symbol).
+    """
+    symbols = list(close_prices.columns)
+    state = {
+        'symbols': symbols,
+        'last_date': None,
+        'last_price': np.full(len(symbols), np.nan),
+        'ret_sum': np.zeros(len(symbols)),
+        'ret_sumsq': np.zeros(len(symbols)),
+        'ret_count': np.zeros(len(symbols)),
+        'buffer': np.full((LONG_WINDOW, len(symbols)), np.nan),
+        'position': 0,
+        'short_sum': np.zeros(len(symbols)),
+        'short_count': np.zeros(len(symbols)),
+        'long_sum': np.zeros(len(symbols)),
+        'long_count': np.zeros(len(symbols)),
+    }
+    for date, row in zip(close_prices.index, close_prices.to_numpy(dtype=float)):
+        update_state(state, date, row)
+    return state
+
+
+def update_state(state, date, prices):
+    """
+    Add one day of prices (array aligned with state['symbols']) to the state in place.
+    """
+    prices = np.asarray(prices, dtype=float)
+    priced = ~np.isnan(prices)
+
+    # Volatility: running moments of daily returns
+    with np.errstate(divide='ignore', invalid='ignore'):
+        returns = prices / state['last_price'] - 1
+    has_return = priced & ~np.isnan(returns)
+    state['ret_sum'][has_return] += returns[has_return]
+    state['ret_sumsq'][has_return] += returns[has_return] ** 2
+    state['ret_count'][has_return] += 1
+
+    filled = np.where(priced, prices, state['last_price'])
+    state['last_price'] = filled
+
+    # Rolling means: the value entering the window replaces the one leaving it
+    buffer = state['buffer']
+    position = state['position']
+    entering = np.nan_to_num(filled)
+    entering_valid = ~np.isnan(filled)
+
+    leaving_long = buffer[position]
+    state['long_sum'] += entering - np.nan_to_num(leaving_long)
+    state['long_count'] += entering_valid.astype(float) - (~np.isnan(leaving_long)).astype(float)
+
+    leaving_short = buffer[(position - SHORT_WINDOW) % LONG_WINDOW]
+    state['short_sum'] += entering - np.nan_to_num(leaving_short)
+    state['short_count'] += entering_valid.astype(float) - (~np.isnan(leaving_short)).astype(float)
+
+    buffer[position] = filled
+    state['position'] = (position + 1) % LONG_WINDOW
+    state['last_date'] = date
+    return state
+
+
+def state_features(state):
+    """
+    Volatility and Momentum for every symbol from the incremental state.
+    """
+    count = state['ret_count']
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean = state['ret_sum'] / count
+        variance = (state['ret_sumsq'] - count * mean ** 2) / (count - 1)
+        volatility = np.sqrt(np.clip(variance, 0, None)) * np.sqrt(TRADING_DAYS)
+        short_mean = np.where(state['short_count'] >= SHORT_WINDOW, state['short_sum'] / state['short_count'], np.nan)
+        long_mean = np.where(state['long_count'] >= LONG_WINDOW, state['long_sum'] / state['long_count'], np.nan)
+    volatility = np.where(count > 1, volatility, np.nan)
+    momentum = np.clip(short_mean / long_mean - 1, -MOMENTUM_CAP, MOMENTUM_CAP)
+
+    return pd.DataFrame({'Volatility': volatility, 'Momentum': momentum}, index=pd.Index(state['symbols'], name='Ticker'))
+
+
+def add_symbols(state, symbols):
+    """
+    Extend the state with newly listed symbols (no history yet).
+    """
+    new = [symbol for symbol in symbols if symbol not in set(state['symbols'])]
+    if not new:
+        return state
+    n = len(new)
+    state['symbols'] = state['symbols'] + new
+    for key in ['last_price']:
+        state[key] = np.concatenate([state[key], np.full(n, np.nan)])
+    for key in ['ret_sum', 'ret_sumsq', 'ret_count', 'short_sum', 'short_count', 'long_sum', 'long_count']:
+        state[key] = np.concatenate([state[key], np.zeros(n)])
+    state['buffer'] = np.concatenate([state['buffer'], np.full((LONG_WINDOW, n), np.nan)], axis=1)
+    return state
+
+
+def update_features(state, new_prices):
+    """
+    Apply the days in `new_prices` (date x symbol) that come after the state's last date.
+
+    Returns the refreshed Volatility/Momentum frame.
+    """
+    add_symbols(state, new_prices.columns)
+    if state['last_date'] is not None:
+        new_prices = new_prices[new_prices.index > state['last_date']]
+    aligned = new_prices.reindex(columns=state['symbols'])
+    for date, row in zip(aligned.index, aligned.to_numpy(dtype=float)):
+        update_state(state, date, row)
+    return state_features(state)
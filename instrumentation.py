@@ -0,0 +1,256 @@
+import functools
+import json
+import os
+import threading
+import time
+
+# Off unless DASHBOARD_DIAGNOSTICS=1; when off, spans are a shared no-op and
+# cached functions are returned undecorated, so the dashboards pay nothing.
+ENABLED = os.environ.get("DASHBOARD_DIAGNOSTICS", "0") == "1"
+EXPORT_DIR = os.environ.get("DASHBOARD_DIAGNOSTICS_DIR", "diagnostics")
+METRIC_PREFIX = "dashboard"
+
+_lock = threading.Lock()  # Streamlit runs each session in its own thread
+_spans = {}    # name -> {'count', 'total', 'max', 'last'}
+_caches = {}   # name -> {'calls', 'misses'}
+_frames = {}   # name -> {'rows', 'columns', 'bytes'}
+
+
+class _NoSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NO_SPAN = _NoSpan()
+
+
+def observe(name, seconds):
+    """
+    Add one timing of `seconds` to the span `name`.
+    """
+    with _lock:
+        stats = _spans.setdefault(name, {'count': 0, 'total': 0.0, 'max': 0.0, 'last': 0.0})
+        stats['count'] += 1
+        stats['total'] += seconds
+        stats['max'] = max(stats['max'], seconds)
+        stats['last'] = seconds
+
+
+class _Span:
+    __slots__ = ('name', 'start')
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        observe(self.name, time.perf_counter() - self.start)
+        return False
+
+
+def span(name):
+    """
+    Context manager timing the enclosed block as `name`.
+    """
+    return _Span(name) if ENABLED else _NO_SPAN
+
+
+def timed(name=None):
+    """
+    Decorator timing every call of the function as a span.
+    """
+    def decorate(function):
+        if not ENABLED:
+            return function
+        span_name = name or function.__name__
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            with _Span(span_name):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def cached(cache_decorator, name=None):
+    """
+    Apply a Streamlit cache decorator (st.cache_data / st.cache_resource) and count hits and misses.
+
+    The function body only runs on a miss, so calls minus misses are the hits.
+    Each call is also timed as a span named after the function.
+    """
+    def decorate(function):
+        if not ENABLED:
+            return cache_decorator(function)
+        cache_name = name or function.__name__
+
+        @functools.wraps(function)
+        def body(*args, **kwargs):
+            with _lock:
+                _caches.setdefault(cache_name, {'calls': 0, 'misses': 0})['misses'] += 1
+            return function(*args, **kwargs)
+
+        cached_function = cache_decorator(body)
+
+        @functools.wraps(function)
+        def call(*args, **kwargs):
+            with _lock:
+                _caches.setdefault(cache_name, {'calls': 0, 'misses': 0})['calls'] += 1
+            with _Span(cache_name):
+                return cached_function(*args, **kwargs)
+        call.clear = cached_function.clear
+        return call
+    return decorate
+
+
+def record_frame(name, frame):
+    """
+    Remember the shape and shallow memory size of a DataFrame; returns the frame unchanged.
+    """
+    if ENABLED and frame is not None:
+        with _lock:
+            _frames[name] = {
+                'rows': int(frame.shape[0]),
+                'columns': int(frame.shape[1]) if frame.ndim > 1 else 1,
+                'bytes': int(frame.memory_usage(index=True, deep=False).sum()),
+            }
+    return frame
+
+
+def snapshot():
+    """
+    Copy of everything recorded so far.
+    """
+    with _lock:
+        return {
+            'spans': {name: dict(stats) for name, stats in _spans.items()},
+            'caches': {name: {**stats, 'hits': stats['calls'] - stats['misses']} for name, stats in _caches.items()},
+            'frames': {name: dict(stats) for name, stats in _frames.items()},
+        }
+
+
+def reset():
+    with _lock:
+        _spans.clear()
+        _caches.clear()
+        _frames.clear()
+
+
+# Export
+
+def _label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", " ")
+
+
+def to_prometheus(metrics=None):
+    """
+    Metrics in the Prometheus text exposition format.
+    """
+    metrics = metrics or snapshot()
+    lines = []
+
+    def family(name, kind, help_text, samples):
+        if not samples:
+            return
+        lines.append(f"# HELP {METRIC_PREFIX}_{name} {help_text}")
+        lines.append(f"# TYPE {METRIC_PREFIX}_{name} {kind}")
+        for suffix, labels, value in samples:
+            label_text = ",".join(f'{key}="{_label(val)}"' for key, val in labels.items())
+            lines.append(f"{METRIC_PREFIX}_{name}{suffix}{{{label_text}}} {value}")
+
+    spans = metrics['spans']
+    family("span_seconds", "summary", "Time spent in each instrumented span.",
+           [s for name, stats in spans.items()
+            for s in (("_sum", {'span': name}, stats['total']), ("_count", {'span': name}, stats['count']))])
+    family("span_max_seconds", "gauge", "Slowest single run of each span.",
+           [("", {'span': name}, stats['max']) for name, stats in spans.items()])
+
+    caches = metrics['caches']
+    family("cache_calls_total", "counter", "Calls to each cached function.",
+           [("", {'function': name}, stats['calls']) for name, stats in caches.items()])
+    family("cache_misses_total", "counter", "Calls that ran the cached function body.",
+           [("", {'function': name}, stats['misses']) for name, stats in caches.items()])
+
+    frames = metrics['frames']
+    family("frame_rows", "gauge", "Rows in each recorded DataFrame.",
+           [("", {'frame': name}, stats['rows']) for name, stats in frames.items()])
+    family("frame_bytes", "gauge", "Shallow memory size of each recorded DataFrame.",
+           [("", {'frame': name}, stats['bytes']) for name, stats in frames.items()])
+    return "\n".join(lines) + "\n"
+
+
+def to_json_lines(metrics=None):
+    """
+    One JSON record per metric, stamped with the export time.
+    """
+    metrics = metrics or snapshot()
+    timestamp = time.time()
+    records = []
+    for kind in ('spans', 'caches', 'frames'):
+        for name, stats in metrics[kind].items():
+            records.append(json.dumps({'timestamp': timestamp, 'kind': kind[:-1], 'name': name, **stats}))
+    return "\n".join(records) + ("\n" if records else "")
+
+
+def export(path=None, fmt="prometheus"):
+    """
+    Write the metrics to a local file; Prometheus text is overwritten, JSON lines are appended.
+    """
+    if path is None:
+        os.makedirs(EXPORT_DIR, exist_ok=True)
+        path = os.path.join(EXPORT_DIR, "metrics.prom" if fmt == "prometheus" else "metrics.jsonl")
+    if fmt == "prometheus":
+        with open(path, "w") as f:
+            f.write(to_prometheus())
+    elif fmt == "jsonl":
+        with open(path, "a") as f:
+            f.write(to_json_lines())
+    else:
+        raise ValueError(f"Unknown export format '{fmt}'; use 'prometheus' or 'jsonl'.")
+    return path
+
+
+# Streamlit panel
+
+def diagnostics_panel():
+    """
+    Sidebar expander with the recorded spans, cache counters and frame sizes.
+
+    Renders nothing unless diagnostics are enabled.
+    """
+    if not ENABLED:
+        return
+    import pandas as pd
+    import streamlit as st
+
+    metrics = snapshot()
+    with st.sidebar.expander("Diagnostics", expanded=False):
+        if metrics['spans']:
+            spans = pd.DataFrame.from_dict(metrics['spans'], orient='index')
+            spans['mean'] = spans['total'] / spans['count']
+            st.markdown("**Timing spans (seconds)**")
+            st.dataframe(spans.sort_values('total', ascending=False))
+        if metrics['caches']:
+            st.markdown("**Cache hits/misses**")
+            st.dataframe(pd.DataFrame.from_dict(metrics['caches'], orient='index'))
+        if metrics['frames']:
+            st.markdown("**DataFrame sizes**")
+            st.dataframe(pd.DataFrame.from_dict(metrics['frames'], orient='index'))
+
+        fmt = st.radio("Export format", ["prometheus", "jsonl"], horizontal=True, key="diagnostics_format")
+        if st.button("Write metrics file", key="diagnostics_export"):
+            st.write(f"Saved to '{export(fmt=fmt)}'")
+        st.download_button(
+            "Download metrics",
+            to_prometheus(metrics) if fmt == "prometheus" else to_json_lines(metrics),
+            file_name="metrics.prom" if fmt == "prometheus" else "metrics.jsonl",
+            key="diagnostics_download",
+        )
+        if st.button("Reset metrics", key="diagnostics_reset"):
+            reset()
@@ -0,0 +1,305 @@
+import asyncio
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+import market_data
+import valuation_query
+
+THROTTLE_SECONDS = 2.0  # Sessions see price changes at most this often
+POLL_SECONDS = 15.0
+RETRY_SECONDS = 1.0  # First wait after a source error; doubles up to MAX_RETRY_SECONDS
+MAX_RETRY_SECONDS = 60.0
+
+
+# Quote sources: anything with an async `stream()` yielding {ticker: price} batches
+
+class SimulatedQuoteSource:
+    """
+    Random-walk quotes around starting prices; stands in for a live feed offline and in tests.
+
+    Every `interval` seconds `batch_size` random tickers move by a normal
+    log-return with standard deviation `volatility`. `batches` limits the
+    number of batches (None: endless).
+    """
+
+    def __init__(self, prices, interval=0.25, volatility=0.005, batch_size=3, batches=None, seed=None):
+        self.prices = {ticker: float(price) for ticker, price in prices.items() if np.isfinite(price) and price > 0}
+        self.interval = interval
+        self.volatility = volatility
+        self.batch_size = batch_size
+        self.batches = batches
+        self.rng = np.random.default_rng(seed)
+
+    async def stream(self):
+        tickers = list(self.prices)
+        count = 0
+        while tickers and (self.batches is None or count < self.batches):
+            await asyncio.sleep(self.interval)
+            moved = self.rng.choice(tickers, size=min(self.batch_size, len(tickers)), replace=False)
+            shocks = np.exp(self.rng.normal(0.0, self.volatility, len(moved)))
+            batch = {}
+            for ticker, shock in zip(moved, shocks):
+                self.prices[ticker] *= shock
+                batch[ticker] = self.prices[ticker]
+            count += 1
+            yield batch
+
+
+class YFinanceQuoteSource:
+    """
+    Last prices polled from Yahoo Finance through yfinance every `interval` seconds.
+    """
+
+    def __init__(self, tickers, interval=POLL_SECONDS):
+        self.tickers = list(tickers)
+        self.interval = interval
+
+    def fetch(self):
+        """
+        {ticker: last price}, one yfinance download per batch of tickers; errors propagate to the feed.
+        """
+        import yfinance as yf
+
+        quotes = {}
+        for batch in market_data.batches(self.tickers):
+            history = yf.download(batch, period="1d", interval="1m", progress=False, auto_adjust=False)
+            if history.empty:
+                continue
+            last = history["Close"].ffill().iloc[-1].dropna()
+            quotes.update({str(ticker): float(price) for ticker, price in last.items()})
+        return quotes
+
+    async def stream(self):
+        while True:
+            yield await asyncio.to_thread(self.fetch)
+            await asyncio.sleep(self.interval)
+
+
+class PriceFeed:
+    """
+    Applies quotes from a source to a shared price table and publishes them on a throttled schedule.
+
+    The source is consumed on an asyncio loop in a background thread. Quotes
+    are coalesced per ticker and published at most every `throttle` seconds,
+    each publish bumping `version`; sessions ask for `updates_since` their last
+    version, and `subscribe` callbacks receive each published batch. If the
+    source raises, the error is kept in `last_error` and the source is
+    restarted after an exponential backoff; `start` restarts a dead thread.
+    """
+
+    def __init__(self, source, prices=None, throttle=THROTTLE_SECONDS, retry=RETRY_SECONDS):
+        self.source = source
+        self.throttle = throttle
+        self.retry = retry
+        self.last_error = None  # "Type: message" of the latest source error, cleared by the next quotes
+        self.errors = 0
+        self.prices = dict(prices or {})  # Published prices
+        self.version = 0
+        self.changed_at = {}  # ticker -> version of its last published change
+        self._pending = {}
+        self._subscribers = []
+        self._lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._thread = None
+        self._loop = None
+        self._stopped = None
+
+    def start(self):
+        """
+        Start consuming the source in a daemon thread, or restart it if the thread has died; returns the feed.
+        """
+        with self._start_lock:
+            if not self.alive:
+                self._thread = threading.Thread(target=asyncio.run, args=(self.run(),), daemon=True, name="price-feed")
+                self._thread.start()
+        return self
+
+    @property
+    def alive(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def stop(self):
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._stopped.set)
+        if self._thread is not None:
+            self._thread.join()
+
+    async def run(self):
+        """
+        Consume the source and publish every `throttle` seconds until stopped or the source ends.
+        """
+        self._loop = asyncio.get_running_loop()
+        self._stopped = asyncio.Event()
+        consumer = asyncio.create_task(self._consume())
+        try:
+            while not self._stopped.is_set():
+                try:
+                    await asyncio.wait_for(self._stopped.wait(), timeout=self.throttle)
+                except asyncio.TimeoutError:
+                    pass
+                self.publish()
+                if consumer.done():
+                    break
+        finally:
+            consumer.cancel()
+            self.publish()
+        if not consumer.cancelled() and consumer.exception() is not None:
+            self._record_error(consumer.exception())
+
+    async def _consume(self):
+        delay = self.retry
+        while not self._stopped.is_set():
+            try:
+                async for batch in self.source.stream():
+                    with self._lock:
+                        self._pending.update(batch)
+                        self.last_error = None
+                    delay = self.retry
+                return  # The source ended
+            except Exception as e:
+                self._record_error(e)
+            try:
+                await asyncio.wait_for(self._stopped.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+            delay = min(delay * 2, MAX_RETRY_SECONDS)
+
+    def _record_error(self, error):
+        with self._lock:
+            self.last_error = f"{type(error).__name__}: {error}"
+            self.errors += 1
+        print(f"Error in quote source: {self.last_error}")
+
+    def publish(self):
+        """
+        Make the quotes received since the last publish visible; returns the published batch.
+        """
+        with self._lock:
+            batch, self._pending = self._pending, {}
+            if not batch:
+                return {}
+            self.version += 1
+            self.prices.update(batch)
+            for ticker in batch:
+                self.changed_at[ticker] = self.version
+            subscribers = list(self._subscribers)
+        for callback in subscribers:
+            callback(batch, self.version)
+        return batch
+
+    def subscribe(self, callback):
+        """
+        Call `callback(batch, version)` on every publish; returns a function that unsubscribes.
+        """
+        with self._lock:
+            self._subscribers.append(callback)
+
+        def unsubscribe():
+            with self._lock:
+                self._subscribers.remove(callback)
+        return unsubscribe
+
+    def updates_since(self, version):
+        """
+        ({ticker: price} for tickers published after `version`, current version).
+        """
+        with self._lock:
+            return {ticker: self.prices[ticker] for ticker, at in self.changed_at.items() if at > version}, self.version
+
+
+class LiveGapTable:
+    """
+    Valuation Gap Analysis for one selection, kept current as prices change.
+
+    Prices are normalized over the selection, so a delta only touches its own
+    rows unless it moves the lowest or highest price; then the whole
+    normalized price column is recomputed. Weighted valuations don't change.
+    """
+
+    def __init__(self, selection):
+        self.table = selection.reset_index(drop=True)
+        self.index = pd.Index(self.table["Ticker"].astype(str))
+        self.price = self.table["Current Price"].to_numpy(dtype=float).copy()
+        self.normalized_valuation = valuation_query.min_max(self.table["Weighted Valuation"])
+        self.normalized_price = valuation_query.min_max(self.price)
+        self.gap_ratio, self.category = valuation_query.gap_category(self.normalized_price, self.normalized_valuation)
+        self.low, self.high = self._range()
+        self.version = 0
+
+    def _range(self):
+        if not np.isfinite(self.price).any():
+            return np.nan, np.nan
+        return np.nanmin(self.price), np.nanmax(self.price)
+
+    def apply(self, prices, version=None):
+        """
+        Apply {ticker: price} deltas; returns the row positions that were recomputed.
+        """
+        if version is not None:
+            self.version = version
+        positions = self.index.get_indexer(list(prices))
+        found = positions >= 0
+        positions = positions[found]
+        if len(positions) == 0:
+            return positions
+        new = np.asarray(list(prices.values()), dtype=float)[found]
+        old = self.price[positions]
+        self.price[positions] = new
+
+        if np.isin(old, [self.low, self.high]).any() or np.isnan(self.low):
+            low, high = self._range()  # An extreme moved: rescan
+        else:
+            low, high = np.nanmin([self.low, *new]), np.nanmax([self.high, *new])
+        if (low, high) != (self.low, self.high):
+            self.low, self.high = low, high
+            positions = np.arange(len(self.price))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            self.normalized_price[positions] = (self.price[positions] - self.low) / (self.high - self.low)
+        self.gap_ratio[positions], self.category[positions] = valuation_query.gap_category(
+            self.normalized_price[positions], self.normalized_valuation[positions]
+        )
+        return positions
+
+    def frame(self):
+        """
+        The selection with live prices and gap columns, sorted by Valuation Gap Ratio (largest first).
+        """
+        return self.table.assign(**{
+            "Current Price": self.price,
+            "Normalized Current Price": self.normalized_price,
+            "Normalized Weighted Valuation": self.normalized_valuation,
+            "Valuation Gap Ratio": self.gap_ratio,
+            "Valuation Category": self.category,
+        }).sort_values(by="Valuation Gap Ratio", ascending=False)
+
+
+def make_source(kind, prices, **options):
+    """
+    Quote source by name: 'simulated' or 'yfinance'.
+    """
+    if kind == "simulated":
+        return SimulatedQuoteSource(prices, **options)
+    elif kind == "yfinance":
+        return YFinanceQuoteSource(list(prices), **options)
+    raise ValueError(f"Unknown quote source: {kind}. Expected 'simulated' or 'yfinance'.")
+
+
+def main():
+    # Print the gap table as simulated quotes arrive, e.g. python live_prices.py
+    results = pd.read_csv("final_valuation_results_with_prices.csv")
+    prices = dict(zip(results["Ticker"], results["Current Price"]))
+    feed = PriceFeed(SimulatedQuoteSource(prices), prices).start()
+    table = LiveGapTable(results)
+    while True:
+        time.sleep(feed.throttle)
+        updates, version = feed.updates_since(table.version)
+        recomputed = table.apply(updates, version)
+        print(f"v{version}: {len(updates)} quotes, {len(recomputed)} rows recomputed")
+        print(table.frame()[valuation_query.GAP_COLUMNS].head(5).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+import benchmarks
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+SCRIPTS = ["Streamlit.py", "SRMGPLTS.py", "Group_FDA_Project.py"]
+MODES = ["copied", "shared"]  # st.cache_data copies vs shared zero-copy frames (data_layer)
+SAMPLE_SECONDS = 0.05
+
+
+def rss_bytes():
+    """
+    Current resident set size of this process (peak so far where /proc isn't available).
+    """
+    try:
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+class PeakRSS:
+    """
+    Samples RSS in a background thread while in use; `peak` is the largest value seen.
+    """
+
+    def __init__(self, interval=SAMPLE_SECONDS):
+        self.interval = interval
+        self.peak = rss_bytes()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+
+    def _sample(self):
+        while not self._stop.wait(self.interval):
+            self.peak = max(self.peak, rss_bytes())
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, rss_bytes())
+
+
+def toggle_checkboxes(app, context, rerun):
+    """
+    Turn every checkbox on the current page on and off, one rerun each.
+
+    `context` prefixes the interaction names passed to `rerun`.
+    """
+    for label in [checkbox.label for checkbox in app.checkbox]:
+        for value in (True, False):
+            checkbox = next((checkbox for checkbox in app.checkbox if checkbox.label == label), None)
+            if checkbox is None:
+                break
+            checkbox.set_value(value)
+            rerun(f"{context}: {label} = {value}")
+
+
+def click_through(script, timeout=120):
+    """
+    One simulated session: open a dashboard, pick every option of every radio and toggle every checkbox each option shows.
+
+    Returns [(interaction, seconds, exceptions)] for every rerun.
+    """
+    from streamlit.testing.v1 import AppTest
+
+    app = AppTest.from_file(os.path.join(HERE, script), default_timeout=timeout)
+    reruns = []
+
+    def rerun(interaction):
+        start = time.perf_counter()
+        app.run()
+        seconds, exceptions = time.perf_counter() - start, len(app.exception)
+        if not app.main.children and not app.sidebar.children:
+            # AppTest under concurrent sessions occasionally returns an empty page; count it as
+            # a failed rerun and draw the page again so the session carries on
+            exceptions += 1
+            app.run()
+        reruns.append((interaction, seconds, exceptions))
+
+    rerun(f"{script}: open")
+    # Checkboxes differ by page, so toggle the ones each radio option shows
+    toggle_checkboxes(app, script, rerun)
+    for label in [radio.label for radio in app.radio]:
+        radio = next(radio for radio in app.radio if radio.label == label)
+        for option in radio.options:
+            radio = next((radio for radio in app.radio if radio.label == label), None)
+            if radio is None:
+                break  # The last rerun failed before drawing the radio; its exceptions are already counted
+            radio.set_value(option)
+            rerun(f"{script}: {label} = {option}")
+            toggle_checkboxes(app, f"{script}: {label} = {option}", rerun)
+    return reruns
+
+
+def run_sessions(n_sessions, scripts=SCRIPTS, rounds=1):
+    """
+    Run `n_sessions` concurrent click-through sessions (spread over `scripts`) in this process.
+
+    Returns the summary: rerun count, p50/p99 rerun latency and peak RSS.
+    """
+    baseline = rss_bytes()
+    sessions = [scripts[i % len(scripts)] for i in range(n_sessions)]
+    start = time.perf_counter()
+    with PeakRSS() as rss, ThreadPoolExecutor(max_workers=n_sessions) as executor:
+        reruns = [rerun for _ in range(rounds) for result in executor.map(click_through, sessions) for rerun in result]
+    seconds = np.array([rerun[1] for rerun in reruns])
+    return {
+        'sessions': n_sessions,
+        'reruns': len(reruns),
+        'errors': int(sum(rerun[2] for rerun in reruns)),
+        'p50_ms': float(np.percentile(seconds, 50) * 1000),
+        'p99_ms': float(np.percentile(seconds, 99) * 1000),
+        'wall_seconds': time.perf_counter() - start,
+        'baseline_rss_mb': baseline / 2 ** 20,
+        'peak_rss_mb': rss.peak / 2 ** 20,
+    }
+
+
+def run_mode(mode, n_sessions, config_path, scripts=SCRIPTS, rounds=1):
+    """
+    Run one serving mode in a fresh interpreter, so caches and RSS start from zero.
+    """
+    command = [sys.executable, os.path.abspath(__file__), "--worker", "--sessions", str(n_sessions),
+               "--rounds", str(rounds), "--scripts", *scripts]
+    env = {**os.environ, "DASHBOARD_CONFIG": config_path}
+    output = subprocess.run(command, env=env, cwd=HERE, capture_output=True, text=True, check=True).stdout
+    return {'mode': mode, **json.loads(output.strip().splitlines()[-1])}
+
+
+def run_load_test(n_sessions=30, modes=MODES, n_tickers=1_000, years=25, scripts=SCRIPTS, rounds=1):
+    """
+    Load-test every serving mode on the same synthetic datasets; returns a frame with one row per mode.
+    """
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for mode in modes:
+            config_path = benchmarks.write_synthetic_app(tmp, n_tickers, years, serving={'shared_data': mode == "shared"},
+                                                         live_quotes={'source': "simulated", 'throttle_seconds': 2.0})
+            results.append(run_mode(mode, n_sessions, config_path, scripts, rounds))
+            print(f"{mode:<8} p50 {results[-1]['p50_ms']:.0f}ms  p99 {results[-1]['p99_ms']:.0f}ms  "
+                  f"peak RSS {results[-1]['peak_rss_mb']:.0f}MB")
+    return pd.DataFrame(results)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulate concurrent dashboard sessions and report rerun latency and memory.")
+    parser.add_argument("--sessions", type=int, default=30, help="Concurrent sessions")
+    parser.add_argument("--modes", nargs="*", default=MODES, choices=MODES)
+    parser.add_argument("--tickers", type=int, default=1_000, help="Tickers in the synthetic datasets")
+    parser.add_argument("--years", type=int, default=25, help="Years of monthly sector data")
+    parser.add_argument("--scripts", nargs="*", default=SCRIPTS, help="Dashboards the sessions are spread over")
+    parser.add_argument("--rounds", type=int, default=1, help="Click-throughs per session")
+    parser.add_argument("--output", default=None, help="Also write the results to this CSV")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)  # One mode, in this process
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(run_sessions(args.sessions, args.scripts, args.rounds)))
+        return
+
+    results = run_load_test(args.sessions, args.modes, args.tickers, args.years, args.scripts, args.rounds)
+    print(results.to_string(index=False, float_format="%.1f"))
+    if args.output:
+        results.to_csv(args.output, index=False)
+
+
+if __name__ == "__main__":
+    main()
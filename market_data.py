@@ -0,0 +1,206 @@
+import io
+import os
+import threading
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import pandas as pd
+
+CACHE_DIR = "market_data_cache"
+DEFAULT_START = "2018-01-01"
+BATCH_SIZE = 50
+MAX_WORKERS = 8
+KINDS = ("prices", "dividends")
+ACTION_COLUMNS = ["Dividends", "Stock Splits"]  # Kept in the price cache to detect re-adjusted history
+ADJUSTED_COLUMNS = ["Close", "Adj Close"]
+
+
+class YFinanceSource:
+    """
+    Yahoo Finance through yfinance (the source the notebooks use).
+    """
+
+    def fetch(self, symbol, start, end=None, kind="prices"):
+        import yfinance as yf
+
+        if kind == "prices":
+            history = yf.Ticker(symbol).history(start=start, end=end, auto_adjust=False, actions=True)
+        else:
+            history = yf.Ticker(symbol).dividends.to_frame(name="Dividends")
+            history = history[history.index >= pd.Timestamp(start, tz=history.index.tz)]
+        history.index = pd.DatetimeIndex(history.index).tz_localize(None).normalize()
+        history.index.name = "Date"
+        return history
+
+
+class HTTPSource:
+    """
+    Any HTTP endpoint serving GET {base_url}/{kind}/{symbol}?start=YYYY-MM-DD[&end=...] as CSV with a Date column.
+
+    Used with `serve_stub` for offline runs.
+    """
+
+    def __init__(self, base_url, timeout=30):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+
+    def fetch(self, symbol, start, end=None, kind="prices"):
+        params = {"start": str(pd.Timestamp(start).date())}
+        if end is not None:
+            params["end"] = str(pd.Timestamp(end).date())
+        url = f"{self.base_url}/{kind}/{urllib.parse.quote(symbol)}?{urllib.parse.urlencode(params)}"
+        with urllib.request.urlopen(url, timeout=self.timeout) as response:
+            body = response.read().decode()
+        return pd.read_csv(io.StringIO(body), index_col="Date", parse_dates=True)
+
+
+def cache_path(symbol, kind="prices", cache_dir=CACHE_DIR):
+    return os.path.join(cache_dir, kind, f"{symbol}.csv")
+
+
+def load_cached(symbol, kind="prices", cache_dir=CACHE_DIR):
+    """
+    Cached history for one symbol, or None if nothing has been fetched yet.
+    """
+    path = cache_path(symbol, kind, cache_dir)
+    if not os.path.exists(path):
+        return None
+    return pd.read_csv(path, index_col="Date", parse_dates=True)
+
+
+def update_symbol(symbol, source, kind="prices", cache_dir=CACHE_DIR, start=DEFAULT_START, end=None):
+    """
+    Fetch the bars from the last cached one on and append the new ones to the symbol's cache file.
+
+    Prices are adjusted back in time after a split or dividend, so if a new
+    bar carries one, the last cached bar's adjusted prices no longer match,
+    or the columns changed, the symbol's full history is fetched again and
+    the cache file rewritten instead. Returns the number of new rows.
+    """
+    path = cache_path(symbol, kind, cache_dir)
+    cached = load_cached(symbol, kind, cache_dir)
+    if cached is not None and len(cached):
+        start = cached.index.max()  # Overlap one bar to compare adjusted prices
+    if end is not None and pd.Timestamp(start) > pd.Timestamp(end):
+        return 0
+
+    fetched = source.fetch(symbol, start, end, kind)
+    new_rows = fetched if cached is None else fetched[fetched.index > cached.index.max()]
+    if cached is not None and kind == "prices" and needs_refetch(cached, fetched, new_rows):
+        history = source.fetch(symbol, cached.index.min(), end, kind)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        history.index.name = "Date"
+        history.to_csv(path)
+        return len(new_rows)
+    if new_rows.empty:
+        return 0
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    new_rows.index.name = "Date"
+    new_rows.to_csv(path, mode="a", header=cached is None)
+    return len(new_rows)
+
+
+def needs_refetch(cached, fetched, new_rows):
+    """
+    Whether cached prices are stale: a split or dividend in the new bars, a re-adjusted overlapping bar, or new columns.
+    """
+    if new_rows.empty:
+        return False
+    if list(fetched.columns) != list(cached.columns):
+        return True
+    actions = new_rows.reindex(columns=ACTION_COLUMNS).fillna(0)
+    if (actions != 0).any().any():
+        return True
+    overlap = cached.index.max()
+    if overlap not in fetched.index:
+        return False
+    columns = [column for column in ADJUSTED_COLUMNS if column in cached.columns]
+    old = cached.loc[overlap, columns].to_numpy(dtype=float)
+    new = fetched.loc[overlap, columns].to_numpy(dtype=float)
+    return not np.allclose(old, new, rtol=1e-6, equal_nan=True)
+
+
+def batches(symbols, batch_size=BATCH_SIZE):
+    """
+    Split symbols into lists of at most `batch_size`, the unit every request to a source is bounded by.
+    """
+    symbols = list(symbols)
+    return [symbols[i:i + batch_size] for i in range(0, len(symbols), batch_size)]
+
+
+def refresh(symbols, source=None, kind="prices", cache_dir=CACHE_DIR, start=DEFAULT_START, end=None,
+            batch_size=BATCH_SIZE, max_workers=MAX_WORKERS):
+    """
+    Bring the cache up to date for every symbol, fetching in bounded concurrent batches.
+
+    Returns a DataFrame with the number of new rows (or the error) per symbol.
+    """
+    source = source or YFinanceSource()
+    symbols = list(dict.fromkeys(symbols))
+
+    def fetch_one(symbol):
+        try:
+            return symbol, update_symbol(symbol, source, kind, cache_dir, start, end), None
+        except Exception as e:
+            return symbol, 0, str(e)
+
+    results = []
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        for batch in batches(symbols, batch_size):
+            results.extend(pool.map(fetch_one, batch))
+
+    for symbol, _, error in results:
+        if error:
+            print(f"Error fetching {kind} for {symbol}: {error}")
+    return pd.DataFrame(results, columns=["Symbol", "New Rows", "Error"])
+
+
+def load_panel(symbols, field="Close", kind="prices", cache_dir=CACHE_DIR):
+    """
+    One cached field for many symbols as a date x symbol frame (e.g. close prices).
+    """
+    columns = {}
+    for symbol in symbols:
+        cached = load_cached(symbol, kind, cache_dir)
+        if cached is not None and field in cached.columns:
+            columns[symbol] = cached[field]
+    return pd.DataFrame(columns)
+
+
+def serve_stub(histories, host="127.0.0.1", port=0):
+    """
+    Serve {kind: {symbol: DataFrame}} over HTTP in a background thread, in the format HTTPSource expects.
+
+    Returns the running server; its URL is f"http://{host}:{server.server_port}".
+    Call server.shutdown() when done.
+    """
+    class StubHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            url = urllib.parse.urlparse(self.path)
+            parts = url.path.strip("/").split("/", 1)
+            params = urllib.parse.parse_qs(url.query)
+            history = histories.get(parts[0], {}).get(urllib.parse.unquote(parts[-1])) if len(parts) == 2 else None
+            if history is None:
+                self.send_error(404)
+                return
+
+            start = pd.Timestamp(params["start"][0]) if "start" in params else history.index.min()
+            end = pd.Timestamp(params["end"][0]) if "end" in params else history.index.max()
+            body = history[(history.index >= start) & (history.index <= end)].rename_axis("Date").to_csv().encode()
+
+            self.send_response(200)
+            self.send_header("Content-Type", "text/csv")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
@@ -0,0 +1,167 @@
+import argparse
+import itertools
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+import backtest
+import cycle_cube
+import cycles
+
+LEADERBOARD_FILE = "strategy_leaderboard.csv"
+
+# Search space. Only look-ahead-free threshold rules are searched ('full' uses
+# the whole sample's mean unemployment). A month's regime is labeled from that
+# month's own GDP growth and unemployment, which aren't known until it is
+# over, so the weights held in month t use the regime of month t - SIGNAL_LAG
+# and sector scores from earlier months: every candidate's returns are out of sample.
+REGIME_RULES = [('expanding', None), ('rolling', 36), ('rolling', 60), ('rolling', 120)]
+GDP_THRESHOLDS = [0.0, 0.5, 1.0, 1.5, 2.0, 2.5]  # GDP growth needed to call a month Expansion
+LOOKBACKS = [None, 12, 36, 60]  # Same-cycle months a sector's score averages over (None: all of them)
+MIN_PERIODS = [1, 6, 12]
+TOP_K = [1, 2, 3]
+WEIGHTING_SCHEMES = ['equal', 'sharpe', 'inverse_volatility']
+
+SIGNAL_LAG = 1  # Months between a regime's macro data and trading on it
+COST_BPS = 10.0
+WARMUP_MONTHS = 24  # Months every candidate skips before it is scored, so all are scored on the same dates
+HOLDOUT_FRACTION = 0.3  # Final share of the scored months kept out of the ranking
+
+PARAMETER_COLUMNS = ['Data Type', 'Rule', 'Window', 'GDP Threshold', 'Lookback', 'Min Periods', 'Top K', 'Weighting']
+METRIC_COLUMNS = ['Sharpe Ratio', 'Annualized Return', 'Annualized Volatility', 'Max Drawdown', 'Average Turnover']
+HOLDOUT_COLUMNS = ['Holdout Sharpe', 'Holdout Annualized Return', 'Holdout Max Drawdown']
+
+# Set in each worker process once, so tasks only carry their parameters
+_returns = {}
+_macro = None
+
+
+def _init_worker(returns, macro):
+    global _returns, _macro
+    _returns, _macro = returns, macro
+
+
+def regime_tasks(data_types, rules=REGIME_RULES, gdp_thresholds=GDP_THRESHOLDS, lookbacks=LOOKBACKS):
+    """
+    One task per (data type, regime definition, lookback); each task evaluates every min periods / top-k / weighting.
+    """
+    return [
+        {'Data Type': data_type, 'Rule': rule, 'Window': window, 'GDP Threshold': gdp_threshold, 'Lookback': lookback}
+        for data_type, (rule, window), gdp_threshold, lookback
+        in itertools.product(data_types, rules, gdp_thresholds, lookbacks)
+    ]
+
+
+def candidate_weights(returns, macro, params):
+    """
+    Walk-forward weight matrix (date x sector) of one candidate; `params` holds one row of the leaderboard.
+    """
+    labels = tradable_labels(cycles.label_cycles(macro, params['Rule'], _window(params['Window']), params['GDP Threshold']))
+    mean, std = backtest.walk_forward_moments(returns, labels, int(params['Min Periods']), _window(params['Lookback']))
+    return backtest.top_k_weights(mean, int(params['Top K']), params['Weighting'], std)
+
+
+def tradable_labels(labels, lag=SIGNAL_LAG):
+    """
+    The regime known when each month's weights are set: the label of `lag` months earlier ('Unknown' before that).
+    """
+    return labels.shift(lag).fillna('Unknown')
+
+
+def _window(value):
+    return None if value is None or pd.isna(value) else int(value)
+
+
+def _summarize(returns, weight_stack, cost_bps, warmup, split):
+    # Scored and holdout months are backtested separately; each period buys in at its start
+    _, scored = backtest.batch_backtest(returns.iloc[warmup:split], weight_stack[:, warmup:split], cost_bps)
+    _, holdout = backtest.batch_backtest(returns.iloc[split:], weight_stack[:, split:], cost_bps)
+    holdout = holdout[['Sharpe Ratio', 'Annualized Return', 'Max Drawdown']]
+    holdout.columns = HOLDOUT_COLUMNS
+    return pd.concat([scored[METRIC_COLUMNS], holdout], axis=1)
+
+
+def evaluate(task, min_periods=MIN_PERIODS, top_k=TOP_K, schemes=WEIGHTING_SCHEMES, cost_bps=COST_BPS,
+             warmup=WARMUP_MONTHS, holdout_fraction=HOLDOUT_FRACTION):
+    """
+    Score every candidate of one regime task (runs in a worker process).
+
+    The regime labels are computed (and lagged) once per task and the sector
+    moments once per min periods; all top-k / weighting variants are then backtested in one batch.
+    """
+    returns = _returns[task['Data Type']]
+    labels = tradable_labels(cycles.label_cycles(_macro, task['Rule'], _window(task['Window']), task['GDP Threshold']))
+    split = warmup + int(round((len(returns) - warmup) * (1 - holdout_fraction)))
+
+    stacks, params = [], []
+    for periods in min_periods:
+        mean, std = backtest.walk_forward_moments(returns, labels, periods, _window(task['Lookback']))
+        for k, scheme in itertools.product(top_k, schemes):
+            stacks.append(backtest.top_k_weights(mean, k, scheme, std).to_numpy())
+            params.append({**task, 'Min Periods': periods, 'Top K': k, 'Weighting': scheme})
+    summary = _summarize(returns, np.stack(stacks), cost_bps, warmup, split)
+    return pd.concat([pd.DataFrame(params), summary], axis=1)
+
+
+def search(combined_data, metadata, data_types=cycle_cube.DATA_TYPES, workers=None, rank_by='Sharpe Ratio', **options):
+    """
+    Evaluate the whole search space on a process pool; returns the ranked leaderboard.
+
+    Candidates are ranked on the scored months before the holdout; the
+    holdout columns show how each one did on the months it wasn't ranked on.
+    `options` are passed on to evaluate (min_periods, top_k, schemes, cost_bps, ...).
+    """
+    returns = {
+        data_type: combined_data[cycle_cube.selected_columns(metadata, data_type)].astype(float)
+        for data_type in data_types
+    }
+    macro = combined_data[['GDP Growth', 'Unemployment Rate']].astype(float)
+    tasks = regime_tasks(data_types)
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(returns, macro)) as executor:
+        results = list(executor.map(_evaluate_task, tasks, itertools.repeat(options), chunksize=4))
+
+    leaderboard = pd.concat(results, ignore_index=True)
+    leaderboard = leaderboard.sort_values(rank_by, ascending=False, na_position='last', ignore_index=True)
+    leaderboard.insert(0, 'Rank', np.arange(1, len(leaderboard) + 1))
+    return leaderboard
+
+
+def _evaluate_task(task, options):
+    return evaluate(task, **options)
+
+
+def save_leaderboard(leaderboard, path=LEADERBOARD_FILE):
+    leaderboard.to_csv(path, index=False)
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Search sector-rotation strategies and write a ranked leaderboard.")
+    parser.add_argument("--data", default="combined_data.csv", help="Combined sector/macro dataset")
+    parser.add_argument("--metadata", default="combined_data_metadata.json", help="ETF/CRSP column lists")
+    parser.add_argument("--data-types", nargs="*", default=cycle_cube.DATA_TYPES, choices=cycle_cube.DATA_TYPES)
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: one per CPU)")
+    parser.add_argument("--cost-bps", type=float, default=COST_BPS, help="Transaction cost per unit of turnover")
+    parser.add_argument("--holdout", type=float, default=HOLDOUT_FRACTION, help="Final share of months held out")
+    parser.add_argument("--output", default=LEADERBOARD_FILE)
+    args = parser.parse_args()
+
+    combined_data = pd.read_csv(args.data, index_col=0, parse_dates=True)
+    with open(args.metadata, 'r') as f:
+        metadata = json.load(f)
+
+    start = time.perf_counter()
+    leaderboard = search(combined_data, metadata, args.data_types, args.workers,
+                         cost_bps=args.cost_bps, holdout_fraction=args.holdout)
+    print(f"Scored {len(leaderboard)} candidates in {time.perf_counter() - start:.1f}s")
+    print(leaderboard.head(10).to_string(index=False))
+    print(f"Leaderboard saved to '{os.path.abspath(save_leaderboard(leaderboard, args.output))}'")
+
+
+if __name__ == "__main__":
+    main()
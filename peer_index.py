@@ -0,0 +1,164 @@
+import numpy as np
+import pandas as pd
+
+NAICS_LEVELS = [6, 5, 4, 3, 2]  # Prefix lengths, most specific first
+MIN_PEERS = 5  # Distinct tickers a group needs before its medians are used
+UNIVERSE_LEVEL = 0  # 'Peer Level' of codes that fall back to the whole universe
+MULTIPLES = ['P/E', 'EV/EBITDA']
+KEY_COLUMNS = ['tic', 'datadate']
+
+
+def peer_multiples(compustat_data):
+    """
+    P/E and EV/EBITDA of every filing, with its NAICS code as a digit string.
+    """
+    data = compustat_data[KEY_COLUMNS + ['csho', 'prcc_f', 'ni', 'at', 'lt', 'oibdp', 'naicsh']]
+    naics = pd.to_numeric(data['naicsh'], errors='coerce')
+    return pd.DataFrame({
+        'tic': data['tic'].str.strip(),
+        'datadate': pd.to_datetime(data['datadate']),
+        'naics': naics_strings(naics),
+        'P/E': data['csho'] * data['prcc_f'] / data['ni'].replace(0, np.nan),
+        'EV/EBITDA': (data['at'] - data['lt']) / data['oibdp'].replace(0, np.nan),
+    }, index=data.index)
+
+
+def naics_strings(naics):
+    """
+    NAICS codes as digit strings ('' where missing).
+    """
+    naics = pd.Series(naics)
+    return naics.astype('Int64').astype(str).where(naics.notna(), '')
+
+
+def prefixes(naics, level):
+    """
+    The `level`-digit prefix of each code, or '' where the code is shorter than that.
+    """
+    naics = pd.Series(naics)
+    return naics.str[:level].where(naics.str.len() >= level, '')
+
+
+def group_medians(filings, level):
+    """
+    Median multiples and distinct peer count per `level`-digit NAICS prefix.
+
+    `filings` is indexed by (tic, datadate).
+    """
+    prefix = prefixes(filings['naics'], level).to_numpy()
+    valid = prefix != ''
+    filings = filings[valid].assign(ticker=filings.index.get_level_values('tic')[valid])
+    grouped = filings.groupby(prefix[valid])
+    groups = grouped[MULTIPLES].median()
+    groups['Peers'] = grouped['ticker'].nunique()
+    groups.index.name = 'prefix'
+    return groups
+
+
+class PeerIndex:
+    """
+    P/E and EV/EBITDA medians for every NAICS prefix from 6 down to 2 digits.
+
+    Built once per data refresh. A lookup uses the most specific prefix of a
+    ticker's code whose group has at least `min_peers` distinct tickers, so
+    tickers in tiny or empty exact-code groups fall back to their broader
+    industry. When no level has enough peers (small universes), it falls back
+    to the broadest group the code shares with at least one other ticker, or
+    else to the whole universe, and flags the row. update() recomputes only the groups
+    touched by changed filings.
+    """
+
+    def __init__(self, compustat_data, min_peers=MIN_PEERS, levels=NAICS_LEVELS):
+        self.min_peers = min_peers
+        self.levels = list(levels)
+        self.filings = peer_multiples(compustat_data).set_index(KEY_COLUMNS)
+        self.filings = self.filings[~self.filings.index.duplicated(keep='last')]
+        self.groups = pd.concat(
+            {level: group_medians(self.filings, level) for level in self.levels}, names=['level', 'prefix']
+        )
+        self.universe = self._universe_medians()
+
+    def _universe_medians(self):
+        medians = self.filings[MULTIPLES].median()
+        medians['Peers'] = self.filings.index.get_level_values('tic').nunique()
+        return medians
+
+    def lookup(self, naics):
+        """
+        Peer medians for each code in `naics` (numbers or digit strings), in the same order.
+
+        Returns a frame with 'P/E Median', 'EV/EBITDA Median', 'Peers', 'Peer
+        Level' (prefix length used; UNIVERSE_LEVEL for the whole universe) and
+        'Peer Fallback' (True where no level had `min_peers` peers).
+        """
+        codes = pd.Series(naics).reset_index(drop=True)
+        if not pd.api.types.is_string_dtype(codes):
+            codes = naics_strings(pd.to_numeric(codes, errors='coerce'))
+
+        # One candidate row per code and level, joined to the index in a single merge
+        candidates = pd.DataFrame({
+            'position': np.tile(np.arange(len(codes)), len(self.levels)),
+            'level': np.repeat(self.levels, len(codes)),
+            'prefix': pd.concat([prefixes(codes, level) for level in self.levels], ignore_index=True),
+        })
+        matched = candidates.merge(self.groups.reset_index(), on=['level', 'prefix'], how='inner')
+        enough = matched['Peers'] >= self.min_peers
+        best = matched[enough].sort_values(['position', 'level'], ascending=[True, False]).drop_duplicates('position')
+
+        # No level with enough peers: the broadest group the code shares with another ticker
+        fallback = matched[~matched['position'].isin(best['position']) & (matched['Peers'] > 1)]
+        fallback = fallback.sort_values(['position', 'level']).drop_duplicates('position')
+        best = pd.concat([best.assign(fallback=False), fallback.assign(fallback=True)])
+
+        result = best.set_index('position').reindex(np.arange(len(codes)))
+
+        # Codes without any peers (alone in every group, missing or unknown): the whole universe
+        outside = result['level'].isna().to_numpy()
+        result.loc[outside, MULTIPLES + ['Peers']] = self.universe[MULTIPLES + ['Peers']].to_numpy(dtype=float)
+        result.loc[outside, ['level', 'fallback']] = [UNIVERSE_LEVEL, True]
+        return pd.DataFrame({
+            'P/E Median': result['P/E'].to_numpy(dtype=float),
+            'EV/EBITDA Median': result['EV/EBITDA'].to_numpy(dtype=float),
+            'Peers': result['Peers'].to_numpy(dtype=float),
+            'Peer Level': result['level'].to_numpy(dtype=float),
+            'Peer Fallback': result['fallback'].to_numpy(dtype=bool),
+        })
+
+    def update(self, changed_filings):
+        """
+        Add or replace filings (keyed by tic and datadate) and recompute only the groups they touch.
+
+        Returns the (level, prefix) keys that were recomputed.
+        """
+        changed = peer_multiples(changed_filings).set_index(KEY_COLUMNS)
+        changed = changed[~changed.index.duplicated(keep='last')]
+
+        # Groups of the new rows and of the rows they replace
+        previous = self.filings.reindex(changed.index).dropna(subset=['naics'])
+        codes = pd.concat([changed['naics'], previous['naics']]).drop_duplicates()
+        self.filings = pd.concat([self.filings.drop(previous.index), changed])
+
+        affected = []
+        for level in self.levels:
+            touched = set(prefixes(codes, level)) - {''}
+            if not touched:
+                continue
+            level_prefix = prefixes(self.filings['naics'], level)
+            recomputed = group_medians(self.filings[level_prefix.isin(touched).to_numpy()], level)
+            keys = pd.MultiIndex.from_product([[level], sorted(touched)], names=['level', 'prefix'])
+            self.groups = pd.concat([
+                self.groups.drop(keys, errors='ignore'),
+                pd.concat({level: recomputed}, names=['level', 'prefix']),
+            ])
+            affected.extend(keys)
+        self.groups = self.groups.sort_index()
+        self.universe = self._universe_medians()
+        return affected
+
+    def to_frame(self):
+        """
+        The index as a flat table (Level, NAICS Prefix, P/E Median, EV/EBITDA Median, Peers).
+        """
+        return self.groups.reset_index().rename(columns={
+            'level': 'Level', 'prefix': 'NAICS Prefix', 'P/E': 'P/E Median', 'EV/EBITDA': 'EV/EBITDA Median'
+        })
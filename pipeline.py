@@ -0,0 +1,420 @@
+import argparse
+import datetime
+import graphlib
+import hashlib
+import inspect
+import json
+import os
+import pickle
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import pandas as pd
+
+import backtest
+import compustat_store
+import corporate_history
+import crosswalk
+import crsp_sectors
+import cycle_cube
+import cycles
+import features_engine
+import market_data
+import optimizer
+import peer_index
+import scoring
+import sensitivity
+import valuation
+
+CACHE_DIR = ".pipeline_cache"
+MANIFEST_FILE = "manifest.json"
+
+# Tickers valued in PersonalProjectFDA.ipynb and matched in PersonalProjectAVF.ipynb
+VALUATION_TICKERS = ["AAPL", "MSFT", "GOOG", "AMZN", "TSLA", "NVDA", "META", "JNJ", "PG", "DIS"]
+SCORING_SYMBOLS = ["AAPL", "MSFT", "TSLA", "AMZN", "GOOG", "NVDA", "META", "BRK-B", "JNJ", "PG"]
+SECTOR_ETFS = {
+    'Technology': 'XLK', 'Financials': 'XLF', 'Energy': 'XLE', 'Healthcare': 'XLV',
+    'Consumer Discretionary': 'XLY', 'Consumer Staples': 'XLP', 'Utilities': 'XLU',
+    'Materials': 'XLB', 'Industrials': 'XLI', 'Real Estate': 'XLRE'
+}
+FRED_SERIES = {
+    'GDP Growth': 'A191RL1Q225SBEA',  # Quarterly real GDP growth
+    'Unemployment Rate': 'UNRATE',
+    'Interest Rate': 'DGS10',          # 10-year Treasury yield
+    'CPI': 'CPIAUCSL',
+}
+
+
+def content_hash(value):
+    """
+    Hash of a stage output: DataFrames/Series by content, anything else by its pickle.
+    """
+    digest = hashlib.sha256()
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        digest.update(pd.util.hash_pandas_object(value, index=True).to_numpy().tobytes())
+        names = value.columns if isinstance(value, pd.DataFrame) else [value.name]
+        digest.update("\x1f".join(map(str, names)).encode())
+    else:
+        digest.update(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+    return digest.hexdigest()
+
+
+def code_hash(function, modules=()):
+    """
+    Hash of a stage function's source and the source files of the modules it relies on.
+    """
+    digest = hashlib.sha256(inspect.getsource(function).encode())
+    for module in modules:
+        with open(inspect.getsourcefile(module), 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+class Pipeline:
+    """
+    A DAG of stages whose outputs are cached by a hash of their code, parameters and inputs.
+
+    A stage is a function taking its upstream outputs as keyword arguments
+    plus its parameters. Source stages (WRDS, FRED, Yahoo) have no upstream
+    hash to compare, so they are reused until refreshed; their outputs are
+    content-hashed, so a refresh that returns the same data leaves everything
+    downstream cached.
+    """
+
+    def __init__(self):
+        self.stages = {}
+
+    def stage(self, name=None, deps=(), code=(), outputs=(), source=False, **params):
+        def register(function):
+            self.stages[name or function.__name__] = {
+                'function': function,
+                'deps': list(deps),
+                'code': list(code),
+                'outputs': list(outputs),  # Files the stage writes, e.g. features.csv
+                'source': source,
+                'params': params,
+            }
+            return function
+        return register
+
+    def upstream(self, targets):
+        """
+        The targets and every stage they depend on.
+        """
+        needed, pending = set(), list(targets)
+        while pending:
+            name = pending.pop()
+            if name not in self.stages:
+                raise KeyError(f"Unknown stage '{name}'.")
+            if name not in needed:
+                needed.add(name)
+                pending.extend(self.stages[name]['deps'])
+        return needed
+
+    def stage_key(self, name, params, input_hashes):
+        spec = self.stages[name]
+        payload = json.dumps({
+            'code': code_hash(spec['function'], spec['code']),
+            'params': params,
+            'inputs': {dep: input_hashes[dep] for dep in spec['deps']},
+        }, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def run(self, targets=None, cache_dir=CACHE_DIR, workers=4, refresh=(), force=False, overrides=None, dry_run=False):
+        """
+        Bring `targets` (default: every stage) up to date; returns {stage: 'cached' | 'ran' | 'stale'}.
+
+        `refresh` names stages to rerun even if cached (e.g. sources), `force`
+        reruns everything, and `overrides` maps stage -> {param: value}.
+        Stages whose inputs are ready run in parallel on `workers` threads.
+        """
+        os.makedirs(cache_dir, exist_ok=True)
+        manifest_path = os.path.join(cache_dir, MANIFEST_FILE)
+        manifest = {}
+        if os.path.exists(manifest_path):
+            with open(manifest_path, 'r') as f:
+                manifest = json.load(f)
+
+        needed = self.upstream(targets or list(self.stages))
+        overrides = overrides or {}
+        refresh = set(refresh)
+        status, output_hashes = {}, {}
+
+        def load(name):
+            with open(os.path.join(cache_dir, manifest[name]['file']), 'rb') as f:
+                return pickle.load(f)
+
+        def is_cached(name, key):
+            entry = manifest.get(name)
+            return (
+                not force and name not in refresh and entry is not None and entry['key'] == key
+                and os.path.exists(os.path.join(cache_dir, entry['file']))
+                and all(os.path.exists(path) for path in self.stages[name]['outputs'])
+            )
+
+        def execute(name, key, params):
+            spec = self.stages[name]
+            start = time.perf_counter()
+            inputs = {dep: load(dep) for dep in spec['deps']}
+            value = spec['function'](**inputs, **params)
+            filename = f"{name}-{key[:16]}.pkl"
+            with open(os.path.join(cache_dir, filename), 'wb') as f:
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+            return {
+                'key': key,
+                'file': filename,
+                'output_hash': content_hash(value),
+                'finished': datetime.datetime.now().isoformat(timespec='seconds'),
+                'seconds': round(time.perf_counter() - start, 3),
+            }
+
+        sorter = graphlib.TopologicalSorter({name: self.stages[name]['deps'] for name in needed})
+        sorter.prepare()
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            running = {}
+            while sorter.is_active():
+                for name in sorter.get_ready():
+                    spec = self.stages[name]
+                    params = {**spec['params'], **overrides.get(name, {})}
+                    if any(status[dep] == 'stale' for dep in spec['deps']):
+                        status[name] = 'stale'  # Dry run: upstream would rerun, so the key isn't known yet
+                        sorter.done(name)
+                        continue
+                    key = self.stage_key(name, params, output_hashes)
+                    if is_cached(name, key):
+                        status[name] = 'cached'
+                        output_hashes[name] = manifest[name]['output_hash']
+                        sorter.done(name)
+                    elif dry_run:
+                        status[name] = 'stale'
+                        sorter.done(name)
+                    else:
+                        print(f"Running {name}...")
+                        running[executor.submit(execute, name, key, params)] = name
+
+                if not running:
+                    continue
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    name = running.pop(future)
+                    manifest[name] = future.result()  # Re-raises a failed stage's exception
+                    output_hashes[name] = manifest[name]['output_hash']
+                    status[name] = 'ran'
+                    sorter.done(name)
+                    with open(manifest_path, 'w') as f:
+                        json.dump(manifest, f, indent=2)  # Finished stages survive a later failure
+
+        return status
+
+    def output(self, name, cache_dir=CACHE_DIR):
+        """
+        The cached output of a stage from its last run.
+        """
+        with open(os.path.join(cache_dir, MANIFEST_FILE), 'r') as f:
+            entry = json.load(f)[name]
+        with open(os.path.join(cache_dir, entry['file']), 'rb') as f:
+            return pickle.load(f)
+
+
+# The notebooks' data flow as stages
+
+pipeline = Pipeline()
+
+
+def wrds_connection(sqlite=None):
+    """
+    SQLAlchemy engine for WRDS, or a SQLite stand-in (with 'comp' and 'crsp' attached) for offline runs.
+    """
+    if sqlite:
+        import sqlite3
+        con = sqlite3.connect(":memory:", check_same_thread=False)
+        for schema in ('comp', 'crsp'):
+            con.execute(f"ATTACH DATABASE ? AS {schema}", (sqlite,))
+        return con
+    import wrds
+    return wrds.Connection().engine
+
+
+@pipeline.stage(source=True, code=[compustat_store], store_dir=compustat_store.STORE_DIR,
+                start_date=compustat_store.START_DATE, sqlite=None)
+def funda(store_dir, start_date, sqlite):
+    """
+    Compustat funda filings, pulled incrementally into the local store.
+    """
+    compustat_store.extract(wrds_connection(sqlite), store_dir, start_date=start_date)
+    return compustat_store.read_store(store_dir)
+
+
+@pipeline.stage(source=True, code=[crsp_sectors], start_date='2000-01-01', sqlite=None)
+def crsp_sector_returns(start_date, sqlite):
+    return crsp_sectors.stream_sector_returns(wrds_connection(sqlite), start_date)
+
+
+@pipeline.stage(source=True, code=[market_data], etfs=SECTOR_ETFS, start='2000-01-01')
+def etf_returns(etfs, start):
+    market_data.refresh(list(etfs.values()), start=start)
+    prices = market_data.load_panel(list(etfs.values()), field="Adj Close")  # Total return, as the notebook used
+    prices = prices.rename(columns={ticker: sector for sector, ticker in etfs.items()})
+    return prices.resample(pd.offsets.MonthEnd()).ffill().pct_change()
+
+
+@pipeline.stage(source=True, series=FRED_SERIES)
+def fred_macro(series):
+    from fredapi import Fred
+
+    fred = Fred(api_key=os.environ["FRED_API_KEY"])
+    macro = pd.DataFrame({name: fred.get_series(series_id) for name, series_id in series.items()})
+    macro['Inflation Rate'] = macro['CPI'].pct_change() * 100
+    return macro.drop(columns=['CPI']).resample(pd.offsets.MonthEnd()).mean()
+
+
+@pipeline.stage(source=True, code=[market_data], symbols=sorted(set(VALUATION_TICKERS + SCORING_SYMBOLS)),
+                start=market_data.DEFAULT_START)
+def daily_prices(symbols, start):
+    market_data.refresh(symbols, start=start)
+    return market_data.load_panel(symbols)
+
+
+@pipeline.stage(deps=['etf_returns', 'crsp_sector_returns', 'fred_macro'], code=[cycles],
+                outputs=['combined_data.csv', 'combined_data_metadata.json'], rule='full')
+def combined_data(etf_returns, crsp_sector_returns, fred_macro, rule):
+    sector_returns = etf_returns.merge(
+        crsp_sector_returns, left_index=True, right_index=True, how='outer', suffixes=('_ETF', '_CRSP')
+    )
+    data = sector_returns.merge(fred_macro, left_index=True, right_index=True, how='inner')
+    data['Economic Cycle'] = cycles.label_cycles(data, rule=rule)
+
+    metadata = {
+        'ETF Columns': [col for col in data.columns if '_ETF' in col],
+        'CRSP Columns': [col for col in data.columns if '_CRSP' in col],
+    }
+    data.to_csv('combined_data.csv', index=True)
+    with open('combined_data_metadata.json', 'w') as f:
+        json.dump(metadata, f)
+    return data
+
+
+@pipeline.stage(deps=['funda'], code=[peer_index], outputs=['peer_multiples.csv'], min_peers=peer_index.MIN_PEERS)
+def peers(funda, min_peers):
+    index = peer_index.PeerIndex(funda, min_peers=min_peers)
+    index.to_frame().to_csv("peer_multiples.csv", index=False)
+    return index
+
+
+@pipeline.stage(deps=['funda', 'peers', 'daily_prices'], code=[valuation, peer_index],
+                outputs=['final_valuation_results_with_prices.csv'], tickers=VALUATION_TICKERS)
+def valuation_results(funda, peers, daily_prices, tickers):
+    current_prices = daily_prices.ffill().iloc[-1].to_dict()
+    results = valuation.value_universe(funda, current_prices, tickers=tickers, peers=peers)
+    results.to_csv("final_valuation_results_with_prices.csv", index=False)
+    return results
+
+
+@pipeline.stage(deps=['funda'], code=[corporate_history, peer_index], history_dir=corporate_history.HISTORY_DIR)
+def fundamentals_history(funda, history_dir):
+    """
+    Append new filings' FCF, multiples and FCF growth to the long-format history; returns the latest-value snapshot.
+    """
+    corporate_history.append_history(corporate_history.fundamentals_long(funda), history_dir)
+    return corporate_history.read_latest(history_dir)
+
+
+@pipeline.stage(deps=['funda'], code=[valuation, peer_index, sensitivity],
+                outputs=['dcf_sensitivity/dcf_percentiles.csv'], tickers=VALUATION_TICKERS, n_draws=sensitivity.N_DRAWS)
+def dcf_sensitivity(funda, tickers, n_draws):
+    return sensitivity.run_sensitivity(valuation.prepare_inputs(funda, tickers), "dcf_sensitivity", n_draws=n_draws)
+
+
+@pipeline.stage(deps=['funda'], code=[crosswalk], symbols=SCORING_SYMBOLS)
+def ticker_crosswalk(funda, symbols):
+    return crosswalk.build_crosswalk(funda, symbols)
+
+
+@pipeline.stage(deps=['funda', 'ticker_crosswalk', 'daily_prices'], code=[crosswalk, features_engine],
+                symbols=SCORING_SYMBOLS)
+def features(funda, ticker_crosswalk, daily_prices, symbols):
+    fundamentals = features_engine.fundamental_features(crosswalk.attach_symbols(funda, ticker_crosswalk))
+    return features_engine.build_features(features_engine.price_features(daily_prices[symbols]), fundamentals)
+
+
+@pipeline.stage(deps=['features'], code=[scoring, features_engine], outputs=['features.csv'],
+                model_dir=scoring.MODEL_DIR, retrain=False)
+def scores(features, model_dir, retrain):
+    """
+    Re-rank with the latest model, training a new version only for new features (or --set scores.retrain=true).
+    """
+    features = features.dropna()
+    scoring.train_if_changed(features, model_dir, force=retrain)
+    return scoring.rerank(features, model_dir)
+
+
+@pipeline.stage(deps=['combined_data'], code=[backtest])
+def backtest_summary(combined_data):
+    sector_columns = [col for col in combined_data.columns if '_ETF' in col or '_CRSP' in col]
+    return backtest.walk_forward_variants(combined_data[sector_columns], combined_data['Economic Cycle'])
+
+
+@pipeline.stage(deps=['combined_data'], code=[optimizer, backtest, cycles, cycle_cube],
+                outputs=[optimizer.LEADERBOARD_FILE],
+                cost_bps=optimizer.COST_BPS, holdout_fraction=optimizer.HOLDOUT_FRACTION)
+def strategy_leaderboard(combined_data, cost_bps, holdout_fraction):
+    metadata = {
+        'ETF Columns': [col for col in combined_data.columns if '_ETF' in col],
+        'CRSP Columns': [col for col in combined_data.columns if '_CRSP' in col],
+    }
+    leaderboard = optimizer.search(combined_data, metadata, cost_bps=cost_bps, holdout_fraction=holdout_fraction)
+    optimizer.save_leaderboard(leaderboard)
+    return leaderboard
+
+
+def parse_overrides(assignments):
+    """
+    ['valuation_results.tickers=["AAPL"]', 'funda.sqlite=funda.db'] -> {stage: {param: value}}
+    """
+    overrides = {}
+    for assignment in assignments:
+        target, value = assignment.split("=", 1)
+        name, param = target.split(".", 1)
+        try:
+            value = json.loads(value)
+        except json.JSONDecodeError:
+            pass  # Plain strings don't need quotes
+        overrides.setdefault(name, {})[param] = value
+    return overrides
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the data pipeline, recomputing only stages whose inputs changed.")
+    parser.add_argument("targets", nargs="*", help="Stages to bring up to date (default: all)")
+    parser.add_argument("--workers", type=int, default=4, help="Stages run in parallel")
+    parser.add_argument("--cache-dir", default=CACHE_DIR)
+    parser.add_argument("--refresh", nargs="*", default=[], help="Rerun these stages even if cached")
+    parser.add_argument("--refresh-sources", action="store_true", help="Re-pull every source stage")
+    parser.add_argument("--force", action="store_true", help="Rerun every stage")
+    parser.add_argument("--set", nargs="*", default=[], metavar="STAGE.PARAM=VALUE", help="Override stage parameters")
+    parser.add_argument("--sqlite", default=None, help="Local SQLite stand-in for WRDS (comp.funda and crsp.dsf)")
+    parser.add_argument("--dry-run", action="store_true", help="Show which stages would run")
+    parser.add_argument("--list", action="store_true", help="List the stages and their dependencies")
+    args = parser.parse_args()
+
+    if args.list:
+        for name, spec in pipeline.stages.items():
+            kind = "source" if spec['source'] else "stage"
+            print(f"{name:<22} {kind:<7} <- {', '.join(spec['deps']) or '-'}")
+        return
+
+    overrides = parse_overrides(args.set)
+    if args.sqlite:
+        for name in ('funda', 'crsp_sector_returns'):
+            overrides.setdefault(name, {})['sqlite'] = args.sqlite
+    refresh = list(args.refresh)
+    if args.refresh_sources:
+        refresh += [name for name, spec in pipeline.stages.items() if spec['source']]
+
+    status = pipeline.run(args.targets or None, args.cache_dir, args.workers, refresh, args.force, overrides, args.dry_run)
+    for name, state in status.items():
+        print(f"{name:<22} {state}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,263 @@
+import copy
+import datetime
+import hashlib
+import json
+import os
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+
+from features_engine import FEATURE_NAMES
+
+FEATURE_COLUMNS = ['Volatility', 'Momentum', 'roa', 'roe', 'payout_ratio', 'z_score']
+TARGET = 'Momentum'  # Replace with your target metric if needed
+
+MODEL_DIR = "models"
+REGISTRY_FILE = "registry.json"
+CHUNK_SIZE = 50_000
+N_ESTIMATORS = 100
+WARM_START_ESTIMATORS = 20  # Trees added per incremental retrain
+
+# features.csv column order
+OUTPUT_COLUMNS = [
+    'Volatility', 'Momentum', 'ROA (Return on Assets)', 'ROE (Return on Equity)', 'Payout Ratio',
+    'Altman Z-Score', 'Predicted Return', 'Weighted Score', 'Rank', 'Growth Score', 'Stability Score',
+    'Adjusted Weighted Score', 'Category', 'Top Stock'
+]
+
+
+def make_pipeline(n_estimators=N_ESTIMATORS, random_state=42):
+    return Pipeline([
+        ('scaler', StandardScaler()),
+        ('model', RandomForestRegressor(n_estimators=n_estimators, random_state=random_state, warm_start=True, n_jobs=-1))
+    ])
+
+
+def standardize(features, moments=None):
+    """
+    Z-scores of the model inputs, as the notebook feeds them to the pipeline.
+
+    Cross-sectional by default; pass `moments` ({'mean': {...}, 'std': {...}},
+    as stored with a model version) to use the training table's instead.
+    """
+    X = features[FEATURE_COLUMNS].astype(float)
+    if moments is None:
+        moments = feature_moments(features)
+    mean = pd.Series(moments['mean'])[FEATURE_COLUMNS]
+    std = pd.Series(moments['std'])[FEATURE_COLUMNS].replace(0, 1)
+    return (X - mean) / std
+
+
+def feature_moments(features):
+    """
+    Mean and standard deviation of every model input, in the form saved to the registry.
+    """
+    X = features[FEATURE_COLUMNS].astype(float)
+    return {'mean': X.mean().to_dict(), 'std': X.std(ddof=0).to_dict()}
+
+
+def features_hash(features):
+    """
+    Content hash of the model inputs and target, to tell whether a table has already been trained on.
+    """
+    table = features[list(dict.fromkeys(FEATURE_COLUMNS + [TARGET]))]
+    return hashlib.sha256(pd.util.hash_pandas_object(table, index=True).to_numpy().tobytes()).hexdigest()
+
+
+# Model registry
+
+def _registry(model_dir):
+    path = os.path.join(model_dir, REGISTRY_FILE)
+    if not os.path.exists(path):
+        return {'versions': []}
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+def save_model(pipeline, model_dir=MODEL_DIR, **info):
+    """
+    Persist a fitted pipeline as the next version; returns the version number.
+    """
+    os.makedirs(model_dir, exist_ok=True)
+    registry = _registry(model_dir)
+    version = max([entry['version'] for entry in registry['versions']], default=0) + 1
+    filename = f"scoring_model_v{version}.joblib"
+    joblib.dump(pipeline, os.path.join(model_dir, filename))
+
+    registry['versions'].append({
+        'version': version,
+        'file': filename,
+        'created': datetime.datetime.now().isoformat(timespec='seconds'),
+        'features': FEATURE_COLUMNS,
+        'target': TARGET,
+        'n_estimators': len(pipeline.named_steps['model'].estimators_),
+        **info,
+    })
+    with open(os.path.join(model_dir, REGISTRY_FILE), 'w') as f:
+        json.dump(registry, f, indent=2)
+    return version
+
+
+def load_model(model_dir=MODEL_DIR, version=None):
+    """
+    Load a persisted pipeline (latest version by default); returns (pipeline, registry entry).
+    """
+    versions = _registry(model_dir)['versions']
+    if not versions:
+        raise FileNotFoundError(f"No scoring model has been saved in '{model_dir}'.")
+    if version is None:
+        entry = versions[-1]
+    else:
+        entry = next((e for e in versions if e['version'] == version), None)
+        if entry is None:
+            raise KeyError(f"No scoring model version {version} in '{model_dir}'. "
+                           f"Saved versions: {[e['version'] for e in versions]}")
+    return joblib.load(os.path.join(model_dir, entry['file'])), entry
+
+
+# Training
+
+def train(features, model_dir=MODEL_DIR, test_size=0.3, random_state=42):
+    """
+    Fit a fresh pipeline on the feature table and save it as a new version.
+    """
+    from sklearn.model_selection import train_test_split
+
+    X = standardize(features)
+    y = features[TARGET]
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=test_size, random_state=random_state)
+
+    pipeline = make_pipeline(random_state=random_state)
+    pipeline.fit(X_train, y_train)
+    return save_model(pipeline, model_dir, n_rows=len(X_train), test_r2=float(pipeline.score(X_test, y_test)),
+                      moments=feature_moments(features), features_hash=features_hash(features))
+
+
+def train_if_changed(features, model_dir=MODEL_DIR, force=False, **options):
+    """
+    Train a new version only if the latest one wasn't trained on this feature table (or `force`).
+
+    Returns the version to score with, so reruns on unchanged features don't
+    pile up identical model versions.
+    """
+    versions = _registry(model_dir)['versions']
+    if not force and versions and versions[-1].get('features_hash') == features_hash(features):
+        return versions[-1]['version']
+    return train(features, model_dir, **options)
+
+
+def warm_start(new_features, model_dir=MODEL_DIR, n_new_estimators=WARM_START_ESTIMATORS):
+    """
+    Grow the latest model with trees fitted on newly arrived feature rows and save it as a new version.
+
+    The new rows are standardized with the training table's moments and the
+    fitted scaler is kept as-is, so the new trees see inputs on the scale the
+    existing trees were trained on (whatever the size of the batch).
+    """
+    pipeline, entry = load_model(model_dir)
+    if 'moments' not in entry:
+        raise ValueError(f"Model version {entry['version']} has no stored feature moments; retrain it with scoring.train.")
+    scaler = pipeline.named_steps['scaler']
+    model = pipeline.named_steps['model']
+
+    model.set_params(n_estimators=len(model.estimators_) + n_new_estimators, warm_start=True)
+    model.fit(scaler.transform(standardize(new_features, entry['moments'])), new_features[TARGET])
+    return save_model(pipeline, model_dir, parent=entry['version'], n_rows=len(new_features), moments=entry['moments'])
+
+
+# Inference
+
+def predict(pipeline, X, chunk_size=CHUNK_SIZE, n_jobs=-1):
+    """
+    Predict in chunks spread over `n_jobs` worker processes.
+    """
+    if len(X) <= chunk_size:
+        return pipeline.predict(X)
+    chunks = [X.iloc[start:start + chunk_size] for start in range(0, len(X), chunk_size)]
+    results = joblib.Parallel(n_jobs=n_jobs)(joblib.delayed(_predict_chunk)(pipeline, chunk) for chunk in chunks)
+    return np.concatenate(results)
+
+
+def _predict_chunk(pipeline, chunk):
+    # The chunks already run on every core, so the forest predicts each one
+    # single-threaded (on a copy) instead of oversubscribing the CPU
+    model = copy.copy(pipeline.steps[-1][1]).set_params(n_jobs=1)
+    return model.predict(pipeline[:-1].transform(chunk))
+
+
+def _min_max(values):
+    # 0-1 scaling; all-equal values map to 0 instead of dividing by a zero range
+    spread = values.max() - values.min()
+    return (values - values.min()) / spread if spread > 0 else values * 0.0
+
+
+def score_universe(features, pipeline, chunk_size=CHUNK_SIZE, n_jobs=-1):
+    """
+    Predicted Return, scores, rank and category for every row of the feature table.
+
+    Returns a table with the columns of features.csv.
+    """
+    features = features.copy()
+    features['Predicted Return'] = predict(pipeline, standardize(features), chunk_size, n_jobs)
+
+    # Weighted Score and Rank
+    features['Weighted Score'] = (
+        0.5 * features['Predicted Return'] +
+        0.2 * features['roe'] +
+        0.2 * features['z_score'] +
+        0.1 * features['payout_ratio']
+    )
+    features['Rank'] = features['Weighted Score'].rank(ascending=False)
+
+    # Growth Potential and Long-Term Stability Scores, normalized to 0-1
+    growth = (
+        0.6 * features['Predicted Return'].clip(lower=0) +
+        0.3 * features['roe'].clip(lower=0) +
+        0.2 * features['Momentum'].clip(lower=0)
+    )
+    stability = (
+        0.4 * features['z_score'] +
+        0.4 * features['payout_ratio'] +
+        0.2 * (1 - features['Volatility'])
+    )
+    features['Growth Score'] = _min_max(growth)
+    features['Stability Score'] = _min_max(stability)
+    features['Adjusted Weighted Score'] = features['Weighted Score'].clip(lower=0) + 0.01
+
+    # Categorize stocks
+    features['Category'] = np.select(
+        [
+            features['Growth Score'] > features['Stability Score'] + 0.05,
+            features['Stability Score'] > features['Growth Score'] + 0.05,
+        ],
+        ['Growth-Focused', 'Stability-Focused'],
+        default='Balanced',
+    )
+    features['Top Stock'] = features['Rank'] <= 10
+
+    features = features.rename(columns=FEATURE_NAMES)
+    features.index.name = 'Ticker'
+    return features[OUTPUT_COLUMNS]
+
+
+def save_features(scored, filename="features.csv"):
+    """
+    Write the scored table in the features.csv layout read by SRMGPLTS.py.
+    """
+    with open(filename, "w") as file:
+        file.write(f"# Stock Ranking Data - Generated on {datetime.date.today().isoformat()}\n")
+        scored.to_csv(file, index=True, float_format="%.2f")
+
+
+def rerank(features, model_dir=MODEL_DIR, filename="features.csv", chunk_size=CHUNK_SIZE, n_jobs=-1):
+    """
+    Nightly re-rank: load the latest model, score the universe and write features.csv.
+    """
+    pipeline, _ = load_model(model_dir)
+    scored = score_universe(features, pipeline, chunk_size, n_jobs)
+    save_features(scored, filename)
+    return scored
@@ -0,0 +1,174 @@
+import argparse
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+import valuation
+
+# Sensitivity grid around the notebook's point assumptions (WACC 8%, terminal growth 2%, 5 years)
+WACC_GRID = np.array([0.06, 0.07, 0.08, 0.09, 0.10])
+TERMINAL_GROWTH_GRID = np.array([0.01, 0.015, 0.02, 0.025, 0.03])
+HORIZON_GRID = np.array([3, 5, 7, 10])
+
+# Monte Carlo draws over the FCF growth rate
+N_DRAWS = 1000
+GROWTH_DRAW_STD = 0.02  # Standard deviation of the growth rate draws
+SEED = 42
+
+PERCENTILES = [5, 25, 50, 75, 95]
+SHARD_SIZE = 500
+
+GRID_FILE = "dcf_grid.npy"
+DRAWS_FILE = "dcf_draws.npy"
+AXES_FILE = "dcf_axes.json"
+PERCENTILES_FILE = "dcf_percentiles.csv"
+
+
+def per_share_value(enterprise_value, net_debt, shares):
+    """
+    Equity value per share, floored at zero like the notebook DCF.
+    """
+    with np.errstate(divide='ignore', invalid='ignore'):
+        value = (enterprise_value - net_debt) / shares
+    return np.where(np.isnan(value) | (value < 0), 0.0, value)
+
+
+def sensitivity_grid(last_fcf, growth, net_debt, shares, wacc=WACC_GRID, terminal_growth=TERMINAL_GROWTH_GRID,
+                     horizons=HORIZON_GRID):
+    """
+    Intrinsic value per share on the full (ticker, WACC, terminal growth, horizon) grid.
+    """
+    ticker_axis = (slice(None), None, None, None)
+    ev = valuation.dcf_enterprise_value(
+        np.asarray(last_fcf)[ticker_axis],
+        np.asarray(growth)[ticker_axis],
+        np.asarray(wacc)[None, :, None, None],
+        np.asarray(terminal_growth)[None, None, :, None],
+        np.asarray(horizons)[None, None, None, :],
+    )
+    return per_share_value(ev, np.asarray(net_debt)[ticker_axis], np.asarray(shares)[ticker_axis])
+
+
+def monte_carlo_draws(last_fcf, growth, net_debt, shares, rng, n_draws=N_DRAWS, growth_std=GROWTH_DRAW_STD,
+                      wacc=WACC_GRID, terminal_growth=TERMINAL_GROWTH_GRID, horizons=HORIZON_GRID):
+    """
+    Intrinsic value per share for `n_draws` scenarios per ticker.
+
+    Each draw perturbs the ticker's growth rate and picks a WACC, terminal growth
+    and horizon from the grid, so the spread reflects both sources of uncertainty.
+    """
+    n = len(last_fcf)
+    growth_draws = np.asarray(growth)[:, None] + rng.normal(0.0, growth_std, size=(n, n_draws))
+    wacc_draws = rng.choice(wacc, size=(n, n_draws))
+    terminal_draws = rng.choice(terminal_growth, size=(n, n_draws))
+    horizon_draws = rng.choice(horizons, size=(n, n_draws))
+
+    ev = valuation.dcf_enterprise_value(
+        np.asarray(last_fcf)[:, None], growth_draws, wacc_draws, terminal_draws, horizon_draws
+    )
+    return per_share_value(ev, np.asarray(net_debt)[:, None], np.asarray(shares)[:, None])
+
+
+def _run_shard(task):
+    """
+    Compute one shard of tickers and write it into the shared result files.
+    """
+    out_dir, start, stop, last_fcf, growth, net_debt, shares, seed, n_draws = task
+    rng = np.random.default_rng(seed)
+
+    grid = np.lib.format.open_memmap(os.path.join(out_dir, GRID_FILE), mode='r+')
+    grid[start:stop] = sensitivity_grid(last_fcf, growth, net_debt, shares)
+    grid.flush()
+
+    draws = np.lib.format.open_memmap(os.path.join(out_dir, DRAWS_FILE), mode='r+')
+    draws[start:stop] = monte_carlo_draws(last_fcf, growth, net_debt, shares, rng, n_draws)
+    draws.flush()
+    return start, stop
+
+
+def run_sensitivity(inputs, out_dir, workers=None, shard_size=SHARD_SIZE, n_draws=N_DRAWS, seed=SEED):
+    """
+    Shard tickers across a process pool and stream the result cubes to `out_dir`.
+
+    `inputs` is the per-ticker frame from valuation.prepare_inputs. Writes the
+    grid cube, the Monte Carlo draws, the axis labels and a percentile summary
+    that the "DCF Model" page reads.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    tickers = inputs['Ticker'].tolist()
+    n = len(tickers)
+
+    last_fcf, growth = valuation.dcf_growth_inputs(inputs)
+    net_debt = inputs['lt'].to_numpy(dtype=float) - inputs['che'].to_numpy(dtype=float)
+    shares = inputs['csho'].to_numpy(dtype=float)
+
+    # Pre-allocate the result files; workers fill their own slice
+    shape = (n, len(WACC_GRID), len(TERMINAL_GROWTH_GRID), len(HORIZON_GRID))
+    np.lib.format.open_memmap(os.path.join(out_dir, GRID_FILE), mode='w+', dtype=np.float64, shape=shape).flush()
+    np.lib.format.open_memmap(os.path.join(out_dir, DRAWS_FILE), mode='w+', dtype=np.float64, shape=(n, n_draws)).flush()
+
+    bounds = [(start, min(start + shard_size, n)) for start in range(0, n, shard_size)]
+    seeds = np.random.SeedSequence(seed).spawn(len(bounds))
+    tasks = [
+        (out_dir, start, stop, last_fcf[start:stop], growth[start:stop], net_debt[start:stop], shares[start:stop],
+         shard_seed, n_draws)
+        for (start, stop), shard_seed in zip(bounds, seeds)
+    ]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for _ in pool.map(_run_shard, tasks):
+            pass
+
+    with open(os.path.join(out_dir, AXES_FILE), 'w') as f:
+        json.dump({
+            'Tickers': tickers,
+            'WACC': WACC_GRID.tolist(),
+            'Terminal Growth Rate': TERMINAL_GROWTH_GRID.tolist(),
+            'Projection Years': HORIZON_GRID.tolist(),
+            'Draws': n_draws,
+            'Seed': seed,
+        }, f)
+
+    summary = summarize(out_dir, tickers, per_share_value(
+        valuation.dcf_enterprise_value(last_fcf, growth), net_debt, shares
+    ))
+    summary.to_csv(os.path.join(out_dir, PERCENTILES_FILE), index=False)
+    return summary
+
+
+def summarize(out_dir, tickers, base_values, chunk_size=SHARD_SIZE):
+    """
+    Percentile bands of the Monte Carlo draws, scaled like the dashboard's DCF bars.
+
+    Values are divided by the largest base-case intrinsic value so the bands sit
+    on the same 0-1 axis as "Intrinsic Value per Share" in the valuation results.
+    """
+    draws = np.load(os.path.join(out_dir, DRAWS_FILE), mmap_mode='r')
+    bands = np.empty((len(tickers), len(PERCENTILES)))
+    for start in range(0, len(tickers), chunk_size):
+        bands[start:start + chunk_size] = np.percentile(draws[start:start + chunk_size], PERCENTILES, axis=1).T
+
+    scale = np.max(base_values) if len(base_values) and np.max(base_values) > 0 else 1.0
+    summary = pd.DataFrame(bands / scale, columns=[f"P{p}" for p in PERCENTILES])
+    summary.insert(0, 'Base', np.asarray(base_values) / scale)
+    summary.insert(0, 'Ticker', tickers)
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="DCF sensitivity grid and Monte Carlo draws for every ticker.")
+    parser.add_argument("compustat_csv", help="Compustat funda extract (financial_data_*.csv)")
+    parser.add_argument("--out", default="dcf_sensitivity", help="Output directory for the result cubes")
+    parser.add_argument("--workers", type=int, default=None, help="Number of worker processes")
+    parser.add_argument("--draws", type=int, default=N_DRAWS, help="Monte Carlo draws per ticker")
+    args = parser.parse_args()
+
+    compustat_data = pd.read_csv(args.compustat_csv)
+    summary = run_sensitivity(valuation.prepare_inputs(compustat_data), args.out, args.workers, n_draws=args.draws)
+    print(f"Sensitivity results for {len(summary)} tickers saved to '{args.out}'")
+
+
+if __name__ == "__main__":
+    main()
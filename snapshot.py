@@ -0,0 +1,292 @@
+import argparse
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+# Bump when the layout of the snapshot metadata or the dtype profiles change
+SNAPSHOT_VERSION = 3
+METADATA_KEY = b"hello_world.snapshot"
+INDEX_COLUMN = "__index__"
+FLOAT32_TOLERANCE = 1e-6  # Largest relative error a float32 column may introduce
+
+# Fixed label sets, as written by cycles.classify, scoring.score_universe, valuation.value_universe and optimizer
+CYCLE_LABELS = ['Contraction', 'Expansion', 'Neutral', 'Unknown']
+SCORE_CATEGORIES = ['Balanced', 'Growth-Focused', 'Stability-Focused']
+VALUATION_CATEGORIES = ['Overvalued', 'Undervalued']
+DATA_TYPES = ['ETFs', 'CRSP', 'Both']  # cycle_cube.DATA_TYPES
+WEIGHTING_SCHEMES = ['equal', 'sharpe', 'inverse_volatility']  # optimizer.WEIGHTING_SCHEMES
+
+# Known datasets: CSV source, snapshot file, how the CSV has to be read and the
+# dtype profile applied before the snapshot is written:
+#   float32     -- downcast float64 columns whose values survive the round trip
+#   categories  -- column -> fixed category list (None: the labels found in the data)
+#   bool        -- True/False columns
+#   budget_mb   -- memory the loaded frame is expected to stay under
+DATASETS = {
+    "combined_data": {
+        "csv": "combined_data.csv",
+        "snapshot": "combined_data.arrow",
+        "metadata": "combined_data_metadata.json",
+        "read_csv": {"index_col": 0, "parse_dates": True},
+        "profile": {"float32": True, "categories": {"Economic Cycle": CYCLE_LABELS}, "budget_mb": 4},
+    },
+    "features": {
+        "csv": "features.csv",
+        "snapshot": "features.arrow",
+        "read_csv": {"index_col": 0, "skiprows": 1},  # Skip the comment row
+        "profile": {
+            "float32": True, "categories": {"Category": SCORE_CATEGORIES}, "bool": ["Top Stock"], "budget_mb": 2,
+        },
+    },
+    "valuation_results": {
+        "csv": "final_valuation_results_with_prices.csv",
+        "snapshot": "final_valuation_results_with_prices.arrow",
+        "read_csv": {},
+        "profile": {
+            "float32": True, "categories": {"Ticker": None, "Valuation Category": VALUATION_CATEGORIES},
+            "budget_mb": 2,
+        },
+    },
+    "strategy_leaderboard": {
+        "csv": "strategy_leaderboard.csv",
+        "snapshot": "strategy_leaderboard.arrow",
+        "read_csv": {"index_col": "Rank"},
+        "profile": {
+            "float32": True,
+            "categories": {"Data Type": DATA_TYPES, "Rule": ['expanding', 'rolling'], "Weighting": WEIGHTING_SCHEMES},
+            "budget_mb": 4,
+        },
+    },
+}
+
+
+def fits_float32(values, tolerance=FLOAT32_TOLERANCE):
+    """
+    True if every finite value keeps its magnitude and stays within `tolerance` (relative) as float32.
+    """
+    values = np.asarray(values, dtype=float)
+    finite = values[np.isfinite(values)]
+    with np.errstate(over='ignore'):
+        rounded = finite.astype(np.float32).astype(float)
+    return bool(np.all(np.abs(rounded - finite) <= tolerance * np.abs(finite)))
+
+
+def _booleans(values):
+    if values.dtype == bool:
+        return values
+    flags = values.astype(str).str.strip().str.lower().map({'true': True, 'false': False})
+    flags = flags.where(values.notna())
+    return flags.astype(bool) if flags.notna().all() else flags.astype('boolean')
+
+
+def compact(df, profile):
+    """
+    Apply a dtype profile (see DATASETS) to a freshly read dataset.
+
+    Labels outside a fixed category list raise rather than silently becoming NaN.
+    """
+    df = df.copy()
+    for column, categories in profile.get("categories", {}).items():
+        if column not in df.columns:
+            continue
+        labels = df[column].dropna().unique()
+        if categories is None:
+            categories = sorted(labels)
+        unexpected = set(labels) - set(categories)
+        if unexpected:
+            raise ValueError(f"Unexpected '{column}' labels: {sorted(unexpected)}. Expected one of {categories}.")
+        df[column] = pd.Categorical(df[column], categories=categories)
+
+    for column in profile.get("bool", []):
+        if column in df.columns:
+            df[column] = _booleans(df[column])
+
+    if profile.get("float32"):
+        for column in df.select_dtypes('float64').columns:
+            if fits_float32(df[column]):
+                df[column] = df[column].astype(np.float32)
+    return df
+
+
+def memory_report(df, budget_mb=None):
+    """
+    Deep memory per column (index included) and the total against an optional budget.
+
+    Returns (per-column bytes Series, {'bytes', 'budget_bytes', 'within_budget'}).
+    """
+    usage = df.memory_usage(index=True, deep=True)
+    total = int(usage.sum())
+    budget = int(budget_mb * 2 ** 20) if budget_mb is not None else None
+    return usage, {'bytes': total, 'budget_bytes': budget, 'within_budget': budget is None or total <= budget}
+
+
+def write_snapshot(df, path, metadata=None):
+    """
+    Write a DataFrame and its metadata (e.g. ETF/CRSP column lists) as one Arrow IPC file.
+
+    The file is uncompressed so readers can memory-map it and pull single
+    columns without parsing the rest.
+    """
+    frame = df.reset_index(names=INDEX_COLUMN) if df.index.name is None else df.reset_index()
+    table = pa.Table.from_pandas(frame, preserve_index=False)
+
+    # Keep NaN as NaN rather than Arrow nulls: columns without nulls convert to
+    # pandas without a copy, straight out of the memory map
+    for i, field in enumerate(table.schema):
+        if pa.types.is_floating(field.type) and table.column(i).null_count:
+            table = table.set_column(i, field, pa.array(frame[field.name].to_numpy(), type=field.type, from_pandas=False))
+
+    snapshot_metadata = {
+        "version": SNAPSHOT_VERSION,
+        "index": df.index.name or INDEX_COLUMN,
+        "schema": {str(col): str(dtype) for col, dtype in df.dtypes.items()},
+        "metadata": metadata or {},
+    }
+    table = table.replace_schema_metadata({
+        **(table.schema.metadata or {}),
+        METADATA_KEY: json.dumps(snapshot_metadata).encode(),
+    })
+
+    # Write to a temporary file first so readers never see a half-written snapshot
+    tmp_path = f"{path}.tmp"
+    with pa.OSFile(tmp_path, "wb") as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    os.replace(tmp_path, path)
+
+
+def _snapshot_metadata(schema):
+    raw = (schema.metadata or {}).get(METADATA_KEY)
+    if raw is None:
+        raise ValueError("File is not a dataset snapshot (missing snapshot metadata).")
+    snapshot_metadata = json.loads(raw)
+    if snapshot_metadata["version"] > SNAPSHOT_VERSION:
+        raise ValueError(
+            f"Snapshot version {snapshot_metadata['version']} is newer than supported version {SNAPSHOT_VERSION}."
+        )
+    return snapshot_metadata
+
+
+def open_snapshot(path):
+    """
+    Memory-map a snapshot; returns (Arrow table, snapshot metadata) without reading any column data.
+    """
+    reader = pa.ipc.open_file(pa.memory_map(path, "r"))
+    table = reader.read_all()
+    return table, _snapshot_metadata(table.schema)
+
+
+def read_metadata(path):
+    """
+    The user metadata stored with a snapshot (e.g. {"ETF Columns": [...], "CRSP Columns": [...]}).
+    """
+    with pa.memory_map(path, "r") as source:
+        return _snapshot_metadata(pa.ipc.open_file(source).schema)["metadata"]
+
+
+def to_pandas(table, snapshot_metadata, columns=None):
+    """
+    Materialize the requested columns of a memory-mapped snapshot as a DataFrame.
+
+    Numeric columns are not copied: they stay read-only views of the memory
+    map (pandas copies on write), so every holder of the frame shares one
+    copy of the data.
+    """
+    index_name = snapshot_metadata["index"]
+    if columns is not None:
+        table = table.select([INDEX_COLUMN if index_name == INDEX_COLUMN else index_name] + list(columns))
+
+    df = table.to_pandas(split_blocks=True)
+    df = df.set_index(index_name)
+    if index_name == INDEX_COLUMN:
+        df.index.name = None
+    return df
+
+
+def read_snapshot(path, columns=None):
+    """
+    Load a snapshot (optionally only some columns); returns (DataFrame, user metadata).
+    """
+    table, snapshot_metadata = open_snapshot(path)
+    return to_pandas(table, snapshot_metadata, columns), snapshot_metadata["metadata"]
+
+
+def build_snapshot(name, data_dir="."):
+    """
+    Convert one of the known CSV datasets into its snapshot.
+    """
+    spec = DATASETS[name]
+    df = compact(pd.read_csv(os.path.join(data_dir, spec["csv"]), **spec["read_csv"]), spec.get("profile", {}))
+
+    metadata = {}
+    if "metadata" in spec and os.path.exists(os.path.join(data_dir, spec["metadata"])):
+        with open(os.path.join(data_dir, spec["metadata"]), "r") as f:
+            metadata = json.load(f)
+
+    path = os.path.join(data_dir, spec["snapshot"])
+    write_snapshot(df, path, metadata)
+    return path
+
+
+def open_dataset(name, data_dir="."):
+    """
+    Memory-map a known dataset, (re)building its snapshot first if the CSV is newer
+    or the snapshot predates the current dtype profiles.
+    """
+    spec = DATASETS[name]
+    path = os.path.join(data_dir, spec["snapshot"])
+    csv_path = os.path.join(data_dir, spec["csv"])
+    if not os.path.exists(path) or (os.path.exists(csv_path) and os.path.getmtime(csv_path) > os.path.getmtime(path)):
+        build_snapshot(name, data_dir)
+    table, snapshot_metadata = open_snapshot(path)
+    if snapshot_metadata["version"] < SNAPSHOT_VERSION and os.path.exists(csv_path):
+        build_snapshot(name, data_dir)
+        table, snapshot_metadata = open_snapshot(path)
+    return table, snapshot_metadata
+
+
+def budget_report(name, data_dir="."):
+    """
+    Memory of a dataset read straight from its CSV versus its compact snapshot, against its budget.
+    """
+    spec = DATASETS[name]
+    raw = pd.read_csv(os.path.join(data_dir, spec["csv"]), **spec["read_csv"])
+    table, snapshot_metadata = open_dataset(name, data_dir)
+    _, csv_usage = memory_report(raw)
+    _, usage = memory_report(to_pandas(table, snapshot_metadata), spec.get("profile", {}).get("budget_mb"))
+    return {
+        'dataset': name,
+        'csv_mb': csv_usage['bytes'] / 2 ** 20,
+        'compact_mb': usage['bytes'] / 2 ** 20,
+        'budget_mb': spec.get("profile", {}).get("budget_mb"),
+        'within_budget': usage['within_budget'],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build columnar snapshots of the dashboard datasets.")
+    parser.add_argument("datasets", nargs="*", help="Datasets to convert (default: every dataset whose CSV exists)")
+    parser.add_argument("--data-dir", default=".", help="Directory holding the CSV files")
+    parser.add_argument("--report", action="store_true", help="Print each dataset's memory against its budget")
+    args = parser.parse_args()
+
+    # Generated datasets (e.g. strategy_leaderboard from the optimizer) only exist once their stage has run
+    datasets = args.datasets
+    if not datasets:
+        datasets = [name for name in DATASETS if os.path.exists(os.path.join(args.data_dir, DATASETS[name]["csv"]))]
+        for name in DATASETS.keys() - set(datasets):
+            print(f"Skipping '{name}': {DATASETS[name]['csv']} not found")
+
+    if args.report:
+        print(pd.DataFrame([budget_report(name, args.data_dir) for name in datasets]).to_string(index=False))
+        return
+
+    for name in datasets:
+        print(f"Snapshot saved to '{build_snapshot(name, args.data_dir)}'")
+
+
+if __name__ == "__main__":
+    main()
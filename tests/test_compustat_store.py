@@ -0,0 +1,77 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import compustat_store
+
+
+def filings(tickers, years, seed=0):
+    rng = np.random.default_rng(seed)
+    rows = [
+        {'gvkey': f"{i:06d}", 'tic': ticker, 'datadate': f"{year}-12-31"}
+        for i, ticker in enumerate(tickers) for year in years
+    ]
+    funda = pd.DataFrame(rows)
+    for column in compustat_store.FUNDA_COLUMNS[3:]:
+        funda[column] = rng.normal(1000, 100, len(funda)).round(2)
+    return funda
+
+
+@pytest.fixture
+def stand_in(tmp_path):
+    return str(tmp_path / "funda.db"), str(tmp_path / "store")
+
+
+def stored(store_dir):
+    return compustat_store.read_store(store_dir).sort_values(['tic', 'datadate'], ignore_index=True)
+
+
+def test_first_extract_stores_every_filing(stand_in):
+    db, store = stand_in
+    funda = filings(['AAPL', 'MSFT'], range(2018, 2023))
+    compustat_store.write_local_funda(funda, db)
+    with compustat_store.local_connection(db) as con:
+        summary = compustat_store.extract(con, store, chunk_size=3)
+
+    assert summary['new'].sum() == len(funda) and summary['restated'].sum() == 0
+    assert compustat_store.partition_years(store) == list(range(2018, 2023))
+    assert compustat_store.load_watermark(store)['datadate'] == '2022-12-31'
+    result = stored(store)
+    np.testing.assert_allclose(result['ni'].to_numpy(), funda.sort_values(['tic', 'datadate'])['ni'].to_numpy())
+
+
+def test_incremental_extract_picks_up_new_and_restated_filings(stand_in):
+    db, store = stand_in
+    compustat_store.write_local_funda(filings(['AAPL', 'MSFT'], range(2018, 2022)), db)
+    with compustat_store.local_connection(db) as con:
+        compustat_store.extract(con, store)
+
+    # A new fiscal year, and a restatement inside the look-back window
+    update = filings(['AAPL', 'MSFT'], [2022], seed=1)
+    compustat_store.write_local_funda(update, db)
+    with compustat_store.local_connection(db) as con:
+        con.execute("UPDATE comp.funda SET ni = 1.5 WHERE tic = 'AAPL' AND datadate = '2021-12-31'")
+        con.commit()
+        summary = compustat_store.extract(con, store)
+
+    assert summary['new'].sum() == 2 and summary['restated'].sum() == 1
+    result = stored(store)
+    assert len(result) == 10
+    assert result.loc[(result['tic'] == 'AAPL') & (result['datadate'] == '2021-12-31'), 'ni'].item() == 1.5
+
+
+def test_tickers_are_bound_parameters(stand_in):
+    db, store = stand_in
+    compustat_store.write_local_funda(filings(['AAPL', "O'RLY", 'MSFT'], [2020, 2021]), db)
+    with compustat_store.local_connection(db) as con:
+        compustat_store.extract(con, store, tickers=["o'rly", 'AAPL', "X') OR ('1' = '1"])
+
+    assert sorted(stored(store)['tic'].unique()) == ['AAPL', "O'RLY"]
+    assert compustat_store.load_watermark(store)['tickers'] == ['AAPL', "O'RLY", "X') OR ('1' = '1"]
+
+
+def test_funda_query_binds_every_value():
+    query, params = compustat_store.funda_query('2020-01-01', ['AAPL', 'MSFT'])
+    assert "'2020-01-01'" not in query and 'AAPL' not in query
+    assert params == {'since': '2020-01-01', 'tic0': 'AAPL', 'tic1': 'MSFT'}
+    assert 'AND 1 = 0' in compustat_store.funda_query('2020-01-01', [])[0]
@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import correlation
+
+MACRO = ['GDP Growth', 'Unemployment Rate']
+SECTORS = ['Tech_ETF', 'Energy_ETF', 'Tech_CRSP']
+
+
+@pytest.fixture
+def data():
+    rng = np.random.default_rng(7)
+    dates = pd.date_range('2000-01-31', periods=120, freq=pd.offsets.MonthEnd())
+    frame = pd.DataFrame(rng.normal(size=(len(dates), len(MACRO) + len(SECTORS))), index=dates, columns=MACRO + SECTORS)
+    frame['Tech_ETF'] += 0.8 * frame['GDP Growth']
+    frame = frame.mask(rng.random(frame.shape) < 0.15)  # Scattered gaps
+    frame.iloc[:10, frame.columns.get_loc('Energy_ETF')] = np.nan  # A late-starting series
+    return frame
+
+
+def expected(data, window, min_periods=None):
+    """
+    Pandas reference: one rolling/expanding corr per macro x sector pair, as dates x macro x sector.
+    """
+    values = np.empty((len(data), len(MACRO), len(SECTORS)))
+    for i, macro in enumerate(MACRO):
+        for j, sector in enumerate(SECTORS):
+            if window is None:
+                windowed = data[macro].expanding(min_periods=min_periods or 1)
+            else:
+                windowed = data[macro].rolling(window, min_periods=min_periods)
+            values[:, i, j] = windowed.corr(data[sector]).to_numpy()
+    return values
+
+
+@pytest.mark.parametrize('window, min_periods', [(None, None), (None, 12), (36, None), (36, 24), (12, 6)])
+def test_history_matches_pandas(data, window, min_periods):
+    history = correlation.correlation_history(data, MACRO, SECTORS, window=window, min_periods=min_periods)
+    np.testing.assert_allclose(history['values'], expected(data, window, min_periods), atol=1e-10, equal_nan=True)
+
+
+def test_cross_correlation_matches_dataframe_corr(data):
+    np.testing.assert_allclose(
+        correlation.cross_correlation(data, MACRO, SECTORS).to_numpy(),
+        data.corr().loc[MACRO, SECTORS].to_numpy(),
+        atol=1e-10,
+    )
+
+
+@pytest.mark.parametrize('window', [None, 36])
+def test_incremental_state_matches_pandas(data, window):
+    state = correlation.init_state(data.iloc[:60], MACRO, SECTORS, window=window)
+    reference = expected(data, window)
+    for end in (61, 75, len(data)):
+        matrix = correlation.update_correlations(state, data.iloc[:end])
+        np.testing.assert_allclose(matrix.to_numpy(), reference[end - 1], atol=1e-10, equal_nan=True)
+
+
+def test_update_skips_months_already_applied(data):
+    state = correlation.init_state(data, MACRO, SECTORS, window=36)
+    before = correlation.state_matrix(state)
+    after = correlation.update_correlations(state, data)
+    pd.testing.assert_frame_equal(before, after)
+    assert state['rows'] == len(data)
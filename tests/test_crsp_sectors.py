@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import crsp_sectors
+
+
+def classify_sector(sic):
+    # Row-by-row classify_sector from Group_FDA_Project.ipynb
+    if pd.isna(sic):
+        return 'Unknown'
+    for lower, sector in zip(crsp_sectors.SIC_BOUNDS, crsp_sectors.SIC_SECTORS):
+        if lower <= sic < lower + 1000:
+            return sector
+    return 'Unknown'
+
+
+@pytest.fixture
+def dsf():
+    rng = np.random.default_rng(3)
+    n = 5_000
+    return pd.DataFrame({
+        'date': rng.choice(pd.date_range('1999-11-01', '2001-06-30', freq='B'), n),
+        'ret': rng.normal(0.0005, 0.02, n),
+        'hsiccd': rng.choice([np.nan, 500, 1000, 1311, 2834, 3571, 4911, 5411, 6021, 7372, 8062, 9999, 10500], n),
+    })
+
+
+def test_classify_sectors_matches_rowwise(dsf):
+    codes = crsp_sectors.classify_sectors(dsf['hsiccd'])
+    expected = dsf['hsiccd'].map(classify_sector)
+    assert (np.asarray(crsp_sectors.SECTORS)[codes] == expected.to_numpy()).all()
+
+
+def test_stream_matches_in_memory_groupby(dsf, tmp_path):
+    path = str(tmp_path / "crsp.db")
+    crsp_sectors.write_local_dsf(dsf.iloc[:2_000], path)
+    crsp_sectors.write_local_dsf(dsf.iloc[2_000:], path)  # Appended in pieces like a real extract
+
+    with crsp_sectors.local_connection(path) as con:
+        streamed = crsp_sectors.stream_sector_returns(con, start_date='2000-01-01', chunk_size=700)
+
+    rows = dsf[dsf['date'] >= '2000-01-01']
+    expected = rows.groupby([
+        rows['date'] + pd.offsets.MonthEnd(0),
+        rows['hsiccd'].map(classify_sector),
+    ])['ret'].mean().unstack()
+
+    assert streamed.index.equals(pd.DatetimeIndex(expected.index, name='date'))
+    np.testing.assert_allclose(streamed[expected.columns].to_numpy(), expected.to_numpy(), rtol=1e-12)
+
+
+def test_stream_with_no_rows(tmp_path):
+    path = str(tmp_path / "crsp.db")
+    crsp_sectors.write_local_dsf(pd.DataFrame({'date': ['1990-01-02'], 'ret': [0.01], 'hsiccd': [2834]}), path)
+    with crsp_sectors.local_connection(path) as con:
+        streamed = crsp_sectors.stream_sector_returns(con, start_date='2000-01-01')
+    assert streamed.empty and list(streamed.columns) == crsp_sectors.SECTORS
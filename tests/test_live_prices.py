@@ -0,0 +1,147 @@
+import asyncio
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import live_prices
+import valuation_query
+
+
+@pytest.fixture
+def selection():
+    rng = np.random.default_rng(11)
+    tickers = [f"T{i}" for i in range(8)]
+    return pd.DataFrame({
+        'Ticker': tickers,
+        'Current Price': rng.uniform(20, 200, len(tickers)),
+        'Weighted Valuation': rng.uniform(20, 200, len(tickers)),
+    })
+
+
+def expected_gaps(selection, prices):
+    """
+    Full recompute of the gap columns with `prices` ({ticker: price}) as Current Price.
+    """
+    current = selection['Ticker'].map(prices).to_numpy(dtype=float)
+    return current, valuation_query.gap_columns(current, selection['Weighted Valuation'])
+
+
+def assert_matches_full_recompute(table, selection, prices):
+    current, (normalized_price, normalized_valuation, gap_ratio, category) = expected_gaps(selection, prices)
+    np.testing.assert_allclose(table.price, current)
+    np.testing.assert_allclose(table.normalized_price, normalized_price, rtol=1e-12)
+    np.testing.assert_allclose(table.normalized_valuation, normalized_valuation, rtol=1e-12)
+    np.testing.assert_allclose(table.gap_ratio, gap_ratio, rtol=1e-9)
+    assert (table.category == category).all()
+
+
+def test_feed_updates_match_full_recompute(selection):
+    prices = dict(zip(selection['Ticker'], selection['Current Price']))
+    # Small batches, published about one at a time, so some move the lowest/highest price and some don't
+    source = live_prices.SimulatedQuoteSource(prices, interval=0.004, volatility=0.2, batch_size=1, batches=150, seed=5)
+    feed = live_prices.PriceFeed(source, prices, throttle=0.002)
+    table = live_prices.LiveGapTable(selection)
+    expected = dict(prices)
+    cases = {'extreme moved': 0, 'extreme unchanged': 0}
+
+    def on_publish(batch, version):
+        extremes = {table.index[np.nanargmin(table.price)], table.index[np.nanargmax(table.price)]}
+        recomputed = table.apply(batch, version)
+        expected.update(batch)
+        moved = bool(extremes & set(batch)) or len(recomputed) == len(table.price)
+        cases['extreme moved' if moved else 'extreme unchanged'] += 1
+        if not moved:
+            assert sorted(table.index[recomputed]) == sorted(batch)  # Only the quoted rows
+        assert_matches_full_recompute(table, selection, expected)
+
+    feed.subscribe(on_publish)
+    asyncio.run(feed.run())
+
+    assert feed.version > 0 and table.version == feed.version
+    assert cases['extreme moved'] > 0 and cases['extreme unchanged'] > 0
+    assert feed.prices == expected
+
+
+def test_updates_since_catches_up_a_stale_table(selection):
+    prices = dict(zip(selection['Ticker'], selection['Current Price']))
+    source = live_prices.SimulatedQuoteSource(prices, interval=0.001, batches=50, seed=2)
+    feed = live_prices.PriceFeed(source, prices, throttle=0.005)
+    asyncio.run(feed.run())
+
+    table = live_prices.LiveGapTable(selection)
+    updates, version = feed.updates_since(table.version)
+    table.apply(updates, version)
+    assert_matches_full_recompute(table, selection, feed.prices)
+    assert feed.updates_since(version) == ({}, version)
+
+
+def test_apply_matches_gap_analysis_for_extreme_and_interior_moves(selection):
+    table = live_prices.LiveGapTable(selection)
+    prices = dict(zip(selection['Ticker'], selection['Current Price']))
+    lowest = selection.loc[selection['Current Price'].idxmin(), 'Ticker']
+    interior = selection.sort_values('Current Price')['Ticker'].iloc[2]
+
+    for ticker, price in [(interior, prices[interior] * 1.01), (lowest, prices[lowest] * 3), (interior, 1.0)]:
+        prices[ticker] = price
+        table.apply({ticker: price})
+        assert_matches_full_recompute(table, selection, prices)
+
+    query = valuation_query.ValuationQuery(selection.assign(**{'Current Price': selection['Ticker'].map(prices)}))
+    reference = query.gap_analysis(selection['Ticker'])
+    pd.testing.assert_frame_equal(
+        table.frame()[valuation_query.GAP_COLUMNS].reset_index(drop=True),
+        reference[valuation_query.GAP_COLUMNS].reset_index(drop=True),
+    )
+
+
+class FlakySource:
+    """
+    Raises on its first `failures` streams, then yields the given batches.
+    """
+
+    def __init__(self, batches, failures=2):
+        self.batches = batches
+        self.failures = failures
+        self.attempts = 0
+
+    async def stream(self):
+        self.attempts += 1
+        if self.attempts <= self.failures:
+            raise ConnectionError(f"attempt {self.attempts} failed")
+        for batch in self.batches:
+            await asyncio.sleep(0.001)
+            yield batch
+
+
+def test_feed_records_source_errors_and_retries():
+    source = FlakySource([{'A': 1.0}, {'B': 2.0}])
+    feed = live_prices.PriceFeed(source, throttle=0.002, retry=0.001)
+    errors = []
+    unsubscribe = feed.subscribe(lambda batch, version: errors.append(feed.last_error))
+    asyncio.run(feed.run())
+
+    assert source.attempts == 3 and feed.errors == 2
+    assert feed.prices == {'A': 1.0, 'B': 2.0} and feed.version > 0
+    assert feed.last_error is None and errors[-1] is None
+    unsubscribe()
+    assert feed._subscribers == []
+
+
+def test_failing_source_keeps_retrying_and_a_dead_feed_restarts():
+    class BrokenSource:
+        def stream(self):
+            raise ImportError("No module named 'yfinance'")  # Fails before it is even iterated
+
+    feed = live_prices.PriceFeed(BrokenSource(), throttle=0.001, retry=0.001).start()
+    while feed.errors < 3:
+        time.sleep(0.001)
+    assert feed.alive and feed.version == 0
+    assert feed.last_error == "ImportError: No module named 'yfinance'"
+    feed.stop()
+    assert not feed.alive
+
+    feed.source = FlakySource([{'A': 3.0}], failures=0)
+    feed.start()._thread.join(timeout=5)
+    assert feed.prices == {'A': 3.0} and feed.last_error is None
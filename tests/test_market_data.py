@@ -0,0 +1,68 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import market_data
+
+
+def history(dates, close, splits=None, dividends=None):
+    """
+    Daily bars in the layout YFinanceSource caches, with Adj Close equal to Close.
+    """
+    return pd.DataFrame({
+        'Close': close,
+        'Adj Close': close,
+        'Dividends': dividends if dividends is not None else 0.0,
+        'Stock Splits': splits if splits is not None else 0.0,
+    }, index=pd.DatetimeIndex(dates, name='Date'))
+
+
+@pytest.fixture
+def stub():
+    histories = {'prices': {}}
+    server = market_data.serve_stub(histories)
+    yield histories['prices'], market_data.HTTPSource(f"http://127.0.0.1:{server.server_port}")
+    server.shutdown()
+
+
+def test_new_bars_are_appended(stub, tmp_path):
+    prices, source = stub
+    dates = pd.bdate_range('2024-01-01', periods=10)
+    prices['AAA'] = history(dates[:6], np.arange(6.0) + 100)
+    assert market_data.update_symbol('AAA', source, cache_dir=tmp_path, start=dates[0]) == 6
+
+    prices['AAA'] = history(dates, np.arange(10.0) + 100)
+    assert market_data.update_symbol('AAA', source, cache_dir=tmp_path) == 4
+    pd.testing.assert_frame_equal(market_data.load_cached('AAA', cache_dir=tmp_path), prices['AAA'], check_freq=False)
+
+
+def test_split_refetches_the_adjusted_history(stub, tmp_path):
+    prices, source = stub
+    dates = pd.bdate_range('2024-01-01', periods=10)
+    close = np.full(10, 400.0)
+    prices['AAA'] = history(dates[:6], close[:6])
+    market_data.update_symbol('AAA', source, cache_dir=tmp_path, start=dates[0])
+
+    # A 4:1 split on the 8th bar: the source now reports every earlier bar divided by 4
+    splits = np.where(np.arange(10) == 7, 4.0, 0.0)
+    prices['AAA'] = history(dates, close / 4, splits=splits)
+    assert market_data.update_symbol('AAA', source, cache_dir=tmp_path) == 4
+
+    cached = market_data.load_cached('AAA', cache_dir=tmp_path)
+    pd.testing.assert_frame_equal(cached, prices['AAA'], check_freq=False)
+    assert (cached['Close'].pct_change().dropna() == 0).all()  # No fake -75% return
+
+
+def test_dividend_adjustment_of_the_overlapping_bar_refetches(stub, tmp_path):
+    prices, source = stub
+    dates = pd.bdate_range('2024-01-01', periods=10)
+    close = np.arange(10.0) + 100
+    prices['AAA'] = history(dates[:6], close[:6])
+    market_data.update_symbol('AAA', source, cache_dir=tmp_path, start=dates[0])
+
+    # A dividend before the cached range was reported late: older adjusted closes all moved
+    adjusted = history(dates, close)
+    adjusted['Adj Close'] *= 0.99
+    prices['AAA'] = adjusted
+    market_data.update_symbol('AAA', source, cache_dir=tmp_path)
+    pd.testing.assert_frame_equal(market_data.load_cached('AAA', cache_dir=tmp_path), adjusted, check_freq=False)
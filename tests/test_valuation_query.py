@@ -0,0 +1,41 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import valuation_query
+
+
+@pytest.fixture
+def results():
+    rng = np.random.default_rng(3)
+    n = 200
+    frame = pd.DataFrame({'Ticker': [f"T{i:03d}" for i in range(n)], 'Current Price': rng.uniform(10, 100, n)})
+    for column in valuation_query.RANK_COLUMNS:
+        values = rng.integers(0, 50, n).astype(float)  # Plenty of ties
+        values[rng.random(n) < 0.2] = np.nan
+        frame[column] = values
+    return frame
+
+
+@pytest.mark.parametrize('column', valuation_query.RANK_COLUMNS)
+def test_ranked_and_leader_match_pandas(results, column):
+    query = valuation_query.ValuationQuery(results)
+    rng = np.random.default_rng(7)
+    for size in [1, 5, 50, 200]:
+        tickers = list(rng.choice(results['Ticker'], size, replace=False))
+        selection = results[results['Ticker'].isin(tickers)]
+
+        expected = selection.sort_values(column, ascending=False, kind='stable')
+        pd.testing.assert_frame_equal(query.ranked(tickers, column), expected)
+
+        leader = query.leader(tickers, column)
+        if selection[column].isna().all():
+            assert leader is None
+        else:
+            assert leader == selection.loc[selection[column].idxmax(), 'Ticker']
+
+
+def test_leader_of_empty_or_unvalued_selection(results):
+    query = valuation_query.ValuationQuery(results.assign(**{'Intrinsic Value': np.nan}))
+    assert query.leader([], 'Weighted Valuation') is None
+    assert query.leader(list(results['Ticker']), 'Intrinsic Value') is None
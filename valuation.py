@@ -0,0 +1,243 @@
+import numpy as np
+import pandas as pd
+
+import peer_index
+
+# Assumptions for DCF
+WACC = 0.08  # Weighted Average Cost of Capital (8%)
+TERMINAL_GROWTH_RATE = 0.02  # Perpetual growth rate (2%)
+PROJECTION_YEARS = 5
+DEFAULT_GROWTH_RATE = 0.05  # Default growth rate if historical growth is unavailable
+
+# Assumptions for DDM
+REQUIRED_RATE_OF_RETURN = 0.08  # 8% return
+
+# Weights for the valuation models
+WEIGHTS = {
+    'DCF': 0.4,  # 40% weight for DCF
+    'CCA': 0.4,  # 40% weight for CCA
+    'DDM': 0.2   # 20% weight for DDM
+}
+
+# Column layout of final_valuation_results_with_prices.csv
+VALUATION_COLUMNS = [
+    'Ticker', 'Enterprise Value', 'Net Debt', 'Equity Value', 'Intrinsic Value per Share',
+    'P/E Median', 'EV/EBITDA Median', 'P/E Valuation', 'EV/EBITDA Valuation',
+    'Most Recent Dividend', 'Dividend Growth Rate', 'Intrinsic Value',
+    'Weighted Valuation', 'Current Price', 'Valuation Ratio', 'Valuation Category'
+]
+
+REQUIRED_COLUMNS = ['tic', 'datadate', 'oibdp', 'capx', 'csho', 'prcc_f', 'ni', 'at', 'lt', 'che', 'dvpsp_f', 'naicsh']
+
+
+def group_mean_growth(codes, values, n_groups):
+    """
+    Mean of pct_change within each group, for rows already sorted by (group, date).
+    """
+    codes = np.asarray(codes)
+    values = np.asarray(values, dtype=float)
+
+    # Growth between consecutive rows of the same group
+    with np.errstate(divide='ignore', invalid='ignore'):
+        growth = values[1:] / values[:-1] - 1
+    same_group = codes[1:] == codes[:-1]
+    valid = same_group & ~np.isnan(growth)
+
+    sums = np.bincount(codes[1:][valid], weights=growth[valid], minlength=n_groups)
+    counts = np.bincount(codes[1:][valid], minlength=n_groups)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return sums / counts
+
+
+def group_last(codes, values, n_groups):
+    """
+    Last value of each group, for rows already sorted by (group, date).
+    """
+    last = np.full(n_groups, np.nan)
+    last[np.asarray(codes)] = np.asarray(values, dtype=float)  # later rows overwrite earlier ones
+    return last
+
+
+def prepare_inputs(compustat_data, tickers=None, peers=None):
+    """
+    Reduce a Compustat funda pull to one row of columnar arrays per ticker.
+
+    Peer multiples come from `peers` (a peer_index.PeerIndex), built from the
+    same data if not given.
+    """
+    missing = [col for col in REQUIRED_COLUMNS if col not in compustat_data.columns]
+    if missing:
+        raise ValueError(f"One or more required columns are missing from the data: {missing}")
+
+    data = compustat_data[REQUIRED_COLUMNS].copy()
+    data['tic'] = data['tic'].str.strip()
+    data['datadate'] = pd.to_datetime(data['datadate'])
+    data = data.sort_values(by=['tic', 'datadate'], kind='stable')
+
+    codes, universe = pd.factorize(data['tic'], sort=True)
+    n = len(universe)
+
+    # Free Cash Flow and its history
+    fcf = (data['oibdp'] - data['capx']).to_numpy(dtype=float)
+    fcf_count = np.bincount(codes[~np.isnan(fcf)], minlength=n)
+
+    naics = pd.to_numeric(data['naicsh'], errors='coerce').to_numpy(dtype=float)
+
+    # Dividends: only rows with a positive dividend count towards the DDM
+    dividends = data['dvpsp_f'].to_numpy(dtype=float)
+    paid = dividends > 0
+
+    inputs = pd.DataFrame({
+        'Ticker': universe,
+        'FCF Count': fcf_count,
+        'Last FCF': group_last(codes, fcf, n),
+        'FCF Growth': group_mean_growth(codes, fcf, n),
+        'lt': group_last(codes, data['lt'], n),
+        'che': group_last(codes, data['che'], n),
+        'csho': group_last(codes, data['csho'], n),
+        'ni': group_last(codes, data['ni'], n),
+        'oibdp': group_last(codes, data['oibdp'], n),
+        'naicsh': group_last(codes, naics, n),
+        'Dividend Count': np.bincount(codes[paid], minlength=n),
+        'Most Recent Dividend': group_last(codes[paid], dividends[paid], n),
+        'Dividend Growth': group_mean_growth(codes[paid], dividends[paid], n),
+    })
+
+    # Peer medians at the most specific NAICS level with enough peers ('Peer Fallback'
+    # marks tickers that got their broadest group or the whole universe instead)
+    if peers is None:
+        peers = peer_index.PeerIndex(compustat_data)
+    peer_medians = peers.lookup(inputs['naicsh'])
+    for column in ['P/E Median', 'EV/EBITDA Median', 'Peer Level', 'Peer Fallback']:
+        inputs[column] = peer_medians[column].to_numpy()
+
+    if tickers is not None:
+        inputs = inputs.set_index('Ticker').reindex(pd.Index(tickers, name='Ticker')).reset_index()
+        inputs[['FCF Count', 'Dividend Count']] = inputs[['FCF Count', 'Dividend Count']].fillna(0)
+    return inputs
+
+
+def dcf_enterprise_value(last_fcf, growth, wacc=WACC, terminal_growth_rate=TERMINAL_GROWTH_RATE, years=PROJECTION_YEARS):
+    """
+    Enterprise value of an FCF stream growing at `growth` for `years` plus a terminal value.
+
+    All arguments broadcast against each other, so a whole universe (or a whole
+    sensitivity grid) is valued in one call.
+    """
+    last_fcf = np.asarray(last_fcf, dtype=float)
+    growth = np.asarray(growth, dtype=float)
+    wacc = np.asarray(wacc, dtype=float)
+    terminal_growth_rate = np.asarray(terminal_growth_rate, dtype=float)
+    years = np.asarray(years, dtype=float)
+
+    # Sum of discounted projected FCF is a geometric series in q = (1 + g) / (1 + WACC)
+    q = (1 + growth) / (1 + wacc)
+    q_n = q ** years
+    with np.errstate(divide='ignore', invalid='ignore'):
+        annuity = np.where(np.isclose(q, 1.0), years, q * (1 - q_n) / (1 - q))
+        discounted_tv = q_n * (1 + terminal_growth_rate) / (wacc - terminal_growth_rate)
+    return last_fcf * (annuity + discounted_tv)
+
+
+def dcf_growth_inputs(inputs, default_growth_rate=DEFAULT_GROWTH_RATE):
+    """
+    Starting FCF and growth rate per ticker, with the notebook's fallbacks.
+    """
+    last_fcf = inputs['Last FCF'].to_numpy(dtype=float)
+    growth = inputs['FCF Growth'].to_numpy(dtype=float)
+
+    # Not enough or invalid data: default growth and a positive starting FCF
+    thin = (inputs['FCF Count'].to_numpy() < 2) | ~(last_fcf > 0)
+    last_fcf = np.where(thin, np.fmax(last_fcf, 1), last_fcf)
+    growth = np.where(thin | ~np.isfinite(growth) | (growth <= 0), default_growth_rate, growth)
+    return last_fcf, growth
+
+
+def ddm_values(most_recent_dividend, growth, dividend_count, required_rate_of_return=REQUIRED_RATE_OF_RETURN,
+               default_growth_rate=DEFAULT_GROWTH_RATE):
+    """
+    Gordon growth value per ticker; returns (growth rate, intrinsic value).
+    """
+    most_recent_dividend = np.asarray(most_recent_dividend, dtype=float)
+    growth = np.asarray(growth, dtype=float)
+    pays = np.asarray(dividend_count) > 0
+
+    # Default growth for limited data and invalid or negative rates
+    growth = np.where((np.asarray(dividend_count) < 2) | ~np.isfinite(growth) | (growth <= 0), default_growth_rate, growth)
+    spread = required_rate_of_return - growth
+    with np.errstate(divide='ignore', invalid='ignore'):
+        value = np.where(spread != 0, most_recent_dividend * (1 + growth) / spread, 0.0)
+    value = np.fmax(value, 0)
+
+    return np.where(pays, growth, np.nan), np.where(pays, value, 0.0)
+
+
+def batch_valuation(inputs, current_prices=None, wacc=WACC, terminal_growth_rate=TERMINAL_GROWTH_RATE,
+                    projection_years=PROJECTION_YEARS, required_rate_of_return=REQUIRED_RATE_OF_RETURN, weights=WEIGHTS):
+    """
+    DCF, CCA and DDM valuations for every ticker in `inputs` in one vectorized pass.
+
+    `inputs` is the frame returned by `prepare_inputs`; `current_prices` maps
+    ticker to last close. The result has the schema of
+    final_valuation_results_with_prices.csv.
+    """
+    results = pd.DataFrame({'Ticker': inputs['Ticker'].to_numpy()})
+
+    # DCF
+    last_fcf, growth = dcf_growth_inputs(inputs)
+    enterprise_value = dcf_enterprise_value(last_fcf, growth, wacc, terminal_growth_rate, projection_years)
+    net_debt = inputs['lt'].to_numpy(dtype=float) - inputs['che'].to_numpy(dtype=float)  # Total Liabilities - Cash & Equivalents
+    shares = inputs['csho'].to_numpy(dtype=float)
+    has_balance_sheet = ~np.isnan(net_debt) & ~np.isnan(shares)
+    equity_value = enterprise_value - net_debt
+    with np.errstate(divide='ignore', invalid='ignore'):
+        per_share = equity_value / shares
+    per_share = np.where(has_balance_sheet & (per_share >= 0), per_share, 0.0)
+
+    results['Enterprise Value'] = np.where(has_balance_sheet, enterprise_value, np.nan)
+    results['Net Debt'] = np.where(has_balance_sheet, net_debt, np.nan)
+    results['Equity Value'] = np.where(has_balance_sheet, equity_value, np.nan)
+    results['Intrinsic Value per Share'] = per_share
+
+    # CCA
+    results['P/E Median'] = inputs['P/E Median'].to_numpy(dtype=float)
+    results['EV/EBITDA Median'] = inputs['EV/EBITDA Median'].to_numpy(dtype=float)
+    results['P/E Valuation'] = (results['P/E Median'] * inputs['ni'].to_numpy(dtype=float)).fillna(0)
+    results['EV/EBITDA Valuation'] = results['EV/EBITDA Median'].to_numpy() * inputs['oibdp'].to_numpy(dtype=float)
+
+    # DDM
+    dividend_growth, ddm_value = ddm_values(
+        inputs['Most Recent Dividend'], inputs['Dividend Growth'], inputs['Dividend Count'], required_rate_of_return
+    )
+    results['Most Recent Dividend'] = inputs['Most Recent Dividend'].fillna(0).to_numpy(dtype=float)
+    results['Dividend Growth Rate'] = dividend_growth
+    results['Intrinsic Value'] = ddm_value
+
+    # Normalize values to a common scale
+    for column in ['Intrinsic Value per Share', 'P/E Valuation', 'Intrinsic Value']:
+        maximum = results[column].max()
+        results[column] = results[column] / maximum if maximum else 0.0
+
+    # Weighted Valuation
+    results['Weighted Valuation'] = (
+        results['Intrinsic Value per Share'] * weights['DCF'] +
+        results['P/E Valuation'] * weights['CCA'] +
+        results['Intrinsic Value'] * weights['DDM']
+    )
+
+    # Current prices and Valuation Ratio
+    if current_prices is None:
+        current_prices = {}
+    results['Current Price'] = results['Ticker'].map(current_prices).astype(float).fillna(0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        results['Valuation Ratio'] = results['Weighted Valuation'] / results['Current Price']
+    results['Valuation Category'] = np.where(results['Valuation Ratio'] > 1, 'Undervalued', 'Overvalued')
+
+    return results[VALUATION_COLUMNS]
+
+
+def value_universe(compustat_data, current_prices=None, tickers=None, peers=None, **assumptions):
+    """
+    Compustat funda rows in, valuation table out.
+    """
+    return batch_valuation(prepare_inputs(compustat_data, tickers, peers), current_prices, **assumptions)
@@ -0,0 +1,145 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+CACHE_SIZE = 64  # Selections remembered per table
+
+# Under copy-on-write (always on from pandas 3) a shallow copy of a cached
+# frame is enough to keep sessions from modifying each other's results
+SHALLOW_COPIES = int(pd.__version__.split(".")[0]) >= 3
+
+RANK_COLUMNS = ["Intrinsic Value per Share", "P/E Valuation", "Intrinsic Value", "Weighted Valuation"]
+
+GAP_COLUMNS = [
+    "Ticker", "Normalized Weighted Valuation", "Normalized Current Price", "Valuation Gap Ratio", "Valuation Category"
+]
+
+
+def min_max(values):
+    """
+    Scale to 0-1 over the given values.
+    """
+    values = np.asarray(values, dtype=float)
+    if not np.isfinite(values).any():
+        return np.full(values.shape, np.nan)
+    low, high = np.nanmin(values), np.nanmax(values)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return (values - low) / (high - low)
+
+
+def gap_columns(current_price, weighted_valuation):
+    """
+    Normalized price, normalized weighted valuation, Valuation Gap Ratio and category for a selection.
+    """
+    normalized_price = min_max(current_price)
+    normalized_valuation = min_max(weighted_valuation)
+    gap_ratio, category = gap_category(normalized_price, normalized_valuation)
+    return normalized_price, normalized_valuation, gap_ratio, category
+
+
+def gap_category(normalized_price, normalized_valuation):
+    """
+    Valuation Gap Ratio and Overvalued/Undervalued category from the normalized columns.
+    """
+    with np.errstate(divide='ignore', invalid='ignore'):
+        gap_ratio = (normalized_price - normalized_valuation) / normalized_valuation
+    category = np.where(gap_ratio > 0, "Overvalued", "Undervalued")
+    return gap_ratio, category
+
+
+class ValuationQuery:
+    """
+    Read-only query layer over the valuation results table.
+
+    Keeps a ticker index so selections are positional lookups rather than
+    full-table isin scans, and ranks every row by each valuation metric once,
+    so a selection's ordering and leader are integer lookups. Memoizes each
+    selection's slice, ranking and gap analysis. The underlying table is never
+    modified; every call returns its own copy of the memoized frame, so
+    callers can modify what they get.
+    """
+
+    def __init__(self, valuation_results, cache_size=CACHE_SIZE):
+        self.table = valuation_results.reset_index(drop=True)
+        self.index = pd.Index(self.table["Ticker"])
+        self.tickers = self.index.unique()
+        # Rank of each row over the whole table (0 = highest, ties in table order, NaN last)
+        self.ranks = {
+            column: self.table[column].rank(ascending=False, method="first", na_option="bottom").to_numpy(dtype=np.int64) - 1
+            for column in RANK_COLUMNS if column in self.table.columns
+        }
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()  # Shared across Streamlit sessions
+
+    def _key(self, tickers):
+        return tuple(sorted(set(tickers)))
+
+    def _memoize(self, kind, tickers, compute):
+        key = (kind, self._key(tickers))
+        with self._lock:
+            result = self._cache.get(key)
+            if result is not None:
+                self._cache.move_to_end(key)
+        if result is None:
+            result = compute()
+            with self._lock:
+                self._cache[key] = result
+                if len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        return result.copy(deep=not SHALLOW_COPIES)
+
+    def positions(self, tickers):
+        """
+        Row positions of the selected tickers, in table order.
+        """
+        key = self._key(tickers)
+        if self.index.is_unique:
+            positions = self.index.get_indexer(key)
+            return np.sort(positions[positions >= 0])
+        return np.flatnonzero(self.index.isin(key))
+
+    def select(self, tickers):
+        """
+        Rows for the selected tickers (a new frame).
+        """
+        return self._memoize("select", tickers, lambda: self.table.iloc[self.positions(tickers)])
+
+    def ranked(self, tickers, column):
+        """
+        Rows for the selected tickers ordered by `column`, highest first (NaN last).
+        """
+        def compute():
+            positions = self.positions(tickers)
+            return self.table.iloc[positions[np.argsort(self.ranks[column][positions])]]
+        return self._memoize(("ranked", column), tickers, compute)
+
+    def leader(self, tickers, column):
+        """
+        Ticker with the highest `column` in the selection, or None if none of them has a value.
+        """
+        positions = self.positions(tickers)
+        if len(positions) == 0:
+            return None
+        best = positions[np.argmin(self.ranks[column][positions])]
+        return None if pd.isna(self.table[column].iat[best]) else self.table["Ticker"].iat[best]
+
+    def gap_analysis(self, tickers):
+        """
+        Valuation Gap Analysis for the selection, sorted by Valuation Gap Ratio (largest first).
+        """
+        def compute():
+            selection = self.select(tickers)
+            normalized_price, normalized_valuation, gap_ratio, category = gap_columns(
+                selection["Current Price"], selection["Weighted Valuation"]
+            )
+            result = selection.assign(**{
+                "Normalized Current Price": normalized_price,
+                "Normalized Weighted Valuation": normalized_valuation,
+                "Valuation Gap Ratio": gap_ratio,
+                "Valuation Category": category,
+            })
+            return result.sort_values(by="Valuation Gap Ratio", ascending=False)
+        return self._memoize("gap", tickers, compute)